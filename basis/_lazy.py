@@ -0,0 +1,59 @@
+"""Deferred imports for heavy dependencies, to keep CLI startup fast."""
+
+import importlib
+import importlib.abc
+import importlib.util
+import sys
+from types import ModuleType
+
+from .timing import span
+
+
+class _TimedLoader(importlib.abc.Loader):
+    """Wrap a loader so that executing the module is recorded as an import span."""
+
+    def __init__(self, loader: importlib.abc.Loader) -> None:
+        self.loader = loader
+
+    def __getattr__(self, name: str) -> object:
+        return getattr(self.loader, name)
+
+    def exec_module(self, module: ModuleType) -> None:
+        with span(f"import {module.__name__}"):
+            self.loader.exec_module(module)
+
+
+def lazy_import(name: str) -> ModuleType:
+    """Import a module, deferring its execution until an attribute is first accessed.
+
+    Importing the Basis Set Exchange takes a few hundred milliseconds, which commands
+    served from the cache or index should not pay.
+
+    Args:
+        name: fully qualified module name
+
+    Returns:
+        The module, loaded on first use
+
+    Raises:
+        ModuleNotFoundError: module cannot be found
+    """
+    if (module := sys.modules.get(name)) is not None:
+        return module
+
+    spec = importlib.util.find_spec(name)
+    if spec is None or spec.loader is None:
+        raise ModuleNotFoundError(f"No module named {name!r}", name=name)
+
+    loader = importlib.util.LazyLoader(_TimedLoader(spec.loader))
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+
+    # Like a regular import, bind submodules on their parent package, which code that
+    # imports the submodule normally (e.g. `import concurrent.futures`) relies on
+    parent, _, child = name.rpartition(".")
+    if parent:
+        setattr(importlib.import_module(parent), child, module)
+    return module
@@ -0,0 +1,221 @@
+"""Asynchronous counting, tabulating, and editing for asyncio applications.
+
+The blocking functions of `basis.basis` run on a bounded thread pool.  Concurrent
+requests for the same work share one in-flight call, so that N tasks awaiting the same
+basis set trigger a single load, and a semaphore limits how many calls run at once.
+
+Examples:
+    >>> import asyncio
+    >>> async def main():
+    ...     return await asyncio.gather(count("sto-3g", ["H"]), count("STO-3G", ["H"]))
+    >>> asyncio.run(main())
+    [{1: ([1], [3])}, {1: ([1], [3])}]
+"""
+
+import asyncio
+import functools
+import marshal
+import os
+import weakref
+from collections.abc import Callable, Hashable, Iterable
+from concurrent.futures import Executor, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Generic, Literal, TypeVar
+
+from . import basis as _basis
+from .basis import BASIS_COUNT, EditStep, parse_elements
+
+T = TypeVar("T")
+
+# Matches ThreadPoolExecutor's default: loads spend part of their time reading files
+DEFAULT_MAX_WORKERS = min(32, (os.cpu_count() or 1) + 4)
+
+
+@dataclass
+class _Inflight(Generic[T]):
+    """A call in flight and the number of tasks awaiting it."""
+
+    task: "asyncio.Task[T]"
+    waiters: int = 0
+
+
+@functools.cache
+def _default_executor() -> ThreadPoolExecutor:
+    return ThreadPoolExecutor(max_workers=DEFAULT_MAX_WORKERS, thread_name_prefix="basis-aio")
+
+
+class AsyncRunner:
+    """Run blocking basis set operations on an executor, sharing identical in-flight calls.
+
+    A runner belongs to the event loop it is first used in.
+    """
+
+    def __init__(self, executor: Executor | None = None, limit: int | None = None) -> None:
+        """Create a runner.
+
+        Args:
+            executor: executor to run calls on; defaults to a shared thread pool
+            limit: maximum number of calls running at once; defaults to the number of
+                workers of the default thread pool
+        """
+        self.executor = executor or _default_executor()
+        self.limit = limit or DEFAULT_MAX_WORKERS
+        self._semaphore = asyncio.Semaphore(self.limit)
+        self._inflight: dict[Hashable, _Inflight[Any]] = {}
+
+    async def _execute(self, func: Callable[..., T], *args: Any) -> T:
+        async with self._semaphore:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, functools.partial(func, *args))
+
+    async def run(self, key: Hashable, func: Callable[..., T], *args: Any) -> T:
+        """Run `func(*args)`, or wait for the in-flight call with the same *key*.
+
+        Cancelling a waiter does not affect the others; the call itself is cancelled once
+        every waiter is gone (a call already running on a thread runs to completion, but
+        its result is discarded).
+        """
+        entry = self._inflight.get(key)
+        if entry is None:
+            task = asyncio.get_running_loop().create_task(self._execute(func, *args))
+            entry = self._inflight[key] = _Inflight(task)
+
+            def forget(_: asyncio.Task) -> None:
+                if self._inflight.get(key) is entry:
+                    del self._inflight[key]
+
+            task.add_done_callback(forget)
+
+        entry.waiters += 1
+        try:
+            return await asyncio.shield(entry.task)
+        finally:
+            entry.waiters -= 1
+            if entry.waiters == 0 and not entry.task.done():
+                entry.task.cancel()
+                # Later calls start afresh rather than join the cancelled one
+                if self._inflight.get(key) is entry:
+                    del self._inflight[key]
+
+    async def load_basis(self, basis: str, elements: Iterable[int | str] | None = None) -> dict:
+        """Asynchronous `basis.basis.load_basis`."""
+        selection = None if elements is None else tuple(parse_elements(elements))
+        key = ("load", basis.lower(), selection)
+        # Shared marshalled, so that every waiter gets its own copy
+        return marshal.loads(await self.run(key, _basis._load_basis_data, basis, selection))
+
+    async def count(
+        self,
+        basis: str,
+        elements: Iterable[int | str] | None = None,
+        use_cache: bool = True,
+    ) -> BASIS_COUNT:
+        """Asynchronous `basis.basis.count`."""
+        selection = None if elements is None else tuple(parse_elements(elements))
+        key = ("count", basis.lower(), selection, use_cache)
+        counts = await self.run(key, _basis.count, basis, selection, use_cache)
+        # Every waiter gets its own copy
+        return {element: (con.copy(), uncon.copy()) for element, (con, uncon) in counts.items()}
+
+    async def table(
+        self,
+        basis_sets: list[str],
+        elements: Iterable[int | str] | None = None,
+        diff: bool = False,
+        format: Literal["plain", "csv"] = "plain",
+        spherical: bool = False,
+        *,
+        use_cache: bool = True,
+    ) -> str:
+        """Asynchronous `basis.basis.table`, counting the basis sets concurrently."""
+        selection = None if elements is None else tuple(parse_elements(elements))
+        await asyncio.gather(*(self.count(basis, selection, use_cache) for basis in basis_sets))
+
+        # The counts are now memoized, so rendering does not count again
+        key = ("table", tuple(basis_sets), selection, diff, format, spherical, use_cache)
+        render = functools.partial(_basis.table, use_cache=use_cache)
+        return await self.run(key, render, list(basis_sets), selection, diff, format, spherical)
+
+    async def edit_basis(
+        self,
+        basis: str | None,
+        elements: Iterable[int | str] | None = None,
+        remove: Iterable[str] | None = None,
+        fmt: str = "nwchem",
+        input_file: str | None = None,
+        *,
+        steps: Iterable[EditStep] = (),
+        only: Iterable[int | str] | None = None,
+    ) -> str:
+        """Asynchronous `basis.basis.edit_basis`, sharing the load of the basis set."""
+        only = None if only is None else tuple(parse_elements(only))
+        if input_file is None and basis is not None:
+            # Shares the load with concurrent calls; the memoized data itself is not copied
+            key = ("load", basis.lower(), only)
+            await self.run(key, _basis._load_basis_data, basis, only)
+
+        elements = None if elements is None else tuple(parse_elements(elements))
+        remove = None if remove is None else tuple(remove)
+        steps = tuple(
+            EditStep(
+                None if step.elements is None else tuple(parse_elements(step.elements)),
+                tuple(step.remove),
+            )
+            for step in steps
+        )
+        key = ("edit", basis and basis.lower(), elements, remove, fmt, input_file, steps, only)
+        edit = functools.partial(_basis.edit_basis, steps=steps, only=only)
+        return await self.run(key, edit, basis, elements, remove, fmt, input_file)
+
+
+_runners: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncRunner]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def default_runner() -> AsyncRunner:
+    """The runner shared by the module-level functions within the running event loop."""
+    loop = asyncio.get_running_loop()
+    if (runner := _runners.get(loop)) is None:
+        runner = _runners[loop] = AsyncRunner()
+    return runner
+
+
+async def count(
+    basis: str,
+    elements: Iterable[int | str] | None = None,
+    use_cache: bool = True,
+) -> BASIS_COUNT:
+    """Asynchronous `basis.basis.count` on the default runner."""
+    return await default_runner().count(basis, elements, use_cache)
+
+
+async def table(
+    basis_sets: list[str],
+    elements: Iterable[int | str] | None = None,
+    diff: bool = False,
+    format: Literal["plain", "csv"] = "plain",
+    spherical: bool = False,
+    *,
+    use_cache: bool = True,
+) -> str:
+    """Asynchronous `basis.basis.table` on the default runner."""
+    return await default_runner().table(
+        basis_sets, elements, diff, format, spherical, use_cache=use_cache
+    )
+
+
+async def edit_basis(
+    basis: str | None,
+    elements: Iterable[int | str] | None = None,
+    remove: Iterable[str] | None = None,
+    fmt: str = "nwchem",
+    input_file: str | None = None,
+    *,
+    steps: Iterable[EditStep] = (),
+    only: Iterable[int | str] | None = None,
+) -> str:
+    """Asynchronous `basis.basis.edit_basis` on the default runner."""
+    return await default_runner().edit_basis(
+        basis, elements, remove, fmt, input_file, steps=steps, only=only
+    )
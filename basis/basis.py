@@ -1,15 +1,42 @@
 """Module for counting basis functions in basis sets using Basis Set Exchange."""
 
+import functools
+import json
+import marshal
 import os
+import stat
+import sys
+import tempfile
+from array import array
 from collections import defaultdict
-from itertools import zip_longest
-from typing import Container, Iterable, Literal, TypeVar
-
-import basis_set_exchange as bse
-from basis_set_exchange import manip, writers
+from itertools import combinations, repeat, zip_longest
+from typing import (
+    IO,
+    Callable,
+    Container,
+    Iterable,
+    Iterator,
+    Literal,
+    Mapping,
+    NamedTuple,
+    TypeVar,
+)
+
+from ._lazy import lazy_import
+from .cache import CacheInfo, DiskCache, LRUCache, cache_key, default_cache
+from .index import load_index
+from .timing import span
+
+bse = lazy_import("basis_set_exchange")
+futures = lazy_import("concurrent.futures")
+hashlib = lazy_import("hashlib")
+# NumPy-backed; only imported for N-way differences
+count_arrays = lazy_import("basis.counts")
 
 # {element: (contracted_counts, uncontracted_counts)}
 BASIS_COUNT = dict[int, tuple[list[int], list[int]]]
+# Immutable form of BASIS_COUNT for memoization: ((element, contracted, uncontracted), ...)
+_FROZEN_COUNT = tuple[tuple[int, tuple[int, ...], tuple[int, ...]], ...]
 
 # fmt:off
 atomic_numbers = [
@@ -30,11 +57,222 @@ cartesian_harmonics_counts = {
 }
 
 
-def count(basis: str) -> BASIS_COUNT:
+class ElementCount:
+    """Compact contracted and uncontracted counts of one element.
+
+    Both lists are packed into one `array("H")` buffer (as in the count index), which takes
+    about a third of the memory of the tuple of lists in `BASIS_COUNT`.  A record unpacks,
+    indexes, and compares like that tuple, so it can stand in for it wherever counts are
+    only read, e.g. in `difference`, `plain_table`, and `csv_table`.
+
+    Examples:
+        >>> record = ElementCount([2, 1], [6, 3])
+        >>> record
+        ElementCount([2, 1], [6, 3])
+        >>> contracted, uncontracted = record
+        >>> contracted, record[1]
+        ([2, 1], [6, 3])
+        >>> record == ([2, 1], [6, 3])
+        True
+    """
+
+    __slots__ = ("_data", "_split")
+
+    def __init__(self, contracted: Iterable[int], uncontracted: Iterable[int]) -> None:
+        """Pack the counts of each angular momentum (each between 0 and 65535)."""
+        data = array("H", contracted)
+        self._split = 2 * len(data)
+        data.extend(uncontracted)
+        self._data = data.tobytes()
+
+    @property
+    def contracted(self) -> list[int]:
+        """Contracted counts of each angular momentum."""
+        return array("H", self._data[: self._split]).tolist()
+
+    @property
+    def uncontracted(self) -> list[int]:
+        """Uncontracted counts of each angular momentum."""
+        return array("H", self._data[self._split :]).tolist()
+
+    def __iter__(self) -> Iterator[list[int]]:
+        """Iterate over the contracted and uncontracted counts."""
+        yield self.contracted
+        yield self.uncontracted
+
+    def __len__(self) -> int:
+        """Two, like the tuple it stands in for."""
+        return 2
+
+    def __getitem__(self, index: int) -> list[int]:
+        """Contracted (0) or uncontracted (1) counts."""
+        return (self.contracted, self.uncontracted)[index]
+
+    def __eq__(self, other: object) -> bool:
+        """Compare with another record or a tuple of contracted and uncontracted counts."""
+        if isinstance(other, ElementCount):
+            return self._split == other._split and self._data == other._data
+        if isinstance(other, tuple):
+            return tuple(self) == other
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        """Hash of the packed counts."""
+        return hash((self._split, self._data))
+
+    def __repr__(self) -> str:
+        """Representation that evaluates to an equal record."""
+        return f"{type(self).__name__}({self.contracted}, {self.uncontracted})"
+
+    def __reduce__(self) -> tuple:
+        """Pickle as the counts, for process pools."""
+        return type(self), (self.contracted, self.uncontracted)
+
+
+# Compact form of BASIS_COUNT, for holding the counts of many basis sets in memory
+COMPACT_COUNT = dict[int, ElementCount]
+# Either form, as read by difference and the table functions
+ANY_COUNT = BASIS_COUNT | COMPACT_COUNT
+
+
+def compact_counts(counts: BASIS_COUNT) -> COMPACT_COUNT:
+    """Pack the counts of each element into an `ElementCount`.
+
+    Examples:
+        >>> compact_counts(count("sto-3g", ["H", "C"]))
+        {1: ElementCount([1], [3]), 6: ElementCount([2, 1], [6, 3])}
+    """
+    return {element: ElementCount(con, uncon) for element, (con, uncon) in counts.items()}
+
+
+# In-process memoization of loaded basis sets and their counts, sized by $BASIS_MEMO_SIZE
+_basis_memo = LRUCache(int(os.environ.get("BASIS_MEMO_SIZE", "16")))
+_count_memo = LRUCache(8 * _basis_memo.maxsize)
+
+
+def cache_info() -> dict[str, CacheInfo]:
+    """Hit/miss statistics of the in-process memoization of `load_basis` and `count`."""
+    return {"load_basis": _basis_memo.cache_info(), "count": _count_memo.cache_info()}
+
+
+def cache_clear() -> None:
+    """Empty the in-process memoization of `load_basis` and `count`."""
+    _basis_memo.cache_clear()
+    _count_memo.cache_clear()
+
+
+def configure_memo(basis_maxsize: int | None = None, count_maxsize: int | None = None) -> None:
+    """Resize the in-process memoization; a size of 0 disables it.
+
+    Args:
+        basis_maxsize: number of loaded basis sets to keep
+        count_maxsize: number of basis set counts to keep
+    """
+    if basis_maxsize is not None:
+        _basis_memo.maxsize = basis_maxsize
+    if count_maxsize is not None:
+        _count_memo.maxsize = count_maxsize
+
+
+def load_basis(basis: str, elements: Iterable[int | str] | None = None) -> dict:
+    """Load a basis set from the Basis Set Exchange, memoized within the process.
+
+    Each call returns a fresh copy, so callers are free to modify the result.
+
+    Args:
+        basis: BSE basis set name
+        elements: elements to load (elements missing from the basis set are skipped);
+            `None` loads all elements
+
+    Returns:
+        BSE basis set dictionary
+    """
+    return marshal.loads(_load_basis_data(basis, elements))
+
+
+def _load_basis_data(basis: str, elements: Iterable[int | str] | None = None) -> bytes:
+    """The marshalled basis set, as memoized by `load_basis`."""
+    if elements is not None:
+        available = basis_elements(basis)
+        elements = tuple(element for element in parse_elements(elements) if element in available)
+
+    key = (basis.lower(), elements)
+    if (data := _basis_memo.get(key)) is None:
+        if elements == ():
+            # BSE loads every element when given an empty selection
+            basis_dict = _empty_basis(basis)
+        else:
+            with span("bse.get_basis"):
+                basis_dict = bse.get_basis(
+                    basis, elements=None if elements is None else list(elements)
+                )
+        # marshal round-trips are considerably faster than copy.deepcopy
+        data = marshal.dumps(basis_dict)
+        _basis_memo.set(key, data)
+    return data
+
+
+def _empty_basis(basis: str) -> dict:
+    """A basis set without any elements, built from the BSE metadata alone."""
+    metadata = bse.get_metadata()[bse.misc.transform_basis_name(basis)]
+    version = metadata["latest_version"]
+    return {
+        "molssi_bse_schema": {"schema_type": "complete", "schema_version": "0.1"},
+        "revision_description": metadata["versions"][version]["revdesc"],
+        "revision_date": metadata["versions"][version]["revdate"],
+        "version": version,
+        "function_types": [],
+        "names": [metadata["display_name"], *metadata["other_names"]],
+        "tags": metadata["tags"],
+        "family": metadata["family"],
+        "description": metadata["description"],
+        "role": metadata["role"],
+        "auxiliaries": metadata["auxiliaries"],
+        "name": metadata["display_name"],
+        "elements": {},
+    }
+
+
+@functools.cache
+def basis_elements(basis: str) -> frozenset[int]:
+    """Atomic numbers of the elements in (the latest version of) a basis set.
+
+    Read from the BSE metadata, without loading the basis set itself.
+
+    Raises:
+        KeyError: basis set does not exist
+
+    Examples:
+        >>> sorted(basis_elements("sto-3g"))[:5]
+        [1, 2, 3, 4, 5]
+    """
+    metadata = bse.get_metadata()
+    if (name := bse.misc.transform_basis_name(basis)) not in metadata:
+        raise KeyError(f"Basis set {basis} does not exist")
+    versions = metadata[name]["versions"]
+    return frozenset(map(int, versions[metadata[name]["latest_version"]]["elements"]))
+
+
+def count(
+    basis: str,
+    elements: Iterable[int | str] | None = None,
+    use_cache: bool = True,
+) -> BASIS_COUNT:
     """Count the number of contracted and uncontracted basis functions in a basis set.
 
+    Counts are memoized within the process and stored in the persistent cache (see
+    `basis.cache`), keyed by basis name and BSE version, so that repeated calls skip the
+    Basis Set Exchange entirely.  When a prebuilt index (see `basis.index`) matching the
+    installed BSE version is available, counts are served from it.  Each call returns a
+    fresh copy.
+
+    When *elements* is given, only those elements are loaded and counted.  Counts of the
+    whole basis set that are already cached are filtered instead.
+
     Args:
         basis: basis set to count
+        elements: elements to count; `None` counts all elements in the basis set
+        use_cache: read from the index and read from and write to the persistent cache
 
     Returns:
         Mapping of element to tuple of contracted and uncontracted counts
@@ -43,10 +281,153 @@ def count(basis: str) -> BASIS_COUNT:
         >>> sto3g = count("sto-3g")
         >>> sto3g[1], sto3g[6], sto3g[9], sto3g[18]
         (([1], [3]), ([2, 1], [6, 3]), ([2, 1], [6, 3]), ([3, 2], [9, 6]))
+        >>> count("def2-svp", ["H", "C"])
+        {1: ([2, 1], [4, 1]), 6: ([3, 2, 1], [7, 4, 1])}
+    """
+    selection = None if elements is None else tuple(parse_elements(elements))
+    if (counts := _memoized_count(basis, selection)) is not None:
+        return counts
+
+    with span("count"):
+        key = _count_key(basis, selection)
+        with span("count: lookup"):
+            index = load_index() if use_cache else None
+            store = default_cache() if use_cache else None
+            if index is not None and basis in index:
+                counts = index.counts(basis, selection)
+            elif store is not None:
+                counts = _stored_count(store, basis, selection)
+
+        if counts is None:
+            basis_dict = load_basis(basis, selection)
+            with span("count_basis_dict"):
+                counts = count_basis_dict(basis_dict)
+            if store is not None:
+                with span("count: store"):
+                    store.set(key, _encode_counts(counts))
+
+        _count_memo.set(key, _freeze_counts(counts))
+    return counts
+
+
+def _count_key(basis: str, selection: tuple[int, ...] | None = None) -> str:
+    if selection is not None:
+        basis = f"{basis}[{','.join(map(str, selection))}]"
+    return cache_key("count", basis)
+
+
+def _select(counts: BASIS_COUNT, selection: tuple[int, ...] | None) -> BASIS_COUNT:
+    return counts if selection is None else filter_unused_elements(counts, selection)
+
+
+def _memoized_count(basis: str, selection: tuple[int, ...] | None) -> BASIS_COUNT | None:
+    # Counts of the whole basis set answer any selection
+    for key in dict.fromkeys((_count_key(basis, selection), _count_key(basis))):
+        if (frozen := _count_memo.get(key)) is not None:
+            return _select(_thaw_counts(frozen), selection)
+    return None
+
+
+def _stored_count(
+    store: DiskCache, basis: str, selection: tuple[int, ...] | None
+) -> BASIS_COUNT | None:
+    for key in dict.fromkeys((_count_key(basis, selection), _count_key(basis))):
+        if (cached := store.get(key)) is not None:
+            return _select(_decode_counts(cached), selection)
+    return None
+
+
+def count_many(
+    basis_sets: Iterable[str],
+    elements: Iterable[int | str] | None = None,
+    workers: int | None = 1,
+    use_cache: bool = True,
+) -> dict[str, BASIS_COUNT]:
+    """Count several basis sets, optionally fanning out over a pool of worker processes.
+
+    Basis sets already memoized in this process are never sent to the pool, and the
+    results from the pool are memoized here.
+
+    Args:
+        basis_sets: basis sets to count
+        elements: elements to count; `None` counts all elements in each basis set
+        workers: number of worker processes; 1 counts serially in this process and `None`
+            uses one process per CPU
+        use_cache: read from the index and read from and write to the persistent cache
+
+    Returns:
+        Mapping of basis set to its counts, in the order of *basis_sets*
+
+    Raises:
+        ValueError: fewer than one worker requested
+
+    Examples:
+        >>> counts = count_many(["sto-3g", "sto-6g"])
+        >>> list(counts), counts["sto-6g"][6]
+        (['sto-3g', 'sto-6g'], ([2, 1], [12, 6]))
+    """
+    return dict(iter_count_many(basis_sets, elements, workers, use_cache))
+
+
+def iter_count_many(
+    basis_sets: Iterable[str],
+    elements: Iterable[int | str] | None = None,
+    workers: int | None = 1,
+    use_cache: bool = True,
+) -> Iterator[tuple[str, BASIS_COUNT]]:
+    """Count several basis sets, yielding each as soon as it (and those before it) is done.
+
+    Arguments as for `count_many`.
+
+    Yields:
+        Basis set and its counts, in the order of *basis_sets*
+
+    Raises:
+        ValueError: fewer than one worker requested
+    """
+    if workers is not None and workers < 1:
+        raise ValueError(f"Need at least one worker, got: {workers=}")
+
+    basis_sets = list(basis_sets)
+    selection = None if elements is None else tuple(parse_elements(elements))
+    if workers == 1:
+        for basis in basis_sets:
+            yield basis, count(basis, selection, use_cache)
+        return
+
+    memoized: dict[str, BASIS_COUNT] = {}
+    for basis in basis_sets:
+        if (basis_counts := _memoized_count(basis, selection)) is not None:
+            memoized[basis] = basis_counts
+    pending = [basis for basis in dict.fromkeys(basis_sets) if basis not in memoized]
+
+    executor = futures.ProcessPoolExecutor(max_workers=workers) if len(pending) > 1 else None
+    try:
+        mapper = executor.map if executor is not None else map
+        # Results arrive in the order of pending, i.e. of first appearance in basis_sets
+        results = mapper(count, pending, repeat(selection), repeat(use_cache))
+        for basis in basis_sets:
+            if basis not in memoized:
+                memoized[basis] = next(results)
+                if executor is not None:
+                    _count_memo.set(_count_key(basis, selection), _freeze_counts(memoized[basis]))
+            yield basis, memoized[basis]
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+
+def count_basis_dict(basis_dict: dict) -> BASIS_COUNT:
+    """Count the number of contracted and uncontracted basis functions in a basis set dict.
+
+    Args:
+        basis_dict: BSE basis set dictionary (from bse.get_basis or bse.read_formatted_basis_*)
+
+    Returns:
+        Mapping of element to tuple of contracted and uncontracted counts
     """
-    data = bse.get_basis(basis)["elements"]
     counts = {}
-    for element, values in data.items():
+    for element, values in basis_dict["elements"].items():
         contracted: dict[int, int] = defaultdict(int)
         uncontracted: dict[int, int] = defaultdict(int)
         for function in values["electron_shells"]:
@@ -76,6 +457,22 @@ def count(basis: str) -> BASIS_COUNT:
     return counts
 
 
+def _freeze_counts(counts: BASIS_COUNT) -> _FROZEN_COUNT:
+    return tuple((element, tuple(con), tuple(uncon)) for element, (con, uncon) in counts.items())
+
+
+def _thaw_counts(frozen: _FROZEN_COUNT) -> BASIS_COUNT:
+    return {element: (list(con), list(uncon)) for element, con, uncon in frozen}
+
+
+def _encode_counts(counts: BASIS_COUNT) -> bytes:
+    return json.dumps({element: [con, uncon] for element, (con, uncon) in counts.items()}).encode()
+
+
+def _decode_counts(data: bytes) -> BASIS_COUNT:
+    return {int(element): (con, uncon) for element, (con, uncon) in json.loads(data).items()}
+
+
 def count_atomic_basis_functions(contracted_counts: list[int]) -> list[int]:
     """Count the resulting number of atomic basis functions from the basis set.
 
@@ -133,7 +530,7 @@ def spherical_count(basis_counts: BASIS_COUNT) -> BASIS_COUNT:
     }
 
 
-def find_max_am(counts: dict[str, BASIS_COUNT]) -> int:
+def find_max_am(counts: Mapping[str, ANY_COUNT]) -> int:
     """Find the maximum angular momentum in a basis set.
 
     Args:
@@ -196,7 +593,7 @@ def filter_unused_elements_multi(
     }
 
 
-def difference(basis1: BASIS_COUNT, basis2: BASIS_COUNT) -> BASIS_COUNT:
+def difference(basis1: ANY_COUNT, basis2: ANY_COUNT) -> BASIS_COUNT:
     """Find the difference between basis sets.
 
     Args:
@@ -233,6 +630,11 @@ def table(
     diff: bool = False,
     format: Literal["plain", "csv"] = "plain",
     spherical: bool = False,
+    *,
+    diff_ref: str | None = None,
+    diff_matrix: bool = False,
+    workers: int | None = 1,
+    use_cache: bool = True,
 ) -> str:
     """Generate a table of basis set counts.
 
@@ -242,12 +644,18 @@ def table(
         diff: include a difference column
         format: output format
         spherical: show spherical basis function counts instead of contracted/uncontracted
+        diff_ref: include a column of the difference of every other basis set from this
+            one (added to *basis_sets* if missing)
+        diff_matrix: include a column of the difference of every pair of basis sets
+        workers: number of processes to count basis sets with (see `count_many`)
+        use_cache: read counts from the index and the persistent cache
 
     Returns:
         Table
 
     Raises:
-        ValueError: diff requested for other than two basis sets, or unsupported format
+        ValueError: diff requested for other than two basis sets, more than one kind of
+            difference requested, unsupported format, or fewer than one worker
 
     Examples:
         >>> print(table(["sto-3g", "sto-6g"], [1, 6, 9, 18], diff=True))
@@ -261,90 +669,165 @@ def table(
         --------------------------------------------------
         Ar |  9  6 →  3  2 | 18 12 →  3  2 |  9  6 →  0  0
     """
-    counts: dict[str, BASIS_COUNT] = {basis: count(basis) for basis in basis_sets}
+    with span("table"):
+        return "\n".join(
+            iter_table(
+                basis_sets,
+                elements,
+                diff,
+                format,
+                spherical,
+                diff_ref=diff_ref,
+                diff_matrix=diff_matrix,
+                workers=workers,
+                use_cache=use_cache,
+            )
+        )
 
-    if spherical:
-        counts = {basis: spherical_count(basis_counts) for basis, basis_counts in counts.items()}
+
+def iter_table(
+    basis_sets: list[str],
+    elements: Iterable[int | str] | None = None,
+    diff: bool = False,
+    format: Literal["plain", "csv"] = "plain",
+    spherical: bool = False,
+    *,
+    diff_ref: str | None = None,
+    diff_matrix: bool = False,
+    workers: int | None = 1,
+    use_cache: bool = True,
+) -> Iterator[str]:
+    """Generate a table of basis set counts line by line (without line endings).
+
+    Arguments as for `table`.  CSV rows are yielded as soon as each basis set has been
+    counted; the plain layout needs every count up front to size its columns.
+
+    Difference columns are labelled `b - a` for the counts of *b* minus those of *a*.
+
+    Yields:
+        Lines of the table
+
+    Raises:
+        ValueError: diff requested for other than two basis sets, more than one kind of
+            difference requested, unsupported format, or fewer than one worker
+    """
+    if format not in {"plain", "csv"}:
+        raise ValueError(f"Unsupported format: {format}")
+    if diff + (diff_ref is not None) + diff_matrix > 1:
+        raise ValueError("Only one of diff, diff_ref, and diff_matrix can be requested")
+
+    basis_sets = list(basis_sets)
+    if diff_ref is not None:
+        matches = [basis for basis in basis_sets if basis.lower() == diff_ref.lower()]
+        if matches:
+            diff_ref = matches[0]
+        else:
+            basis_sets.insert(0, diff_ref)
 
     if elements is None:
         element_list = list(range(1, 37))
     else:
         element_list = sorted(parse_elements(elements))
 
-    counts = filter_unused_elements_multi(counts, element_list)
+    counted = iter_count_many(basis_sets, element_list, workers, use_cache)
+    if spherical:
+        counted = ((basis, spherical_count(basis_counts)) for basis, basis_counts in counted)
+
+    n_way = diff_ref is not None or diff_matrix
+    if format == "csv" and not (diff or n_way):
+        yield csv_header(spherical)
+        for basis, basis_counts in counted:
+            yield from iter_csv_table({basis: basis_counts}, element_list, spherical, header=False)
+        return
+
+    counts = filter_unused_elements_multi(dict(counted), element_list)
 
     if diff:
         if len(counts) != 2:
             raise ValueError(f"Can only compare two basis sets at a time, got: {len(basis_sets)=}")
 
         counts["Δ"] = difference(*(counts.values()))
-        basis_sets += ["Δ"]
+    elif n_way:
+        if diff_ref is not None:
+            pairs = [(diff_ref, basis) for basis in counts if basis != diff_ref]
+        else:
+            pairs = list(combinations(counts, 2))
+        deltas = count_arrays.pairwise_differences(counts, pairs, element_list)
+        counts |= {f"{b} - {a}": delta for (a, b), delta in deltas.items()}
 
-    match format:
-        case "plain":
-            return plain_table(counts, element_list, spherical)
-        case "csv":
-            return csv_table(counts, element_list, spherical)
-        case _:
-            raise ValueError(f"Unsupported format: {format}")
+    if format == "plain":
+        yield from iter_plain_table(counts, element_list, spherical)
+    else:
+        yield from iter_csv_table(counts, element_list, spherical)
 
 
 def plain_table(
-    counts: dict[str, BASIS_COUNT],
+    counts: Mapping[str, ANY_COUNT],
     element_list: list[int],
     spherical: bool = False,
 ) -> str:
     """Generate a plain text table of basis set counts."""
+    return "\n".join(iter_plain_table(counts, element_list, spherical))
+
+
+def iter_plain_table(
+    counts: Mapping[str, ANY_COUNT],
+    element_list: list[int],
+    spherical: bool = False,
+) -> Iterator[str]:
+    """Generate a plain text table of basis set counts line by line."""
     max_am = find_max_am(counts)
+    am_labels = f"  {'  '.join(spherical_harmonics[:max_am])}"
+    # Columns widen to fit long basis set names (e.g. difference labels)
+    name_width = max(map(len, counts), default=0)
 
     # Header
     if spherical:
-        BASIS_WIDTH = 3 * max_am + 1
-        HLINE = "-" * (len(counts) * (BASIS_WIDTH + 1) + 2) + "\n"
+        BASIS_WIDTH = max(3 * max_am + 1, name_width)
+        HLINE = "-" * (len(counts) * (BASIS_WIDTH + 1) + 2)
 
-        out = "   |" + "|".join(f"{basis:^{BASIS_WIDTH}s}" for basis in counts) + "\n"
-        out += "  " + f" |  {'  '.join(spherical_harmonics[:max_am])}" * len(counts) + "\n"
+        yield "   |" + "|".join(f"{basis:^{BASIS_WIDTH}s}" for basis in counts)
+        yield "  " + f" |{am_labels:{BASIS_WIDTH - 1}}" * len(counts)
     else:
         # Normal mode: show both uncontracted and contracted with arrow
-        BASIS_WIDTH = 6 * max_am + 3
+        BASIS_WIDTH = max(6 * max_am + 3, name_width)
         COL_WIDTH = 3 * max_am
-        HLINE = "-" * (len(counts) * (BASIS_WIDTH + 1) + 2) + "\n"
+        HLINE = "-" * (len(counts) * (BASIS_WIDTH + 1) + 2)
 
-        out = "   |" + "|".join(f"{basis:^{BASIS_WIDTH}s}" for basis in counts) + "\n"
-        out += "  " + f" |  {'  '.join(spherical_harmonics[:max_am])}" * 2 * len(counts) + "\n"
+        yield "   |" + "|".join(f"{basis:^{BASIS_WIDTH}s}" for basis in counts)
+        yield "  " + f" |{am_labels} |{am_labels:{BASIS_WIDTH - COL_WIDTH - 4}}" * len(counts)
 
     row = 0
     rows = [0, 2, 10, 18, 36, 54, 86]
 
     def count_str(element: int, basis: str) -> str:
         if element not in counts[basis]:
-            return " " * BASIS_WIDTH
+            return " " * (BASIS_WIDTH - 1)
 
         contracted = counts[basis][element][0]
 
         if spherical:
             # Pad contracted list to max_am length and show blank spaces for zero counts
             padded = contracted + [0] * (max_am - len(contracted))
-            return "".join(f"{c:>3d}" if c else "   " for c in padded)
+            cell = "".join(f"{c:>3d}" if c else "   " for c in padded)
         else:
             uncontracted = counts[basis][element][1]
             con = "".join(f"{c:>3d}" for c in contracted)
             uncon = "".join(f"{c:>3d}" for c in uncontracted)
-            return f"{uncon:<{COL_WIDTH}} →{con:<{COL_WIDTH}}"
+            cell = f"{uncon:<{COL_WIDTH}} →{con:<{COL_WIDTH}}"
+        return f"{cell:{BASIS_WIDTH - 1}}"
 
     for element in element_list:
         if element > rows[row]:
-            out += HLINE
+            yield HLINE
             row = searchsorted(element, rows)
-        out += f"{atomic_numbers[element]:2} |"
 
-        out += " |".join(count_str(element, basis) for basis in counts).rstrip() + "\n"
-
-    return out.rstrip()
+        line = " |".join(count_str(element, basis) for basis in counts)
+        yield f"{atomic_numbers[element]:2} |{line}".rstrip()
 
 
 def csv_table(
-    counts: dict[str, BASIS_COUNT],
+    counts: Mapping[str, ANY_COUNT],
     element_list: list[int],
     spherical: bool = False,
 ) -> str:
@@ -363,33 +846,41 @@ def csv_table(
         def2-svp,9,"[3, 2, 1]","[7, 4, 1]"
         def2-svp,18,"[4, 3, 1]","[10, 7, 1]"
     """
+    return "\n".join(iter_csv_table(counts, element_list, spherical))
+
+
+def csv_header(spherical: bool = False) -> str:
+    """Header row of a CSV table of basis set counts."""
+    if spherical:
+        return "basis,element,spherical"
+    return "basis,element,contracted,uncontracted"
+
+
+def iter_csv_table(
+    counts: Mapping[str, ANY_COUNT],
+    element_list: list[int],
+    spherical: bool = False,
+    header: bool = True,
+) -> Iterator[str]:
+    """Generate a CSV table of basis set counts row by row."""
 
     def _quote(value: list[int]) -> str:
         field = str(value).replace('"', '\\"')
         return f'"{field}"'
 
-    if spherical:
-        rows = ["basis,element,spherical"]
-        for basis, basis_counts in counts.items():
-            for element in element_list:
-                if element not in basis_counts:
-                    continue
-
-                contracted, _uncontracted = basis_counts[element]
-                rows.append(f"{basis},{element},{_quote(contracted)}")
-    else:
-        rows = ["basis,element,contracted,uncontracted"]
-        for basis, basis_counts in counts.items():
-            for element in element_list:
-                if element not in basis_counts:
-                    continue
-
-                contracted, uncontracted = basis_counts[element]
-                rows.append(
-                    f"{basis},{element},{_quote(contracted)},{_quote(uncontracted)}",
-                )
+    if header:
+        yield csv_header(spherical)
+
+    for basis, basis_counts in counts.items():
+        for element in element_list:
+            if element not in basis_counts:
+                continue
 
-    return "\n".join(rows)
+            contracted, uncontracted = basis_counts[element]
+            if spherical:
+                yield f"{basis},{element},{_quote(contracted)}"
+            else:
+                yield f"{basis},{element},{_quote(contracted)},{_quote(uncontracted)}"
 
 
 def element_to_an(element: int | str) -> int:
@@ -506,8 +997,12 @@ def remove_angular_momentum(
 ) -> dict:
     """Remove shells with specified angular momenta from a basis set dictionary.
 
-    Multi-angular-momentum shells (e.g. sp, spd) are split into single-AM shells
-    before filtering so that only the targeted AM is removed.
+    Multi-angular-momentum shells (e.g. sp, spd) that include a removed angular momentum
+    are split into single-AM shells so that only the targeted AM is removed.
+
+    Only the edited elements are copied: the result shares the other elements, and the
+    shells that are kept whole, with *basis_dict*, so that the cost of an edit scales with
+    the number of edited elements.  Neither should be modified in place afterwards.
 
     Args:
         basis_dict: BSE basis set dictionary (from bse.get_basis or bse.read_formatted_basis_*)
@@ -516,17 +1011,39 @@ def remove_angular_momentum(
 
     Returns:
         New basis set dictionary with specified shells removed from target elements
+
+    Examples:
+        >>> sto3g = load_basis("sto-3g", ["H", "C"])
+        >>> result = remove_angular_momentum(sto3g, {1}, {6})
+        >>> [shell["angular_momentum"] for shell in result["elements"]["6"]["electron_shells"]]
+        [[0], [0]]
+        >>> result["elements"]["1"] is sto3g["elements"]["1"]
+        True
     """
-    result = manip.uncontract_spdf(basis_dict)
-    for z, element_data in result["elements"].items():
-        if elements is not None and int(z) not in elements:
-            continue
-        element_data["electron_shells"] = [
-            shell
-            for shell in element_data["electron_shells"]
-            if not set(shell["angular_momentum"]).issubset(am_to_remove)
-        ]
-    return result
+    with span("remove shells"):
+        edited = {
+            z: {
+                **element_data,
+                "electron_shells": list(
+                    _remove_shells(element_data["electron_shells"], am_to_remove)
+                ),
+            }
+            for z, element_data in basis_dict["elements"].items()
+            if (elements is None or int(z) in elements) and "electron_shells" in element_data
+        }
+    return {**basis_dict, "elements": {**basis_dict["elements"], **edited}}
+
+
+def _remove_shells(shells: list[dict], am_to_remove: set[int]) -> Iterator[dict]:
+    for shell in shells:
+        angular_momenta = shell["angular_momentum"]
+        if am_to_remove.isdisjoint(angular_momenta):
+            yield shell
+        elif len(angular_momenta) > 1:
+            # One set of coefficients per angular momentum, sharing the exponents
+            for am, coefficients in zip(angular_momenta, shell["coefficients"], strict=True):
+                if am not in am_to_remove:
+                    yield {**shell, "angular_momentum": [am], "coefficients": [coefficients]}
 
 
 # BSE assigns each writer a recommended extension, but several formats share one
@@ -539,17 +1056,22 @@ _EXTENSION_FORMAT_PREFERENCES = {
 }
 
 
+@functools.cache
 def _build_extension_format_map() -> dict[str, str]:
     """Build a mapping of lowercased file extension -> BSE writer format key."""
     mapping: dict[str, str] = {}
     for fmt in bse.get_writer_formats():
-        ext = writers.get_format_extension(fmt).lower()
+        ext = bse.writers.get_format_extension(fmt).lower()
         mapping.setdefault(ext, fmt)
     mapping.update(_EXTENSION_FORMAT_PREFERENCES)
     return mapping
 
 
-EXTENSION_TO_FORMAT = _build_extension_format_map()
+def __getattr__(name: str) -> dict[str, str]:
+    """Build `EXTENSION_TO_FORMAT` on first access, as it requires importing BSE."""
+    if name == "EXTENSION_TO_FORMAT":
+        return _build_extension_format_map()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def guess_format(path: str) -> str | None:
@@ -572,7 +1094,14 @@ def guess_format(path: str) -> str | None:
         True
     """
     ext = os.path.splitext(path)[1].lower()
-    return EXTENSION_TO_FORMAT.get(ext) if ext else None
+    return _build_extension_format_map().get(ext) if ext else None
+
+
+class EditStep(NamedTuple):
+    """One round of editing: remove angular momentum types from (some) elements."""
+
+    elements: Iterable[int | str] | None
+    remove: Iterable[str]
 
 
 def edit_basis(
@@ -581,6 +1110,9 @@ def edit_basis(
     remove: Iterable[str] | None = None,
     fmt: str = "nwchem",
     input_file: str | None = None,
+    *,
+    steps: Iterable[EditStep] = (),
+    only: Iterable[int | str] | None = None,
 ) -> str:
     """Fetch or read a basis set, optionally remove angular momentum types, and format it.
 
@@ -591,12 +1123,20 @@ def edit_basis(
     When *elements* is specified, AM removal applies only to those elements; all other
     elements in the basis set are written unchanged.
 
+    Further rounds of editing can be chained with *steps*; they are applied in order,
+    after *elements*/*remove*, to the same in-memory basis set, which is formatted once.
+
+    When *only* is specified, just those elements are loaded (through the BSE element
+    filter) and written; elements missing from the basis set are skipped.
+
     Args:
         basis: BSE basis set name; required when *input_file* is not provided
         elements: elements whose shells will be edited; `None` edits all elements
         remove: angular momentum letter labels to remove (e.g. `['f', 'g']`)
         fmt: output format key accepted by BSE (default `'nwchem'`)
         input_file: path to local formatted basis set file to read instead of BSE
+        steps: further edits to apply in order
+        only: elements to load and write; `None` writes every element
 
     Returns:
         Formatted basis set string
@@ -608,20 +1148,244 @@ def edit_basis(
         >>> result = edit_basis("sto-3g", elements=["H", "C"], remove=["p"], fmt="nwchem")
         >>> "H    S" in result and "C    P" not in result
         True
+        >>> steps = [EditStep(["C"], ["p"]), EditStep(["N"], ["p"])]
+        >>> result = edit_basis("sto-3g", steps=steps)
+        >>> "C    P" in result or "N    P" in result
+        False
+        >>> result = edit_basis("sto-3g", only=["H", "C"])
+        >>> "C    SP" in result and "N    SP" not in result
+        True
     """
-    if input_file is not None:
-        basis_dict: dict = bse.read_formatted_basis_file(input_file)
+    steps = [EditStep(elements, remove or ()), *steps]
+    basis_dict = _read_and_edit(basis, input_file, steps, only)
+    with span("bse.write_formatted_basis_str"):
+        return bse.write_formatted_basis_str(basis_dict, fmt)
+
+
+def edit_basis_files(
+    basis: str | None,
+    outputs: dict[str, str],
+    elements: Iterable[int | str] | None = None,
+    remove: Iterable[str] | None = None,
+    input_file: str | None = None,
+    *,
+    steps: Iterable[EditStep] = (),
+    only: Iterable[int | str] | None = None,
+    workers: int | None = None,
+) -> None:
+    """Edit a basis set once and write it to several files (see `write_basis_files`).
+
+    Arguments as for `edit_basis`, with *outputs* mapping each output path to its format
+    and *workers* the number of processes to format with.
+    """
+    steps = [EditStep(elements, remove or ()), *steps]
+    write_basis_files(_read_and_edit(basis, input_file, steps, only), outputs, workers)
+
+
+def _read_and_edit(
+    basis: str | None,
+    input_file: str | None,
+    steps: Iterable[EditStep],
+    only: Iterable[int | str] | None,
+) -> dict:
+    basis_dict = read_basis(basis, input_file, only)
+    for step in steps:
+        basis_dict = edit_basis_dict(basis_dict, step.elements, step.remove)
+    return basis_dict
+
+
+def _file_mode(path: str) -> int:
+    """The permissions of *path*, or those of a new file under the current umask."""
+    try:
+        return stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        umask = os.umask(0)
+        os.umask(umask)
+        return 0o666 & ~umask
+
+
+def write_atomic(
+    path: str | os.PathLike, data: str | bytes | Callable[[IO[bytes]], object]
+) -> None:
+    """Write *data* to *path* through a temporary file, so that a partial file never appears.
+
+    An existing file keeps its permissions, and a symbolic link is kept and its target
+    replaced.
+
+    Args:
+        path: output file
+        data: text (written as UTF-8), bytes, or a function writing to the binary file
+            it is given
+
+    Examples:
+        >>> import pathlib
+        >>> path = pathlib.Path(tempfile.mkdtemp()) / "basis.nw"
+        >>> write_atomic(path, "BASIS")
+        >>> path.read_text(), [p.name for p in path.parent.iterdir()]
+        ('BASIS', ['basis.nw'])
+    """
+    path = os.path.realpath(path)
+    directory, name = os.path.split(path)
+    with tempfile.NamedTemporaryFile(
+        dir=directory, prefix=f".{name}.", suffix=".tmp", delete=False
+    ) as fh:
+        try:
+            if callable(data):
+                data(fh)
+            else:
+                fh.write(data.encode() if isinstance(data, str) else data)
+        except BaseException:
+            fh.close()
+            os.unlink(fh.name)
+            raise
+    os.chmod(fh.name, _file_mode(path))
+    os.replace(fh.name, path)
+
+
+def _write_formatted(data: bytes, path: str, fmt: str) -> None:
+    with span(f"write {fmt}"):
+        write_atomic(path, bse.write_formatted_basis_str(marshal.loads(data), fmt))
+
+
+def write_basis_files(
+    basis_dict: dict,
+    outputs: dict[str, str],
+    workers: int | None = None,
+) -> None:
+    """Write a basis set to several files, formatting them in parallel.
+
+    Each file is written atomically (see `write_atomic`); a failing writer does not stop
+    the others, and the first failure is raised once all have finished.
+
+    Args:
+        basis_dict: BSE basis set dictionary
+        outputs: mapping of output path to BSE writer format
+        workers: number of worker processes; 1 writes serially in this process and `None`
+            uses one process per output, up to one per CPU
+
+    Raises:
+        ValueError: fewer than one worker requested
+    """
+    if workers is not None and workers < 1:
+        raise ValueError(f"Need at least one worker, got: {workers=}")
+    if workers is None:
+        workers = min(len(outputs), os.cpu_count() or 1)
+
+    data = marshal.dumps(basis_dict)
+    errors = []
+    if workers == 1 or len(outputs) < 2:
+        for path, fmt in outputs.items():
+            try:
+                _write_formatted(data, path, fmt)
+            except Exception as e:
+                errors.append(e)
     else:
-        if basis is None:
-            raise ValueError("Either 'basis' or 'input_file' must be provided")
-        basis_dict = bse.get_basis(basis)
+        with futures.ProcessPoolExecutor(max_workers=workers) as executor:
+            pending = [
+                executor.submit(_write_formatted, data, path, fmt) for path, fmt in outputs.items()
+            ]
+            errors = [e for future in pending if (e := future.exception()) is not None]
+    if errors:
+        raise errors[0]
+
+
+def read_basis(
+    basis: str | None,
+    input_file: str | None = None,
+    only: Iterable[int | str] | None = None,
+) -> dict:
+    """Read a basis set from a local file, or fetch it from the Basis Set Exchange by name.
+
+    Args:
+        basis: BSE basis set name; required when *input_file* is not provided
+        input_file: path to local formatted basis set file to read instead of BSE
+        only: elements to read (elements missing from the basis set are skipped); `None`
+            reads all elements
+
+    Returns:
+        BSE basis set dictionary
+
+    Raises:
+        ValueError: neither `basis` nor `input_file` is provided
+    """
+    if input_file is not None:
+        basis_dict = read_basis_file(input_file)
+        if only is not None:
+            selection = set(map(str, parse_elements(only)))
+            basis_dict["elements"] = {
+                z: data for z, data in basis_dict["elements"].items() if z in selection
+            }
+        return basis_dict
+    if basis is None:
+        raise ValueError("Either 'basis' or 'input_file' must be provided")
+    return load_basis(basis, only)
+
+
+def read_basis_file(input_file: str, use_cache: bool = True) -> dict:
+    """Read a formatted basis set file, skipping the parsing when its content is unchanged.
+
+    Parsed basis sets are kept in the in-process memo and the persistent cache under a
+    hash of the file's content and extension (from which BSE picks its reader), so any
+    change to the file reads it afresh.
+
+    Args:
+        input_file: path to local formatted basis set file
+        use_cache: read from and write to the persistent cache
+
+    Returns:
+        BSE basis set dictionary
+    """
+    with open(input_file, "rb") as fh:
+        content = fh.read()
+    suffixes = "".join(os.path.basename(input_file).partition(".")[1:])
+    digest = hashlib.blake2b(suffixes.encode() + b"\0" + content, digest_size=20).hexdigest()
+    # The marshal format may change between Python versions
+    key = cache_key("parsed", f"{digest}:py{sys.version_info[0]}.{sys.version_info[1]}")
+
+    if (data := _basis_memo.get(key)) is not None:
+        return marshal.loads(data)
+
+    store = default_cache() if use_cache else None
+    if store is not None and (data := store.get(key)) is not None:
+        try:
+            basis_dict = marshal.loads(data)
+        except (EOFError, TypeError, ValueError):
+            # A damaged entry is parsed afresh and overwritten
+            pass
+        else:
+            _basis_memo.set(key, data)
+            return basis_dict
+
+    with span("bse.read_formatted_basis_file"):
+        basis_dict = bse.read_formatted_basis_file(input_file)
+    data = marshal.dumps(basis_dict)
+    if store is not None:
+        store.set(key, data)
+    _basis_memo.set(key, data)
+    return basis_dict
+
+
+def edit_basis_dict(
+    basis_dict: dict,
+    elements: Iterable[int | str] | None = None,
+    remove: Iterable[str] | None = None,
+) -> dict:
+    """Remove angular momentum types from (some elements of) a basis set dictionary.
 
-    if remove:
-        element_set = set(parse_elements(elements)) if elements is not None else None
-        am_to_remove = {am_letter_to_int(letter) for letter in remove}
-        basis_dict = remove_angular_momentum(basis_dict, am_to_remove, element_set)
+    Args:
+        basis_dict: BSE basis set dictionary; not modified
+        elements: elements whose shells will be edited; `None` edits all elements
+        remove: angular momentum letter labels to remove (e.g. `['f', 'g']`)
+
+    Returns:
+        Edited basis set dictionary (*basis_dict* itself if there is nothing to remove)
+    """
+    if not remove:
+        return basis_dict
 
-    return bse.write_formatted_basis_str(basis_dict, fmt)
+    element_set = set(parse_elements(elements)) if elements is not None else None
+    am_to_remove = {am_letter_to_int(letter) for letter in remove}
+    return remove_angular_momentum(basis_dict, am_to_remove, element_set)
 
 
 T = TypeVar("T", int, float, str)
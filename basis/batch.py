@@ -0,0 +1,180 @@
+"""Run many basis set edits in one process, loading each source basis set only once."""
+
+import marshal
+import time
+import tomllib
+from collections.abc import Iterable
+from dataclasses import dataclass
+from pathlib import Path
+
+from ._lazy import lazy_import
+from .basis import edit_basis_dict, guess_format, read_basis, write_atomic
+
+bse = lazy_import("basis_set_exchange")
+futures = lazy_import("concurrent.futures")
+
+_JOB_KEYS = {"basis", "input", "elements", "remove", "format", "output"}
+
+
+@dataclass(frozen=True)
+class EditJob:
+    """A single edit: read a basis set, remove angular momenta, and write it to a file."""
+
+    output: str
+    basis: str | None = None
+    input_file: str | None = None
+    elements: tuple[str, ...] | None = None
+    remove: tuple[str, ...] | None = None
+    fmt: str | None = None
+
+    @property
+    def source(self) -> tuple[str, str]:
+        """Identify the basis set to read, so that jobs sharing it can share one load."""
+        if self.input_file is not None:
+            return ("input", str(Path(self.input_file).resolve()))
+        return ("basis", (self.basis or "").lower())
+
+    @property
+    def format(self) -> str:
+        """Output format: as given, else guessed from the output path, else nwchem."""
+        return self.fmt or guess_format(self.output) or "nwchem"
+
+
+@dataclass(frozen=True)
+class JobResult:
+    """Outcome of an `EditJob`."""
+
+    job: EditJob
+    seconds: float
+    error: str | None = None
+
+    @property
+    def ok(self) -> bool:
+        """Whether the job succeeded."""
+        return self.error is None
+
+
+def _tokens(value: str | list[str] | None) -> tuple[str, ...] | None:
+    if value is None:
+        return None
+    return tuple(value.split() if isinstance(value, str) else map(str, value))
+
+
+def read_manifest(path: Path | str) -> list[EditJob]:
+    """Read edit jobs from a TOML manifest.
+
+    Each job is a `[[job]]` table with the keys of `basis edit`::
+
+        [[job]]
+        basis = "def2-TZVP"           # or: input = "local.nw"
+        elements = ["H-Ne", "Na-Ar"]  # or a whitespace-separated string
+        remove = ["f"]
+        format = "nwchem"             # optional, guessed from output
+        output = "def2-TZVP-f.nw"
+
+    Relative `input` and `output` paths are resolved against the manifest's directory.
+
+    Args:
+        path: manifest file
+
+    Returns:
+        Jobs, in manifest order
+
+    Raises:
+        ValueError: a job has unknown keys, lacks an output, or lacks a basis or input
+    """
+    path = Path(path)
+    with open(path, "rb") as fh:
+        manifest = tomllib.load(fh)
+
+    jobs = []
+    for i, entry in enumerate(manifest.get("job", []), start=1):
+        if unknown := set(entry) - _JOB_KEYS:
+            raise ValueError(f"Job {i} in {path} has unknown keys: {sorted(unknown)}")
+        if "output" not in entry:
+            raise ValueError(f"Job {i} in {path} has no output")
+        if ("basis" in entry) == ("input" in entry):
+            raise ValueError(f"Job {i} in {path} needs exactly one of 'basis' or 'input'")
+
+        input_file = entry.get("input")
+        jobs.append(
+            EditJob(
+                output=str(path.parent / entry["output"]),
+                basis=entry.get("basis"),
+                input_file=str(path.parent / input_file) if input_file else None,
+                elements=_tokens(entry.get("elements")),
+                remove=_tokens(entry.get("remove")),
+                fmt=entry.get("format"),
+            )
+        )
+
+    return jobs
+
+
+def _run_group(jobs: list[EditJob]) -> list[JobResult]:
+    """Run jobs that share a source basis set, reading it only once."""
+    start = time.perf_counter()
+    try:
+        first = jobs[0]
+        # Kept marshalled so that every job edits its own copy
+        source = marshal.dumps(read_basis(first.basis, first.input_file))
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+        return [JobResult(job, time.perf_counter() - start, error) for job in jobs]
+    load_time = time.perf_counter() - start
+
+    results = []
+    for i, job in enumerate(jobs):
+        start = time.perf_counter()
+        try:
+            basis_dict = edit_basis_dict(marshal.loads(source), job.elements, job.remove)
+            write_atomic(job.output, bse.write_formatted_basis_str(basis_dict, job.format))
+            error = None
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        # The shared load is attributed to the first job
+        seconds = time.perf_counter() - start + (load_time if i == 0 else 0)
+        results.append(JobResult(job, seconds, error))
+
+    return results
+
+
+def run_jobs(jobs: Iterable[EditJob], workers: int | None = 1) -> list[JobResult]:
+    """Run edit jobs, sharing one load per source basis set.
+
+    Jobs are grouped by source basis set; each group runs in one process, and independent
+    groups are spread over a pool of worker processes.  A failing job does not stop the
+    others.
+
+    Args:
+        jobs: jobs to run
+        workers: number of worker processes; 1 runs serially in this process and `None`
+            uses one process per CPU
+
+    Returns:
+        Results, in the order of *jobs*
+
+    Raises:
+        ValueError: fewer than one worker requested
+    """
+    if workers is not None and workers < 1:
+        raise ValueError(f"Need at least one worker, got: {workers=}")
+
+    jobs = list(jobs)
+    groups: dict[tuple[str, str], list[int]] = {}
+    for i, job in enumerate(jobs):
+        groups.setdefault(job.source, []).append(i)
+    batches = [[jobs[i] for i in indices] for indices in groups.values()]
+
+    if workers == 1 or len(batches) < 2:
+        grouped = list(map(_run_group, batches))
+    else:
+        with futures.ProcessPoolExecutor(max_workers=workers) as executor:
+            grouped = list(executor.map(_run_group, batches))
+
+    results = {
+        i: result
+        for indices, group_results in zip(groups.values(), grouped, strict=True)
+        for i, result in zip(indices, group_results, strict=True)
+    }
+    return [results[i] for i in range(len(jobs))]
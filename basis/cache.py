@@ -0,0 +1,306 @@
+"""Persistent and in-process caches for data derived from the Basis Set Exchange."""
+
+import functools
+import importlib.machinery
+import os
+import sqlite3
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from collections.abc import Hashable
+from pathlib import Path
+from typing import Any, NamedTuple
+
+# Bump whenever the layout of cached values changes so that stale entries are ignored
+CACHE_SCHEMA_VERSION = 1
+CACHE_FILENAME = "cache.sqlite"
+DEFAULT_MAX_SIZE = 64 * 1024**2
+
+# Caches whose locks and connections a forked child (e.g. a pool worker) must not use
+_fork_sensitive: "weakref.WeakSet[DiskCache | LRUCache]" = weakref.WeakSet()
+# Connections inherited from the parent: SQLite forbids using them across fork(), and they
+# are kept referenced so that the child never closes them either
+_inherited_connections: "list[sqlite3.Connection]" = []
+
+
+def _reset_after_fork() -> None:
+    """Give every cache a fresh lock (and connection) in a forked child.
+
+    A lock held by another thread of the parent at fork time would otherwise never be
+    released in the child.
+    """
+    for cache in list(_fork_sensitive):
+        cache._reset_after_fork()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def cache_dir() -> Path:
+    """Directory holding the persistent cache.
+
+    `$BASIS_CACHE_DIR` takes precedence, followed by `$XDG_CACHE_HOME/basis`, falling back
+    to `~/.cache/basis`.
+    """
+    if path := os.environ.get("BASIS_CACHE_DIR"):
+        return Path(path)
+    if path := os.environ.get("XDG_CACHE_HOME"):
+        return Path(path) / "basis"
+    return Path.home() / ".cache" / "basis"
+
+
+def cache_enabled() -> bool:
+    """Whether the persistent cache is enabled (disable by setting `$BASIS_NO_CACHE`)."""
+    return not os.environ.get("BASIS_NO_CACHE")
+
+
+@functools.cache
+def bse_version() -> str:
+    """Installed version of the Basis Set Exchange, read without importing it.
+
+    The version is parsed from the name of the package's `.dist-info` directory, which is
+    much faster than importing `importlib.metadata`, falling back to the latter.
+    """
+    # PathFinder, unlike importlib.util.find_spec, does not touch a lazily imported module
+    spec = importlib.machinery.PathFinder.find_spec("basis_set_exchange")
+    if spec is not None and spec.origin is not None:
+        site = Path(spec.origin).parent.parent
+        if len(dist_info := list(site.glob("basis_set_exchange-*.dist-info"))) == 1:
+            return dist_info[0].name.removesuffix(".dist-info").split("-", 1)[1]
+
+    from importlib.metadata import version  # noqa: PLC0415
+
+    return version("basis_set_exchange")
+
+
+def cache_key(namespace: str, name: str) -> str:
+    """Build a cache key that is invalidated by BSE upgrades and cache schema changes.
+
+    Examples:
+        >>> cache_key("count", "STO-3G").startswith("count:1:")
+        True
+        >>> cache_key("count", "STO-3G").endswith(":sto-3g")
+        True
+    """
+    return f"{namespace}:{CACHE_SCHEMA_VERSION}:{bse_version()}:{name.lower()}"
+
+
+class CacheStats(NamedTuple):
+    """Summary of the contents of a persistent cache."""
+
+    path: Path
+    entries: int
+    size: int
+    max_size: int
+
+
+class DiskCache:
+    """Size-capped key-value store with least-recently-used eviction, backed by SQLite.
+
+    The cache is best effort: database errors (e.g. a read-only or corrupted cache) are
+    treated as misses rather than raised.
+    """
+
+    def __init__(self, path: Path | str, max_size: int | None = None) -> None:
+        """Open (lazily) the cache at *path*, holding at most *max_size* bytes of values.
+
+        When *max_size* is omitted, `$BASIS_CACHE_SIZE` (bytes) or `DEFAULT_MAX_SIZE` is used.
+        """
+        self.path = Path(path)
+        if max_size is None:
+            max_size = int(os.environ.get("BASIS_CACHE_SIZE", DEFAULT_MAX_SIZE))
+        self.max_size = max_size
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+        _fork_sensitive.add(self)
+
+    def _reset_after_fork(self) -> None:
+        self._lock = threading.Lock()
+        if self._conn is not None:
+            _inherited_connections.append(self._conn)
+            self._conn = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(
+                self.path, timeout=30, isolation_level=None, check_same_thread=False
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "key TEXT PRIMARY KEY, value BLOB NOT NULL, "
+                "size INTEGER NOT NULL, accessed INTEGER NOT NULL)"
+            )
+            self._conn = conn
+        return self._conn
+
+    def get(self, key: str) -> bytes | None:
+        """Fetch the value stored under *key*, marking it as recently used."""
+        with self._lock:
+            try:
+                conn = self._connect()
+                row = conn.execute("SELECT value FROM entries WHERE key = ?", (key,)).fetchone()
+                if row is None:
+                    return None
+            except (OSError, sqlite3.Error):
+                return None
+            try:
+                conn.execute("UPDATE entries SET accessed = ? WHERE key = ?", (time.time_ns(), key))
+            except sqlite3.Error:
+                # Best effort: a read-only cache still serves hits, only without LRU order
+                pass
+        return row[0]
+
+    def set(self, key: str, value: bytes) -> None:
+        """Store *value* under *key*, evicting least-recently-used entries beyond the cap."""
+        if len(value) > self.max_size:
+            return
+        with self._lock:
+            try:
+                conn = self._connect()
+                conn.execute(
+                    "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?)",
+                    (key, value, len(value), time.time_ns()),
+                )
+                self._evict(conn)
+            except (OSError, sqlite3.Error):
+                return
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        (total,) = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()
+        if total <= self.max_size:
+            return
+
+        stale = []
+        for key, size in conn.execute("SELECT key, size FROM entries ORDER BY accessed"):
+            stale.append((key,))
+            total -= size
+            if total <= self.max_size:
+                break
+        conn.executemany("DELETE FROM entries WHERE key = ?", stale)
+
+    def clear(self) -> None:
+        """Remove all entries.
+
+        Raises:
+            OSError, sqlite3.Error: the cache cannot be opened or written
+        """
+        with self._lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM entries")
+            conn.execute("VACUUM")
+
+    def stats(self) -> CacheStats:
+        """Count the entries and total size of the cache.
+
+        Raises:
+            OSError, sqlite3.Error: the cache cannot be opened or read
+        """
+        with self._lock:
+            entries, size = (
+                self._connect()
+                .execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries")
+                .fetchone()
+            )
+        return CacheStats(self.path, entries, size, self.max_size)
+
+
+@functools.cache
+def _open_cache(path: Path) -> DiskCache:
+    return DiskCache(path)
+
+
+def default_cache() -> DiskCache | None:
+    """The shared persistent cache, or `None` when caching is disabled."""
+    if not cache_enabled():
+        return None
+    return _open_cache(cache_dir() / CACHE_FILENAME)
+
+
+class CacheInfo(NamedTuple):
+    """Hit/miss statistics of an in-process cache (mirrors `functools.lru_cache`)."""
+
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
+class LRUCache:
+    """Thread-safe, bounded in-process mapping with least-recently-used eviction.
+
+    Callers are responsible for storing values that cannot be mutated through the
+    returned reference (e.g. tuples or serialized bytes).
+
+    Examples:
+        >>> memo = LRUCache(maxsize=2)
+        >>> memo.set("a", 1)
+        >>> memo.set("b", 2)
+        >>> memo.get("a")
+        1
+        >>> memo.set("c", 3)
+        >>> memo.get("b") is None
+        True
+        >>> memo.cache_info()
+        CacheInfo(hits=1, misses=1, maxsize=2, currsize=2)
+    """
+
+    def __init__(self, maxsize: int = 128) -> None:
+        """Create an empty cache holding at most *maxsize* entries (0 disables caching)."""
+        self._data: OrderedDict[Hashable, Any] = OrderedDict()
+        self._lock = threading.Lock()
+        self._maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        _fork_sensitive.add(self)
+
+    def _reset_after_fork(self) -> None:
+        self._lock = threading.Lock()
+
+    @property
+    def maxsize(self) -> int:
+        """Maximum number of entries; shrinking it evicts the least recently used."""
+        return self._maxsize
+
+    @maxsize.setter
+    def maxsize(self, maxsize: int) -> None:
+        with self._lock:
+            self._maxsize = maxsize
+            self._evict()
+
+    def get(self, key: Hashable) -> Any | None:
+        """Fetch the value stored under *key*, marking it as recently used."""
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store *value* under *key*, evicting the least recently used entries beyond the cap."""
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            self._evict()
+
+    def _evict(self) -> None:
+        while len(self._data) > max(self._maxsize, 0):
+            self._data.popitem(last=False)
+
+    def cache_info(self) -> CacheInfo:
+        """Report hits, misses, and the current and maximum size."""
+        with self._lock:
+            return CacheInfo(self.hits, self.misses, self._maxsize, len(self._data))
+
+    def cache_clear(self) -> None:
+        """Remove all entries and reset the statistics."""
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = 0
@@ -1,11 +1,54 @@
 """Command-line interface for basis set examination and editing."""
 
+import os
+import shlex
+import sqlite3
 import sys
-from argparse import ArgumentParser, Namespace
+from argparse import ArgumentParser, ArgumentTypeError, Namespace
+from collections.abc import Iterator
+from typing import Any
 
-import basis_set_exchange as bse
+from ._lazy import lazy_import
+from .basis import (
+    EditStep,
+    am_letter_to_int,
+    edit_basis,
+    edit_basis_files,
+    guess_format,
+    iter_table,
+    parse_elements,
+    write_atomic,
+)
+from .cache import default_cache
+from .client import DaemonError, daemon_address, request, try_request
+from .index import build_index, index_path, load_index
+from .timing import recording, span
 
-from .basis import edit_basis, guess_format, table
+batch = lazy_import("basis.batch")
+bse = lazy_import("basis_set_exchange")
+cost = lazy_import("basis.cost")
+daemon = lazy_import("basis.daemon")
+molecule = lazy_import("basis.molecule")
+search = lazy_import("basis.search")
+stats = lazy_import("basis.stats")
+
+
+class _WriterFormats:
+    """BSE writer formats, looked up only once argparse needs them."""
+
+    def __contains__(self, fmt: object) -> bool:
+        return fmt in bse.get_writer_formats()
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(sorted(bse.get_writer_formats()))
+
+
+def _jobs(value: str) -> int:
+    """Parse a number of processes for `-j`, where 0 means one per CPU."""
+    jobs = int(value)
+    if jobs < 0:
+        raise ArgumentTypeError(f"need at least one job, got: {value}")
+    return jobs
 
 
 def show_parser(parser: ArgumentParser | None = None) -> ArgumentParser:
@@ -14,9 +57,21 @@ def show_parser(parser: ArgumentParser | None = None) -> ArgumentParser:
 
     parser.add_argument("basis", nargs="+", help="Basis set(s) to examine.")
     parser.add_argument("-e", "--elements", nargs="+", help="Elements to examine.")
-    parser.add_argument(
+    diff = parser.add_mutually_exclusive_group()
+    diff.add_argument(
         "-d", "--diff", action="store_true", help="Find the difference between two basis sets."
     )
+    diff.add_argument(
+        "--diff-ref",
+        metavar="BASIS",
+        default=None,
+        help="Find the difference of every basis set from a reference basis set.",
+    )
+    diff.add_argument(
+        "--diff-matrix",
+        action="store_true",
+        help="Find the difference between every pair of basis sets.",
+    )
     parser.add_argument(
         "-f",
         "--format",
@@ -30,6 +85,25 @@ def show_parser(parser: ArgumentParser | None = None) -> ArgumentParser:
         action="store_true",
         help="Show spherical basis function counts (contracted functions x spherical harmonics).",
     )
+    parser.add_argument(
+        "-o",
+        "--output",
+        metavar="FILE",
+        default=None,
+        help="Output file path. Defaults to stdout.",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=_jobs,
+        default=1,
+        help="Number of processes to count basis sets with; 0 uses one per CPU [%(default)s].",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Neither read from nor write to the persistent count cache.",
+    )
 
     return parser
 
@@ -58,6 +132,92 @@ def edit_parser(parser: ArgumentParser | None = None) -> ArgumentParser:
         metavar="AM",
         help="Angular momentum types to remove (e.g. f g).",
     )
+    parser.add_argument(
+        "--only",
+        nargs="+",
+        metavar="ELEMENT",
+        default=None,
+        help="Load and write only these elements (e.g. H C N O); others are left out.",
+    )
+    parser.add_argument(
+        "--step",
+        action="append",
+        default=[],
+        metavar="ARGS",
+        help="A further round of editing, e.g. --step '-e C-Ne --remove g'. Repeatable; "
+        "steps are applied in order, after -e/--remove, before the output is written once.",
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        action="append",
+        metavar="FILE",
+        default=None,
+        help="Output file path; repeat to edit the basis set once and write it to each. "
+        "Defaults to stdout.",
+    )
+    parser.add_argument(
+        "-f",
+        "--format",
+        choices=_WriterFormats(),
+        metavar="FORMAT",
+        default=None,
+        help="Output format (any BSE writer format, e.g. nwchem, gaussian94, orca, psi4). "
+        "Guessed from each output file extension when omitted, falling back to nwchem.",
+    )
+    parser.add_argument(
+        "-m",
+        "--manifest",
+        metavar="FILE",
+        default=None,
+        help="Run the edit jobs listed in a TOML manifest instead of a single edit.",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=_jobs,
+        default=None,
+        help="Number of processes to run manifest jobs (default 1) or to write several "
+        "outputs (default one per output) with; 0 uses one per CPU.",
+    )
+
+    return parser
+
+
+def step_parser() -> ArgumentParser:
+    """Create an ArgumentParser for the arguments of an 'edit --step'."""
+    parser = ArgumentParser(prog="basis edit --step", add_help=False)
+
+    parser.add_argument("-e", "--elements", nargs="+", help="Elements to include.")
+    parser.add_argument(
+        "-r",
+        "--remove",
+        nargs="+",
+        metavar="AM",
+        required=True,
+        help="Angular momentum types to remove (e.g. f g).",
+    )
+
+    return parser
+
+
+def molecule_parser(parser: ArgumentParser | None = None) -> ArgumentParser:
+    """Create an ArgumentParser for the 'molecule' subcommand."""
+    parser = parser or ArgumentParser(description="Count the basis functions of molecules.")
+
+    parser.add_argument(
+        "xyz",
+        nargs="+",
+        help="XYZ file(s), directories of *.xyz files, or '-' to read from stdin.",
+    )
+    parser.add_argument("-b", "--basis", nargs="+", required=True, help="Basis set(s) to count in.")
+    parser.add_argument(
+        "-f",
+        "--format",
+        choices=("csv", "ndjson"),
+        default="csv",
+        help="Output format [%(default)s].",
+    )
     parser.add_argument(
         "-o",
         "--output",
@@ -65,79 +225,631 @@ def edit_parser(parser: ArgumentParser | None = None) -> ArgumentParser:
         default=None,
         help="Output file path. Defaults to stdout.",
     )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Neither read from nor write to the persistent count cache.",
+    )
+
+    return parser
+
+
+def search_parser(parser: ArgumentParser | None = None) -> ArgumentParser:
+    """Create an ArgumentParser for the 'search' subcommand."""
+    parser = parser or ArgumentParser(description="Find basis sets satisfying constraints.")
+
+    parser.add_argument("-e", "--elements", nargs="+", help="Elements that must be covered.")
+    parser.add_argument(
+        "-m",
+        "--molecule",
+        metavar="XYZ",
+        default=None,
+        help="Molecule that must be covered; ranks and limits by its total function count.",
+    )
+    parser.add_argument(
+        "--max-functions",
+        type=int,
+        metavar="N",
+        default=None,
+        help="Maximum spherical functions for any one element.",
+    )
+    parser.add_argument(
+        "--max-total",
+        type=int,
+        metavar="N",
+        default=None,
+        help="Maximum total spherical functions (of the molecule, or one atom per element).",
+    )
+    parser.add_argument(
+        "--max-am",
+        metavar="AM",
+        type=am_letter_to_int,
+        default=None,
+        help="Maximum angular momentum (e.g. d).",
+    )
+    parser.add_argument(
+        "--contraction",
+        choices=("contracted", "uncontracted"),
+        default=None,
+        help="Only contracted, or only fully uncontracted, basis sets.",
+    )
+    parser.add_argument(
+        "-n",
+        "--limit",
+        type=int,
+        default=None,
+        help="Show only the first N results.",
+    )
+    parser.add_argument(
+        "--index",
+        metavar="FILE",
+        default=None,
+        help="Index file path. Defaults to $BASIS_INDEX or the cache directory.",
+    )
+
+    return parser
+
+
+def cost_parser(parser: ArgumentParser | None = None) -> ArgumentParser:
+    """Create an ArgumentParser for the 'cost' subcommand."""
+    parser = parser or ArgumentParser(
+        description="Estimate integrals, memory, and disk of a molecule in basis sets."
+    )
+
+    system = parser.add_mutually_exclusive_group(required=True)
+    system.add_argument("-m", "--molecule", metavar="XYZ", help="Molecule to estimate.")
+    system.add_argument("-e", "--elements", nargs="+", help="One atom of each element.")
+    parser.add_argument("-b", "--basis", nargs="+", required=True, help="Basis set(s) to compare.")
+    parser.add_argument(
+        "--aux",
+        metavar="BASIS",
+        default=None,
+        help="Auxiliary basis set for RI. Defaults to three times the basis functions.",
+    )
+    parser.add_argument(
+        "--memory",
+        metavar="GIB",
+        type=float,
+        default=None,
+        help="Available memory in GiB; shows which methods fit.",
+    )
     parser.add_argument(
         "-f",
         "--format",
-        choices=sorted(bse.get_writer_formats()),
+        choices=("plain", "csv"),
+        default="plain",
+        help="Output format [%(default)s].",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Neither read from nor write to the persistent count cache.",
+    )
+
+    return parser
+
+
+def stats_parser(parser: ArgumentParser | None = None) -> ArgumentParser:
+    """Create an ArgumentParser for the 'stats' subcommand."""
+    parser = parser or ArgumentParser(
+        description="Write the counts of every element of every basis set to a file."
+    )
+
+    parser.add_argument(
+        "basis", nargs="*", help="Basis set(s) to scan. Defaults to every basis set in the BSE."
+    )
+    parser.add_argument("-o", "--output", metavar="FILE", required=True, help="Output file.")
+    parser.add_argument(
+        "-f",
+        "--format",
+        choices=("csv", "npz"),
+        default=None,
+        help="Output format: CSV or a columnar NumPy archive. Guessed from the output by default.",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=_jobs,
+        default=0,
+        help="Number of processes to count basis sets with; 0 uses one per CPU [%(default)s].",
+    )
+    parser.add_argument(
+        "--checkpoint",
+        metavar="FILE",
+        default=None,
+        help="File recording finished basis sets, from which an interrupted scan resumes. "
+        "Defaults to the output with '.checkpoint' appended.",
+    )
+    parser.add_argument(
+        "--restart",
+        action="store_true",
+        help="Discard the checkpoint and scan every basis set again.",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Neither read from nor write to the persistent count cache.",
+    )
+
+    return parser
+
+
+def cache_parser(parser: ArgumentParser | None = None) -> ArgumentParser:
+    """Create an ArgumentParser for the 'cache' subcommand."""
+    parser = parser or ArgumentParser(description="Manage the persistent count cache.")
+
+    parser.add_argument(
+        "action",
+        choices=("stats", "clear"),
+        help="Show cache statistics or remove all cached entries.",
+    )
+
+    return parser
+
+
+def index_parser(parser: ArgumentParser | None = None) -> ArgumentParser:
+    """Create an ArgumentParser for the 'index' subcommand."""
+    parser = parser or ArgumentParser(description="Manage the prebuilt count index.")
+
+    parser.add_argument(
+        "action",
+        choices=("build", "info"),
+        help="Count every basis set in the BSE into the index, or describe the index.",
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        metavar="FILE",
+        default=None,
+        help="Index file path. Defaults to $BASIS_INDEX or the cache directory.",
+    )
+
+    return parser
+
+
+def serve_parser(parser: ArgumentParser | None = None) -> ArgumentParser:
+    """Create an ArgumentParser for the 'serve' subcommand."""
+    parser = parser or ArgumentParser(description="Serve requests from a warm daemon.")
+
+    parser.add_argument(
+        "action",
+        nargs="?",
+        choices=("start", "stop", "status"),
+        default="start",
+        help="Run the daemon in the foreground, or stop or query a running one [%(default)s].",
+    )
+    parser.add_argument(
+        "-a",
+        "--address",
+        default=None,
+        help="Unix socket path or loopback host:port. Defaults to $BASIS_DAEMON or a socket "
+        "in the cache directory.",
+    )
+    parser.add_argument(
+        "--memo-size",
+        type=int,
+        default=256,
+        help="Number of loaded basis sets to keep warm [%(default)s].",
+    )
+
+    return parser
+
+
+def profile_parser(parser: ArgumentParser) -> ArgumentParser:
+    """Add the profiling arguments shared by all subcommands to *parser*."""
+    group = parser.add_argument_group("profiling")
+    group.add_argument(
+        "--profile",
+        action="store_true",
+        help="Print the time spent in each phase to stderr.",
+    )
+    group.add_argument(
+        "--trace",
+        metavar="FILE",
         default=None,
-        help="Output format. Guessed from the output file extension when omitted, "
-        "falling back to nwchem.",
+        help="Write the phases as Chrome trace-event JSON (chrome://tracing, Perfetto).",
     )
 
     return parser
 
 
 def basis_parser() -> ArgumentParser:
-    """Create the top-level ArgumentParser with 'show' and 'edit' subparsers."""
+    """Create the top-level ArgumentParser and its subcommand parsers."""
     parser = ArgumentParser(description="Examine and edit basis sets from the Basis Set Exchange.")
     subparsers = parser.add_subparsers(dest="subcommand")
 
     show_parser(subparsers.add_parser("show", help="Show basis set function counts."))
     edit_parser(subparsers.add_parser("edit", help="Edit and export a basis set."))
+    molecule_parser(
+        subparsers.add_parser("molecule", help="Count the basis functions of molecules.")
+    )
+    search_parser(subparsers.add_parser("search", help="Find basis sets satisfying constraints."))
+    cost_parser(subparsers.add_parser("cost", help="Estimate the cost of a calculation."))
+    stats_parser(subparsers.add_parser("stats", help="Write counts of a library to a file."))
+    cache_parser(subparsers.add_parser("cache", help="Manage the persistent count cache."))
+    index_parser(subparsers.add_parser("index", help="Manage the prebuilt count index."))
+    serve_parser(subparsers.add_parser("serve", help="Serve requests from a warm daemon."))
+    for subparser in subparsers.choices.values():
+        profile_parser(subparser)
 
     return parser
 
 
+def _daemon_request(args: Namespace, command: str, request_args: dict[str, Any]) -> Any | None:
+    """Hand a request to the daemon, unless profiling (which needs in-process spans)."""
+    if args.profile or args.trace:
+        return None
+    try:
+        return try_request(command, request_args)
+    except DaemonError as e:
+        sys.exit(f"error: {e}")
+
+
 def show_cli(args: Namespace) -> None:
-    """Run the 'show' subcommand."""
-    print(table(args.basis, args.elements, args.diff, args.format, args.spherical))
+    """Run the 'show' subcommand, writing rows as soon as they are available."""
+    options = {
+        "basis": args.basis,
+        "elements": args.elements,
+        "diff": args.diff,
+        "format": args.format,
+        "spherical": args.spherical,
+        "diff_ref": args.diff_ref,
+        "diff_matrix": args.diff_matrix,
+        "workers": args.jobs or None,
+        "use_cache": not args.no_cache,
+    }
+    if (result := _daemon_request(args, "show", options)) is not None:
+        lines = iter([result["output"]])
+    else:
+        lines = iter_table(
+            args.basis,
+            args.elements,
+            args.diff,
+            args.format,
+            args.spherical,
+            diff_ref=args.diff_ref,
+            diff_matrix=args.diff_matrix,
+            workers=args.jobs or None,
+            use_cache=not args.no_cache,
+        )
+
+    if args.output is None:
+        for line in lines:
+            print(line)
+    else:
+        with open(args.output, "w") as fh:
+            for line in lines:
+                print(line, file=fh)
 
 
 def edit_cli(args: Namespace) -> None:
     """Run the 'edit' subcommand."""
     basis = args.basis
     input_file = args.input
-    output = args.output
+    outputs = list(dict.fromkeys(args.output or []))
+
+    if args.manifest is not None:
+        if basis is not None or input_file is not None:
+            sys.exit("error: '--manifest' cannot be combined with 'basis' or '--input'")
+        manifest_cli(args.manifest, 1 if args.jobs is None else args.jobs or None)
+        return
 
     if basis is None and input_file is None:
         sys.exit("error: one of 'basis' or '--input' is required")
 
-    fmt = args.format
-    if fmt is None:
-        if output is not None:
-            fmt = guess_format(output)
-            if fmt is None:
-                print(
-                    f"warning: could not guess format from '{output}', using nwchem",
-                    file=sys.stderr,
-                )
-        fmt = fmt or "nwchem"
-
-    result = edit_basis(
-        basis=basis,
-        elements=args.elements,
-        remove=args.remove,
-        fmt=fmt,
-        input_file=input_file,
-    )
+    parser = step_parser()
+    steps = []
+    for step in args.step:
+        step_args = parser.parse_args(shlex.split(step))
+        steps.append(EditStep(step_args.elements, step_args.remove))
+
+    if len(outputs) > 1:
+        multi_edit_cli(args, outputs, steps)
+        return
+    output = outputs[0] if outputs else None
+
+    options = {
+        "basis": basis,
+        "elements": args.elements,
+        "remove": args.remove,
+        "fmt": args.format,
+        "output": output,
+        # The daemon runs in another working directory
+        "input_file": input_file and os.path.abspath(input_file),
+        "steps": steps,
+        "only": args.only,
+    }
+    if (response := _daemon_request(args, "edit", options)) is not None:
+        fmt = response["fmt"]
+        result = response["output"]
+    else:
+        fmt = args.format or (guess_format(output) if output is not None else None)
+        result = None
+
+    if fmt is None and output is not None:
+        print(f"warning: could not guess format from '{output}', using nwchem", file=sys.stderr)
+
+    if result is None:
+        result = edit_basis(
+            basis=basis,
+            elements=args.elements,
+            remove=args.remove,
+            fmt=fmt or "nwchem",
+            input_file=input_file,
+            steps=steps,
+            only=args.only,
+        )
 
     if output is None:
         print(result)
     else:
-        with open(output, "w") as fh:
-            fh.write(result)
+        write_atomic(output, result)
+
+
+def multi_edit_cli(args: Namespace, outputs: list[str], steps: list[EditStep]) -> None:
+    """Edit a basis set once and write it to several outputs in parallel."""
+    formats = {}
+    for output in outputs:
+        if (fmt := args.format or guess_format(output)) is None:
+            print(f"warning: could not guess format from '{output}', using nwchem", file=sys.stderr)
+        formats[output] = fmt or "nwchem"
+
+    try:
+        edit_basis_files(
+            args.basis,
+            formats,
+            args.elements,
+            args.remove,
+            args.input,
+            steps=steps,
+            only=args.only,
+            workers=args.jobs or None,
+        )
+    except OSError as e:
+        sys.exit(f"error: {e}")
+
+
+def manifest_cli(manifest: str, workers: int | None) -> None:
+    """Run the jobs of an edit manifest, reporting the timing and outcome of each."""
+    try:
+        jobs = batch.read_manifest(manifest)
+    except (OSError, ValueError) as e:
+        sys.exit(f"error: {e}")
+
+    results = batch.run_jobs(jobs, workers)
+    for result in results:
+        job = result.job
+        source = job.input_file or job.basis
+        status = "ok" if result.ok else "FAILED"
+        line = f"{status:6} {result.seconds:7.3f}s  {source} -> {job.output}"
+        if result.ok:
+            print(line)
+        else:
+            print(f"{line}: {result.error}", file=sys.stderr)
+
+    if failed := sum(not result.ok for result in results):
+        sys.exit(f"error: {failed} of {len(results)} jobs failed")
+
+
+def molecule_cli(args: Namespace) -> None:
+    """Run the 'molecule' subcommand, writing a row per molecule and basis set."""
+    totals = molecule.molecule_totals(
+        molecule.iter_molecules(args.xyz), args.basis, use_cache=not args.no_cache
+    )
+    lines = molecule.iter_molecule_rows(totals, args.format)
+
+    try:
+        if args.output is None:
+            for line in lines:
+                print(line)
+        else:
+            with open(args.output, "w") as fh:
+                for line in lines:
+                    print(line, file=fh)
+    except (OSError, ValueError) as e:
+        sys.exit(f"error: {e}")
+
+
+def search_cli(args: Namespace) -> None:
+    """Run the 'search' subcommand."""
+    path = args.index or index_path()
+    if (index := load_index(path)) is None:
+        sys.exit(f"error: no up-to-date index at {path}, run 'basis index build'")
+
+    composition = None
+    if args.molecule is not None:
+        try:
+            with open(args.molecule) as fh:
+                composition = next(molecule.read_xyz(fh, args.molecule)).composition
+        except (OSError, ValueError, StopIteration) as e:
+            sys.exit(f"error: could not read a molecule from {args.molecule}: {e}")
+
+    try:
+        results = search.search(
+            index,
+            args.elements,
+            composition=composition,
+            max_functions=args.max_functions,
+            max_total=args.max_total,
+            max_am=args.max_am,
+            contraction=args.contraction,
+        )
+    except (KeyError, ValueError) as e:
+        sys.exit(f"error: {e}")
+
+    for line in search.iter_search_table(results[: args.limit]):
+        print(line)
+
+
+def cost_cli(args: Namespace) -> None:
+    """Run the 'cost' subcommand."""
+    if args.molecule is not None:
+        try:
+            with open(args.molecule) as fh:
+                composition = next(molecule.read_xyz(fh, args.molecule)).composition
+        except (OSError, ValueError, StopIteration) as e:
+            sys.exit(f"error: could not read a molecule from {args.molecule}: {e}")
+    else:
+        try:
+            composition = dict.fromkeys(parse_elements(args.elements), 1)
+        except (KeyError, ValueError) as e:
+            sys.exit(f"error: invalid elements: {e}")
+
+    try:
+        estimates = [
+            cost.estimate_cost(basis, composition, args.aux, use_cache=not args.no_cache)
+            for basis in args.basis
+        ]
+    except ValueError as e:
+        sys.exit(f"error: {e}")
+
+    memory = None if args.memory is None else int(args.memory * 1024**3)
+    for line in cost.iter_cost_table(estimates, args.format, memory):
+        print(line)
+
+
+def stats_cli(args: Namespace) -> None:
+    """Run the 'stats' subcommand."""
+    checkpoint = args.checkpoint or f"{args.output}.checkpoint"
+    if args.restart and os.path.exists(checkpoint):
+        os.remove(checkpoint)
+
+    try:
+        counts, failures = stats.scan_library(
+            args.basis or None, checkpoint, args.jobs or None, use_cache=not args.no_cache
+        )
+        stats.write_stats(counts, args.output, args.format)
+    except OSError as e:
+        sys.exit(f"error: {e}")
+    except KeyboardInterrupt:
+        sys.exit(f"interrupted; rerun to resume from {checkpoint}")
+
+    os.remove(checkpoint)
+    for name, reason in failures.items():
+        print(f"warning: skipped {name}: {reason}", file=sys.stderr)
+    print(f"wrote {len(counts)} basis sets to {args.output}")
+
+
+def cache_cli(args: Namespace) -> None:
+    """Run the 'cache' subcommand."""
+    store = default_cache()
+    if store is None:
+        sys.exit("error: the persistent cache is disabled ($BASIS_NO_CACHE is set)")
+
+    try:
+        match args.action:
+            case "stats":
+                stats = store.stats()
+                print(f"path:    {stats.path}")
+                print(f"entries: {stats.entries}")
+                print(f"size:    {stats.size / 1024:.1f} KiB / {stats.max_size / 1024:.1f} KiB")
+            case "clear":
+                store.clear()
+    except (OSError, sqlite3.Error) as e:
+        sys.exit(f"error: could not {args.action} the cache at {store.path}: {e}")
+
+
+def index_cli(args: Namespace) -> None:
+    """Run the 'index' subcommand."""
+    path = args.output or index_path()
+
+    match args.action:
+        case "build":
+            index, failures = build_index(path=path)
+            for name, reason in failures.items():
+                print(f"warning: skipped {name}: {reason}", file=sys.stderr)
+            print(f"indexed {len(index)} basis sets in {path}")
+        case "info":
+            if (index := load_index(path)) is None:
+                sys.exit(f"error: no up-to-date index at {path}, run 'basis index build'")
+            print(f"path:        {path}")
+            print(f"basis sets:  {len(index)}")
+            print(f"BSE version: {index.version}")
+
+
+def _attach_step_values(argv: list[str]) -> list[str]:
+    """Join each '--step' with its value, which argparse would otherwise take for options.
+
+    Examples:
+        >>> _attach_step_values(["edit", "sto-3g", "--step", "-e C --remove p"])
+        ['edit', 'sto-3g', '--step=-e C --remove p']
+    """
+    joined = []
+    args = iter(argv)
+    for arg in args:
+        if arg == "--":
+            joined += [arg, *args]
+        elif arg == "--step" and (value := next(args, None)) is not None:
+            joined.append(f"--step={value}")
+        else:
+            joined.append(arg)
+    return joined
+
+
+def serve_cli(args: Namespace) -> None:
+    """Run the 'serve' subcommand."""
+    address = args.address or daemon_address()
+
+    match args.action:
+        case "start":
+            print(f"serving at {address}", file=sys.stderr)
+            try:
+                daemon.serve(address, args.memo_size)
+            except (OSError, RuntimeError) as e:
+                sys.exit(f"error: {e}")
+        case "stop" | "status":
+            try:
+                result = request("ping" if args.action == "status" else "shutdown", address=address)
+            except OSError:
+                sys.exit(f"error: no daemon at {address}")
+            except DaemonError as e:
+                sys.exit(f"error: {e}")
+            if args.action == "status":
+                print(f"daemon (pid {result['pid']}) serving at {address}")
 
 
 def basis_cli() -> None:
     """Run the basis set CLI."""
     parser = basis_parser()
-    args = parser.parse_args()
+    args = parser.parse_args(_attach_step_values(sys.argv[1:]))
+
+    if args.subcommand is None or not (args.profile or args.trace):
+        run_subcommand(parser, args)
+        return
+
+    with recording() as recorder:
+        try:
+            with span(f"basis {args.subcommand}"):
+                run_subcommand(parser, args)
+        finally:
+            if args.profile:
+                for line in recorder.summary():
+                    print(line, file=sys.stderr)
+            if args.trace:
+                recorder.write_trace(args.trace)
+
 
+def run_subcommand(parser: ArgumentParser, args: Namespace) -> None:
+    """Dispatch to the handler of the chosen subcommand."""
     match args.subcommand:
         case "show":
             show_cli(args)
         case "edit":
             edit_cli(args)
+        case "molecule":
+            molecule_cli(args)
+        case "search":
+            search_cli(args)
+        case "cost":
+            cost_cli(args)
+        case "stats":
+            stats_cli(args)
+        case "cache":
+            cache_cli(args)
+        case "index":
+            index_cli(args)
+        case "serve":
+            serve_cli(args)
         case _:
             parser.print_help()
             sys.exit(1)
@@ -0,0 +1,129 @@
+"""Client for the `basis serve` daemon.
+
+Requests and responses are single lines of JSON, one request per connection::
+
+    -> {"command": "count", "args": {"basis": "sto-3g"}}
+    <- {"ok": true, "result": {...}}
+
+Over TCP, which only listens on the loopback interface, every request also carries the
+daemon's `"token"`: `$BASIS_DAEMON_TOKEN`, or else the one the daemon writes to a file only
+its owner can read (see `token_path`).  Over a Unix socket, the socket's permissions alone
+restrict who may connect.
+
+Only the standard library's `socket` is used, so that trying the daemon costs next to
+nothing when it is not running.
+"""
+
+import json
+import os
+import socket
+from pathlib import Path
+from typing import Any
+
+from .cache import cache_dir
+
+SOCKET_FILENAME = "daemon.sock"
+CONNECT_TIMEOUT = 0.5
+REQUEST_TIMEOUT = 600
+
+
+class DaemonError(Exception):
+    """The daemon failed to handle a request."""
+
+
+def daemon_address() -> str:
+    """Address of the daemon: `$BASIS_DAEMON` (a socket path or `host:port`), or a socket.
+
+    The default socket lives in the cache directory.
+    """
+    return os.environ.get("BASIS_DAEMON") or str(cache_dir() / SOCKET_FILENAME)
+
+
+def token_path(port: int) -> Path:
+    """File holding the token of the daemon listening on TCP *port*."""
+    return cache_dir() / f"daemon-{port}.token"
+
+
+def daemon_token(port: int) -> str | None:
+    """Token of the daemon listening on TCP *port*: `$BASIS_DAEMON_TOKEN`, or its token file."""
+    if token := os.environ.get("BASIS_DAEMON_TOKEN"):
+        return token
+    try:
+        return token_path(port).read_text().strip()
+    except OSError:
+        return None
+
+
+def parse_address(address: str) -> str | tuple[str, int]:
+    """Split a `host:port` address; anything else is a Unix socket path.
+
+    Examples:
+        >>> parse_address("localhost:8765")
+        ('localhost', 8765)
+        >>> parse_address("/tmp/basis.sock")
+        '/tmp/basis.sock'
+    """
+    host, _, port = address.rpartition(":")
+    if host and port.isdigit() and "/" not in address:
+        return host, int(port)
+    return address
+
+
+def request(command: str, args: dict[str, Any] | None = None, address: str | None = None) -> Any:
+    """Send a request to the daemon and wait for its result.
+
+    Args:
+        command: request type (`count`, `show`, `edit`, `ping`, or `shutdown`, which is
+            only accepted over a Unix socket)
+        args: arguments of the request
+        address: daemon address; defaults to `daemon_address()`
+
+    Returns:
+        Result of the request
+
+    Raises:
+        OSError: daemon is not running or the connection failed
+        DaemonError: daemon failed to handle the request
+    """
+    target = parse_address(address or daemon_address())
+    message: dict[str, Any] = {"command": command, "args": args or {}}
+    if isinstance(target, str):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    else:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        message["token"] = daemon_token(target[1])
+
+    with sock:
+        sock.settimeout(CONNECT_TIMEOUT)
+        sock.connect(target)
+        sock.settimeout(REQUEST_TIMEOUT)
+        sock.sendall(json.dumps(message).encode() + b"\n")
+        with sock.makefile("rb") as fh:
+            line = fh.readline()
+
+    if not line:
+        raise ConnectionError("Daemon closed the connection without responding")
+    response = json.loads(line)
+    if not response["ok"]:
+        raise DaemonError(response["error"])
+    return response["result"]
+
+
+def try_request(command: str, args: dict[str, Any] | None = None) -> Any | None:
+    """Send a request to the daemon if one is running and `$BASIS_NO_DAEMON` is not set.
+
+    Returns:
+        Result of the request, or `None` if no daemon could be reached
+
+    Raises:
+        DaemonError: daemon failed to handle the request
+    """
+    if os.environ.get("BASIS_NO_DAEMON"):
+        return None
+    address = daemon_address()
+    if isinstance(parse_address(address), str) and not os.path.exists(address):
+        return None
+    try:
+        return request(command, args, address)
+    except OSError:
+        return None
@@ -0,0 +1,214 @@
+"""Estimate the computational cost of a molecule in a basis set from its function counts."""
+
+from collections.abc import Iterable, Iterator, Mapping
+from typing import Literal, NamedTuple
+
+from .basis import atomic_numbers, count, count_atomic_basis_functions
+
+# Size of a double-precision value
+WORD = 8
+# Auxiliary functions per basis function when no auxiliary basis set is given (typical of
+# the def2 JK/RI fitting basis sets)
+AUX_RATIO = 3
+
+
+class CostEstimate(NamedTuple):
+    """Size and cost of a molecule in a basis set; sizes in bytes."""
+
+    basis: str
+    functions: int
+    primitives: int
+    aux_functions: int
+    eris: int
+    primitive_quartets: int
+    matrix_bytes: int
+    conventional_bytes: int
+    ri_bytes: int
+
+
+ROWS = {
+    "functions": "Basis functions",
+    "primitives": "Primitive functions",
+    "aux_functions": "Auxiliary functions",
+    "eris": "Unique 2e integrals",
+    "primitive_quartets": "Primitive quartets",
+    "matrix_bytes": "N×N matrix",
+    "conventional_bytes": "Conventional ERIs",
+    "ri_bytes": "RI 3-index + metric",
+}
+
+
+def molecule_functions(
+    basis: str,
+    composition: Mapping[int, int],
+    use_cache: bool = True,
+) -> tuple[int, int]:
+    """Count the spherical contracted and primitive functions of a molecule.
+
+    Args:
+        basis: basis set name
+        composition: number of atoms of each element
+        use_cache: read from and write to the persistent count cache
+
+    Returns:
+        Number of contracted and of primitive spherical functions
+
+    Raises:
+        ValueError: basis set lacks one of the elements
+
+    Examples:
+        >>> molecule_functions("sto-3g", {8: 1, 1: 2})
+        (7, 21)
+    """
+    counts = count(basis, list(composition), use_cache)
+    if missing := [atomic_numbers[z] for z in composition if z not in counts]:
+        raise ValueError(f"{basis} lacks elements: {', '.join(missing)}")
+
+    functions = primitives = 0
+    for element, n_atoms in composition.items():
+        contracted, uncontracted = counts[element]
+        functions += n_atoms * sum(count_atomic_basis_functions(contracted))
+        primitives += n_atoms * sum(count_atomic_basis_functions(uncontracted))
+    return functions, primitives
+
+
+def _unique_pairs(n: int) -> int:
+    return n * (n + 1) // 2
+
+
+def estimate_cost(
+    basis: str,
+    composition: Mapping[int, int],
+    aux: str | None = None,
+    use_cache: bool = True,
+) -> CostEstimate:
+    """Estimate the integrals, memory, and disk of a molecule in a basis set.
+
+    With N basis functions there are about N⁴/8 unique two-electron integrals (exactly
+    M(M+1)/2 for M = N(N+1)/2 pairs), which conventional methods store; resolution of the
+    identity (RI) instead stores an N_aux × M three-index tensor and an N_aux × N_aux metric.
+    Primitive quartets, counted the same way from the primitives, measure the work of
+    computing the integrals.
+
+    Args:
+        basis: basis set name
+        composition: number of atoms of each element
+        aux: auxiliary basis set for RI; defaults to `AUX_RATIO` times the basis functions
+        use_cache: read from and write to the persistent count cache
+
+    Returns:
+        Cost estimate
+
+    Raises:
+        ValueError: basis set (or auxiliary basis set) lacks one of the elements
+
+    Examples:
+        >>> water = {8: 1, 1: 2}
+        >>> cost = estimate_cost("sto-3g", water)
+        >>> cost.functions, cost.eris, cost.conventional_bytes
+        (7, 406, 3248)
+    """
+    functions, primitives = molecule_functions(basis, composition, use_cache)
+    if aux is None:
+        aux_functions = AUX_RATIO * functions
+    else:
+        aux_functions, _ = molecule_functions(aux, composition, use_cache)
+
+    pairs = _unique_pairs(functions)
+    eris = _unique_pairs(pairs)
+    return CostEstimate(
+        basis=basis,
+        functions=functions,
+        primitives=primitives,
+        aux_functions=aux_functions,
+        eris=eris,
+        primitive_quartets=_unique_pairs(_unique_pairs(primitives)),
+        matrix_bytes=WORD * functions**2,
+        conventional_bytes=WORD * eris,
+        ri_bytes=WORD * (aux_functions * pairs + aux_functions**2),
+    )
+
+
+def format_size(size: int) -> str:
+    """Format a number of bytes with a binary prefix.
+
+    Examples:
+        >>> format_size(512), format_size(3 * 1024**3)
+        ('512 B', '3.0 GiB')
+    """
+    value = float(size)
+    for unit in ("B", "KiB", "MiB", "GiB", "TiB", "PiB"):
+        if value < 1024 or unit == "PiB":
+            break
+        value /= 1024
+    return f"{size} B" if unit == "B" else f"{value:.1f} {unit}"
+
+
+def format_number(number: int) -> str:
+    """Format a count, switching to scientific notation for large values.
+
+    Examples:
+        >>> format_number(406), format_number(123_456_789)
+        ('406', '1.23e+08')
+    """
+    return f"{number:,}" if number < 1_000_000 else f"{number:.2e}"
+
+
+def iter_cost_table(
+    estimates: Iterable[CostEstimate],
+    format: Literal["plain", "csv"] = "plain",
+    memory: int | None = None,
+) -> Iterator[str]:
+    """Generate a table comparing cost estimates, one column per basis set.
+
+    Args:
+        estimates: estimates to compare
+        format: plain text (human-readable units) or CSV (raw values)
+        memory: available memory in bytes; adds rows saying which methods fit
+
+    Examples:
+        >>> for line in iter_cost_table([estimate_cost("sto-3g", {1: 2})]):
+        ...     print(line)
+                            |  sto-3g
+        -------------------------------
+        Basis functions     |         2
+        Primitive functions |         6
+        Auxiliary functions |         6
+        Unique 2e integrals |         6
+        Primitive quartets  |       231
+        N×N matrix          |      32 B
+        Conventional ERIs   |      48 B
+        RI 3-index + metric |     432 B
+    """
+    estimates = list(estimates)
+    if format == "csv":
+        yield ",".join(["basis", *ROWS])
+        for estimate in estimates:
+            yield ",".join(map(str, estimate))
+        return
+    if format != "plain":
+        raise ValueError(f"Invalid format: {format}")
+
+    rows = {
+        label: [
+            format_size(value) if field.endswith("bytes") else format_number(value)
+            for value in (getattr(estimate, field) for estimate in estimates)
+        ]
+        for field, label in ROWS.items()
+    }
+    if memory is not None:
+        fits = f"Fits {format_size(memory)}"
+        rows[f"{fits}: conventional"] = [
+            "yes" if estimate.conventional_bytes <= memory else "no" for estimate in estimates
+        ]
+        rows[f"{fits}: RI"] = [
+            "yes" if estimate.ri_bytes <= memory else "no" for estimate in estimates
+        ]
+
+    label_width = max(map(len, rows))
+    width = max(10, max((len(estimate.basis) + 2 for estimate in estimates), default=0))
+    header = " " * label_width + " |" + " |".join(f"{e.basis:^{width}}" for e in estimates)
+    yield header.rstrip()
+    yield "-" * (label_width + len(estimates) * (width + 2))
+    for label, values in rows.items():
+        yield f"{label:{label_width}} |" + " |".join(f"{value:>{width}}" for value in values)
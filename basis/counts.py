@@ -0,0 +1,266 @@
+"""Array-backed basis function counts with vectorized operations."""
+
+import itertools
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass
+from typing import Self
+
+import numpy as np
+import numpy.typing as npt
+
+from .basis import (
+    ANY_COUNT,
+    BASIS_COUNT,
+    cartesian_harmonics_counts,
+    parse_elements,
+    spherical_harmonics_counts,
+)
+
+IntArray = npt.NDArray[np.int64]
+
+
+@dataclass(frozen=True, eq=False)
+class CountArray:
+    """Basis function counts as an integer array of shape `(n_elements, max_am, 2)`.
+
+    The last axis holds the (contracted, uncontracted) counts of each angular momentum.
+    `n_am` records how many angular momenta each element lists in the dictionary form
+    (`BASIS_COUNT`), so that conversions round-trip exactly.
+
+    Examples:
+        >>> counts = CountArray.from_dict({1: ([1], [3]), 6: ([2, 1], [6, 3])})
+        >>> counts.elements.tolist(), counts.data.shape
+        ([1, 6], (2, 2, 2))
+        >>> counts.spherical().to_dict()
+        {1: ([1], [3]), 6: ([2, 3], [6, 9])}
+        >>> counts.cartesian().select([6]).to_dict()
+        {6: ([2, 3], [6, 9])}
+    """
+
+    elements: IntArray
+    data: IntArray
+    n_am: IntArray
+
+    def __post_init__(self) -> None:
+        """Validate that the arrays describe the same elements."""
+        if self.data.ndim != 3 or self.data.shape[2] != 2:
+            raise ValueError(f"Expected data of shape (n_elements, max_am, 2): {self.data.shape}")
+        if not len(self.elements) == len(self.n_am) == len(self.data):
+            raise ValueError("elements, n_am, and data must have the same length")
+
+    @classmethod
+    def from_dict(cls, counts: ANY_COUNT, max_am: int | None = None) -> Self:
+        """Convert the dictionary form of a basis set's counts.
+
+        Args:
+            counts: mapping of element to tuple of contracted and uncontracted counts
+            max_am: size of the angular momentum axis; defaults to the largest needed
+        """
+        elements = np.array(sorted(counts), dtype=np.int64)
+        n_am = np.array([len(counts[element][0]) for element in elements], dtype=np.int64)
+        if max_am is None:
+            max_am = int(n_am.max(initial=0))
+
+        data = np.zeros((len(elements), max_am, 2), dtype=np.int64)
+        for i, element in enumerate(elements):
+            contracted, uncontracted = counts[element]
+            data[i, : len(contracted), 0] = contracted
+            data[i, : len(uncontracted), 1] = uncontracted
+
+        return cls(elements, data, n_am)
+
+    def to_dict(self) -> BASIS_COUNT:
+        """Convert to the dictionary form (`BASIS_COUNT`)."""
+        return {
+            int(element): (values[:n, 0].tolist(), values[:n, 1].tolist())
+            for element, values, n in zip(self.elements, self.data, self.n_am, strict=True)
+        }
+
+    @property
+    def max_am(self) -> int:
+        """Size of the angular momentum axis (one more than the highest angular momentum)."""
+        return self.data.shape[1]
+
+    @property
+    def contracted(self) -> IntArray:
+        """Contracted counts, shape `(n_elements, max_am)`."""
+        return self.data[..., 0]
+
+    @property
+    def uncontracted(self) -> IntArray:
+        """Uncontracted counts, shape `(n_elements, max_am)`."""
+        return self.data[..., 1]
+
+    def pad(self, max_am: int) -> Self:
+        """Widen the angular momentum axis to *max_am* with zeros."""
+        if max_am <= self.max_am:
+            return self
+        data = np.zeros((len(self.elements), max_am, 2), dtype=self.data.dtype)
+        data[:, : self.max_am] = self.data
+        return type(self)(self.elements, data, self.n_am)
+
+    def select(self, elements: Iterable[int | str]) -> Self:
+        """Keep only the given elements (those missing from the basis set are skipped)."""
+        mask = np.isin(self.elements, parse_elements(elements))
+        return type(self)(self.elements[mask], self.data[mask], self.n_am[mask])
+
+    def difference(self, other: "CountArray") -> Self:
+        """Subtract these counts from *other* for the elements both contain.
+
+        Vectorized equivalent of `basis.basis.difference`.
+
+        Examples:
+            >>> sto3g = CountArray.from_dict({1: ([1], [3]), 6: ([2, 1], [6, 3])})
+            >>> sto6g = CountArray.from_dict({1: ([1], [6]), 8: ([2, 1], [12, 6])})
+            >>> sto3g.difference(sto6g).to_dict()
+            {1: ([0], [3])}
+        """
+        elements, mine, theirs = np.intersect1d(self.elements, other.elements, return_indices=True)
+        max_am = max(self.max_am, other.max_am)
+        a, b = self.pad(max_am), other.pad(max_am)
+        return type(self)(
+            elements,
+            b.data[theirs] - a.data[mine],
+            np.maximum(a.n_am[mine], b.n_am[theirs]),
+        )
+
+    def _scale(self, factors: Iterable[int]) -> Self:
+        factor = np.fromiter(factors, dtype=np.int64, count=self.max_am)
+        return type(self)(self.elements, self.data * factor[None, :, None], self.n_am)
+
+    def spherical(self) -> Self:
+        """Convert counts of shells into counts of spherical (2l+1) basis functions."""
+        return self._scale(spherical_harmonics_counts.values())
+
+    def cartesian(self) -> Self:
+        """Convert counts of shells into counts of cartesian ((l+1)(l+2)/2) basis functions."""
+        return self._scale(cartesian_harmonics_counts.values())
+
+    def totals(self) -> IntArray:
+        """Sum over angular momenta, shape `(n_elements, 2)`."""
+        return self.data.sum(axis=1)
+
+
+def stack_counts(
+    counts: Mapping[str, ANY_COUNT],
+    elements: Iterable[int],
+) -> tuple[IntArray, IntArray]:
+    """Stack the counts of several basis sets on a shared element and angular momentum axis.
+
+    Args:
+        counts: mapping of basis set name to its counts
+        elements: atomic numbers of the element axis
+
+    Returns:
+        Counts of shape `(n_basis, n_elements, max_am, 2)`, and the number of angular
+        momenta of each basis set and element, shape `(n_basis, n_elements)`, which is -1
+        for elements absent from a basis set
+
+    Examples:
+        >>> data, n_am = stack_counts({"a": {1: ([1], [3])}, "b": {6: ([2, 1], [6, 3])}}, [1, 6])
+        >>> data.shape, n_am.tolist()
+        ((2, 2, 2, 2), [[1, -1], [-1, 2]])
+    """
+    elements = np.fromiter(elements, dtype=np.int64)
+    arrays = [CountArray.from_dict(basis_counts) for basis_counts in counts.values()]
+    max_am = max((array.max_am for array in arrays), default=0)
+
+    data = np.zeros((len(arrays), len(elements), max_am, 2), dtype=np.int64)
+    n_am = np.full((len(arrays), len(elements)), -1, dtype=np.int64)
+    for i, array in enumerate(arrays):
+        selected = array.select(elements.tolist()).pad(max_am)
+        positions = np.searchsorted(elements, selected.elements)
+        data[i, positions] = selected.data
+        n_am[i, positions] = selected.n_am
+    return data, n_am
+
+
+def pairwise_differences(
+    counts: Mapping[str, ANY_COUNT],
+    pairs: Iterable[tuple[str, str]],
+    elements: Iterable[int | str] | None = None,
+) -> dict[tuple[str, str], BASIS_COUNT]:
+    """Subtract the counts of many pairs of basis sets in one vectorized pass.
+
+    Each pair `(a, b)` gives `b - a` for the elements both contain, like
+    `basis.basis.difference(counts[a], counts[b])`.
+
+    Args:
+        counts: mapping of basis set name to its counts
+        pairs: pairs of basis set names to subtract
+        elements: elements to compare; defaults to every element of any basis set
+
+    Returns:
+        Mapping of each pair to its difference
+
+    Examples:
+        >>> counts = {"sto-3g": {1: ([1], [3])}, "sto-6g": {1: ([1], [6])}}
+        >>> pairwise_differences(counts, [("sto-3g", "sto-6g"), ("sto-6g", "sto-3g")])
+        {('sto-3g', 'sto-6g'): {1: ([0], [3])}, ('sto-6g', 'sto-3g'): {1: ([0], [-3])}}
+    """
+    pairs = list(pairs)
+    if elements is None:
+        element_list = sorted(
+            set().union(*(basis_counts.keys() for basis_counts in counts.values()))
+        )
+    else:
+        element_list = parse_elements(elements)
+
+    data, n_am = stack_counts(counts, element_list)
+    positions = {basis: i for i, basis in enumerate(counts)}
+    first = np.array([positions[a] for a, _ in pairs], dtype=np.int64)
+    second = np.array([positions[b] for _, b in pairs], dtype=np.int64)
+
+    deltas = (data[second] - data[first]).tolist()
+    lengths = np.where(
+        (n_am[first] >= 0) & (n_am[second] >= 0),
+        np.maximum(n_am[first], n_am[second]),
+        -1,
+    ).tolist()
+
+    return {
+        pair: {
+            element: ([c for c, _ in values[:n]], [u for _, u in values[:n]])
+            for element, values, n in zip(element_list, pair_deltas, pair_lengths, strict=True)
+            if n >= 0
+        }
+        for pair, pair_deltas, pair_lengths in zip(pairs, deltas, lengths, strict=True)
+    }
+
+
+def difference_from(
+    counts: Mapping[str, ANY_COUNT],
+    reference: str,
+    elements: Iterable[int | str] | None = None,
+) -> dict[str, BASIS_COUNT]:
+    """Subtract the counts of *reference* from those of every other basis set.
+
+    Returns:
+        Mapping of each other basis set to its difference from *reference*
+
+    Raises:
+        KeyError: *reference* is not one of the basis sets
+
+    Examples:
+        >>> counts = {"sto-3g": {1: ([1], [3])}, "sto-6g": {1: ([1], [6])}}
+        >>> difference_from(counts, "sto-3g")
+        {'sto-6g': {1: ([0], [3])}}
+    """
+    if reference not in counts:
+        raise KeyError(f"Reference basis set {reference} is not among the basis sets")
+    pairs = [(reference, basis) for basis in counts if basis != reference]
+    return {b: delta for (_, b), delta in pairwise_differences(counts, pairs, elements).items()}
+
+
+def difference_matrix(
+    counts: Mapping[str, ANY_COUNT],
+    elements: Iterable[int | str] | None = None,
+) -> dict[tuple[str, str], BASIS_COUNT]:
+    """Subtract the counts of every pair of basis sets, each later one minus each earlier one.
+
+    Examples:
+        >>> counts = {"a": {1: ([1], [3])}, "b": {1: ([2], [4])}, "c": {1: ([3], [6])}}
+        >>> list(difference_matrix(counts).items())[-1]
+        (('b', 'c'), {1: ([1], [2])})
+    """
+    return pairwise_differences(counts, itertools.combinations(counts, 2), elements)
@@ -0,0 +1,209 @@
+"""Long-running daemon that keeps basis sets and counts warm between CLI invocations.
+
+Each call of the `basis` command otherwise pays for starting the interpreter, importing
+the Basis Set Exchange, and loading basis sets.  The daemon pays these once and answers
+requests (see `basis.client` for the protocol) from its in-process memos.
+
+Anyone who can reach the daemon can have it read files (`edit` of an input file), so it
+listens on a Unix socket only its owner may connect to, or on TCP only on the loopback
+interface and only for clients presenting its token.  Shutdown is accepted only over a
+Unix socket.
+"""
+
+import asyncio
+import contextlib
+import hmac
+import ipaddress
+import json
+import os
+import secrets
+import socket
+from pathlib import Path
+from typing import Any
+
+from .basis import (
+    EditStep,
+    configure_memo,
+    count,
+    edit_basis,
+    guess_format,
+    iter_table,
+)
+from .client import daemon_address, parse_address, request, token_path
+
+# Requests are small, but edits may return large formatted basis sets
+_STREAM_LIMIT = 64 * 1024**2
+
+
+def handle_request(command: str, args: dict[str, Any]) -> Any:
+    """Carry out a request.
+
+    Args:
+        command: request type (`count`, `show`, `edit`, or `ping`)
+        args: keyword arguments of the request; `edit` guesses the format from `output`
+            when no `fmt` is given, returning `fmt` as `None` if it falls back to nwchem
+
+    Returns:
+        JSON-serializable result
+
+    Raises:
+        ValueError: unknown command
+
+    Examples:
+        >>> handle_request("count", {"basis": "sto-3g", "elements": ["H"]})
+        {'1': [[1], [3]]}
+        >>> print(handle_request("show", {"basis": ["sto-3g"], "elements": ["H"]})["output"])
+           | sto-3g
+           |  s |  s
+        ------------
+        H  |  3 →  1
+    """
+    match command:
+        case "ping":
+            return {"pid": os.getpid()}
+        case "count":
+            counts = count(args["basis"], args.get("elements"), args.get("use_cache", True))
+            return {str(element): [con, uncon] for element, (con, uncon) in counts.items()}
+        case "show":
+            lines = iter_table(
+                args["basis"],
+                args.get("elements"),
+                args.get("diff", False),
+                args.get("format", "plain"),
+                args.get("spherical", False),
+                diff_ref=args.get("diff_ref"),
+                diff_matrix=args.get("diff_matrix", False),
+                workers=args.get("workers", 1),
+                use_cache=args.get("use_cache", True),
+            )
+            return {"output": "\n".join(lines)}
+        case "edit":
+            # Guessed here, as the writer formats are only known once BSE is imported
+            fmt = args.get("fmt") or guess_format(args.get("output") or "")
+            output = edit_basis(
+                args.get("basis"),
+                args.get("elements"),
+                args.get("remove"),
+                fmt or "nwchem",
+                args.get("input_file"),
+                steps=[EditStep(*step) for step in args.get("steps", [])],
+                only=args.get("only"),
+            )
+            return {"output": output, "fmt": fmt}
+        case _:
+            raise ValueError(f"Unknown command: {command!r}")
+
+
+def _is_loopback(host: str) -> bool:
+    """Whether *host* resolves only to loopback addresses.
+
+    Examples:
+        >>> _is_loopback("127.0.0.1"), _is_loopback("0.0.0.0")
+        (True, False)
+    """
+    try:
+        infos = socket.getaddrinfo(host, None, type=socket.SOCK_STREAM)
+    except OSError:
+        return False
+    return all(ipaddress.ip_address(info[4][0]).is_loopback for info in infos)
+
+
+async def _handle_connection(
+    reader: asyncio.StreamReader,
+    writer: asyncio.StreamWriter,
+    stop: asyncio.Event,
+    token: str | None,
+) -> None:
+    try:
+        request = json.loads(await reader.readline())
+        if token is not None and not hmac.compare_digest(
+            str(request.get("token")).encode(), token.encode()
+        ):
+            raise PermissionError("Invalid or missing token")
+        if request["command"] == "shutdown":
+            if token is not None:
+                raise PermissionError("Shutdown is only accepted over a Unix socket")
+            stop.set()
+            response = {"ok": True, "result": None}
+        else:
+            # Keep the event loop responsive while a request is being carried out
+            result = await asyncio.to_thread(handle_request, request["command"], request["args"])
+            response = {"ok": True, "result": result}
+    except Exception as e:
+        response = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+
+    with contextlib.suppress(ConnectionError):
+        writer.write(json.dumps(response).encode() + b"\n")
+        await writer.drain()
+        writer.close()
+        await writer.wait_closed()
+
+
+async def serve_forever(address: str | None = None) -> None:
+    """Serve requests at *address* (a socket path or `host:port`) until shut down.
+
+    Over TCP, requests must carry `$BASIS_DAEMON_TOKEN`, or if it is not set a random token
+    written to `basis.client.token_path` while the daemon runs.
+
+    Raises:
+        RuntimeError: another daemon is already serving at *address*, or *address* is a
+            TCP address off the loopback interface
+    """
+    address = address or daemon_address()
+    with contextlib.suppress(OSError):
+        request("ping", address=address)
+        raise RuntimeError(f"A daemon is already serving at {address}")
+
+    target = parse_address(address)
+    stop = asyncio.Event()
+    token = None
+
+    def handler(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> Any:
+        return _handle_connection(reader, writer, stop, token)
+
+    if isinstance(target, str):
+        # Removed on shutdown
+        path = Path(target)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.unlink(missing_ok=True)
+        # Only the owner may connect
+        umask = os.umask(0o077)
+        try:
+            server = await asyncio.start_unix_server(handler, path, limit=_STREAM_LIMIT)
+        finally:
+            os.umask(umask)
+    else:
+        host, port = target
+        if not _is_loopback(host):
+            raise RuntimeError(f"Refusing to serve on {host}, which is not a loopback address")
+        token = os.environ.get("BASIS_DAEMON_TOKEN")
+        path = None
+        if token is None:
+            token = secrets.token_urlsafe(32)
+            path = token_path(port)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.unlink(missing_ok=True)
+            # Only the owner may read the token
+            with os.fdopen(os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600), "w") as fh:
+                fh.write(token)
+        server = await asyncio.start_server(handler, host, port, limit=_STREAM_LIMIT)
+
+    try:
+        async with server:
+            await stop.wait()
+    finally:
+        if path is not None:
+            path.unlink(missing_ok=True)
+
+
+def serve(address: str | None = None, memo_size: int | None = None) -> None:
+    """Run the daemon until it is shut down or interrupted.
+
+    Args:
+        address: socket path or `host:port`; defaults to `daemon_address()`
+        memo_size: number of loaded basis sets to keep warm
+    """
+    if memo_size is not None:
+        configure_memo(basis_maxsize=memo_size, count_maxsize=8 * memo_size)
+    with contextlib.suppress(KeyboardInterrupt):
+        asyncio.run(serve_forever(address))
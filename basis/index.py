@@ -0,0 +1,276 @@
+"""Prebuilt index of basis function counts for a whole library of basis sets.
+
+The index stores every (basis set, element, angular momentum) count in one fixed-width
+array so that lookups never touch the Basis Set Exchange.  The file layout is::
+
+    header | basis set names | uint16[n_basis, n_elements, max_am, 2]
+
+where the last axis holds the (contracted, uncontracted) counts.  An element that is
+absent from a basis set has all-zero counts.
+
+The counts start at an aligned offset so that the file can be memory-mapped and read in
+place: opening the index parses only the header and names, a lookup touches only the
+pages holding its counts, and every process on a machine shares one copy of those pages
+through the page cache.
+"""
+
+import functools
+import mmap
+import os
+import struct
+import sys
+from array import array
+from collections.abc import Iterable, Mapping
+from pathlib import Path
+from typing import IO, TYPE_CHECKING
+
+from ._lazy import lazy_import
+from .cache import bse_version, cache_dir
+
+if TYPE_CHECKING:
+    from .basis import ANY_COUNT, BASIS_COUNT
+
+bse = lazy_import("basis_set_exchange")
+
+# Bump whenever the file layout changes
+INDEX_SCHEMA_VERSION = 1
+INDEX_FILENAME = "index.bin"
+
+_MAGIC = b"BASISIDX"
+# magic, schema, n_elements, max_am, n_basis, names block size, BSE version
+_HEADER = struct.Struct("<8sHHHxxII32s")
+_ALIGNMENT = 8
+
+
+def index_path() -> Path:
+    """Default location of the index (`$BASIS_INDEX`, or inside the cache directory)."""
+    if path := os.environ.get("BASIS_INDEX"):
+        return Path(path)
+    return cache_dir() / INDEX_FILENAME
+
+
+class CountIndex:
+    """Basis function counts for many basis sets, stored in one fixed-width array."""
+
+    def __init__(
+        self,
+        names: list[str],
+        data: array | memoryview,
+        n_elements: int,
+        max_am: int,
+        version: str,
+    ) -> None:
+        """Wrap *data* laid out as `[n_basis, n_elements, max_am, 2]` in a lookup table.
+
+        Args:
+            names: basis set names, in the order of the first axis of *data*
+            data: uint16 counts, in memory or mapped from a file
+            n_elements: size of the element axis (indexed by atomic number)
+            max_am: size of the angular momentum axis
+            version: BSE version the counts were generated with
+        """
+        if len(data) != len(names) * n_elements * max_am * 2:
+            raise ValueError(f"Index data does not match its shape: {len(data)=}")
+
+        self.names = names
+        self.data = data
+        self.n_elements = n_elements
+        self.max_am = max_am
+        self.version = version
+        self._positions = {name.lower(): i for i, name in enumerate(names)}
+
+    def __contains__(self, basis: object) -> bool:
+        """Whether *basis* (case-insensitive) is in the index."""
+        return isinstance(basis, str) and basis.lower() in self._positions
+
+    def __len__(self) -> int:
+        """Number of basis sets in the index."""
+        return len(self.names)
+
+    def counts(self, basis: str, elements: Iterable[int] | None = None) -> "BASIS_COUNT":
+        """Look up the counts of a basis set.
+
+        Args:
+            basis: basis set name (case-insensitive)
+            elements: atomic numbers to look up; `None` returns all elements in the basis
+
+        Returns:
+            Mapping of element to tuple of contracted and uncontracted counts
+
+        Raises:
+            KeyError: basis set is not in the index
+        """
+        position = self._positions[basis.lower()]
+        element_stride = self.max_am * 2
+        start = position * self.n_elements * element_stride
+
+        if elements is None:
+            elements = range(self.n_elements)
+
+        counts = {}
+        for element in elements:
+            if not 0 <= element < self.n_elements:
+                continue
+            offset = start + element * element_stride
+            values = self.data[offset : offset + element_stride]
+            contracted = values[0::2]
+            n_am = max((am + 1 for am, c in enumerate(contracted) if c), default=0)
+            if n_am:
+                counts[element] = (contracted[:n_am].tolist(), values[1::2][:n_am].tolist())
+
+        return counts
+
+    @classmethod
+    def from_counts(
+        cls,
+        counts: "Mapping[str, ANY_COUNT]",
+        n_elements: int,
+        version: str,
+    ) -> "CountIndex":
+        """Pack the counts of several basis sets into an index."""
+        max_am = max(
+            (len(con) for basis_counts in counts.values() for con, _ in basis_counts.values()),
+            default=0,
+        )
+        element_stride = max_am * 2
+        basis_stride = n_elements * element_stride
+
+        data = array("H", bytes(2 * len(counts) * basis_stride))
+        for position, basis_counts in enumerate(counts.values()):
+            for element, (con, uncon) in basis_counts.items():
+                offset = position * basis_stride + element * element_stride
+                data[offset : offset + 2 * len(con) : 2] = array("H", con)
+                data[offset + 1 : offset + 2 * len(uncon) : 2] = array("H", uncon)
+
+        return cls(list(counts), data, n_elements, max_am, version)
+
+    def write(self, path: Path | str) -> None:
+        """Atomically write the index to *path*."""
+        path = Path(path)
+        names = "\n".join(self.names).encode()
+        header = _HEADER.pack(
+            _MAGIC,
+            INDEX_SCHEMA_VERSION,
+            self.n_elements,
+            self.max_am,
+            len(self.names),
+            len(names),
+            self.version.encode(),
+        )
+        padding = -(len(header) + len(names)) % _ALIGNMENT
+
+        data = self.data
+        if sys.byteorder == "big":
+            data = array("H", data)
+            data.byteswap()
+
+        def write(fh: IO[bytes]) -> None:
+            fh.write(header + names + bytes(padding))
+            fh.write(data)
+
+        from .basis import write_atomic  # noqa: PLC0415
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        write_atomic(path, write)
+
+    @classmethod
+    def read(cls, path: Path | str) -> "CountIndex":
+        """Open the index at *path*, mapping its counts into memory rather than reading them.
+
+        The file stays mapped for as long as the index is alive.  Replacing the file, as
+        rebuilding the index does, leaves the mapping of the old one intact.
+
+        Raises:
+            ValueError: file is not an index or was written with another schema version
+        """
+        with open(path, "rb") as fh:
+            raw = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, schema, n_elements, max_am, n_basis, names_size, version = _HEADER.unpack_from(raw)
+        if magic != _MAGIC:
+            raise ValueError(f"Not a basis count index: {path}")
+        if schema != INDEX_SCHEMA_VERSION:
+            raise ValueError(f"Unsupported index schema version {schema} in {path}")
+
+        names_end = _HEADER.size + names_size
+        names = raw[_HEADER.size : names_end].decode().split("\n") if n_basis else []
+        data_start = names_end + -names_end % _ALIGNMENT
+        data_end = data_start + 2 * n_basis * n_elements * max_am * 2
+        if len(raw) != data_end:
+            raise ValueError(f"Index is truncated or has trailing data: {path}")
+
+        if sys.byteorder == "big":
+            # Stored little-endian, so swapped into a private copy
+            data = array("H", raw[data_start:])
+            data.byteswap()
+        else:
+            data = memoryview(raw)[data_start:].cast("H")
+
+        return cls(names, data, n_elements, max_am, version.rstrip(b"\0").decode())
+
+
+def build_index(
+    names: Iterable[str] | None = None,
+    path: Path | str | None = None,
+) -> tuple[CountIndex, dict[str, str]]:
+    """Count every basis set and write the results to an index.
+
+    Basis sets that cannot be counted are left out of the index and reported.
+
+    Args:
+        names: basis sets to index; defaults to every basis set in the BSE
+        path: where to write the index; defaults to `index_path()`
+
+    Returns:
+        The index, and a mapping of skipped basis set to the reason it was skipped
+    """
+    # basis.basis serves counts from the index, so it can only be imported here
+    from .basis import atomic_numbers, compact_counts, count  # noqa: PLC0415
+
+    if names is None:
+        names = bse.get_all_basis_names()
+
+    # Packed, as the counts of the whole library are held until the index is written
+    counts: dict[str, "ANY_COUNT"] = {}
+    failures: dict[str, str] = {}
+    for name in names:
+        try:
+            counts[name] = compact_counts(count(name, use_cache=False))
+        except (KeyError, ValueError) as e:
+            failures[name] = f"{type(e).__name__}: {e}"
+
+    index = CountIndex.from_counts(counts, len(atomic_numbers), bse_version())
+    index.write(path or index_path())
+    _read_index.cache_clear()
+
+    return index, failures
+
+
+# Only the current index stays open, so replacing the file releases the old mapping
+@functools.lru_cache(maxsize=1)
+def _read_index(path: Path, inode: int, mtime_ns: int) -> CountIndex | None:
+    try:
+        index = CountIndex.read(path)
+    except (OSError, ValueError, struct.error):
+        return None
+    return index if index.version == bse_version() else None
+
+
+def load_index(path: Path | str | None = None) -> CountIndex | None:
+    """Load the index if it exists and matches the installed BSE version.
+
+    The index is read once per process and reloaded when the file changes.
+
+    Args:
+        path: index to load; defaults to `index_path()`
+
+    Returns:
+        The index, or `None` if it is missing, unreadable, or out of date
+    """
+    path = Path(path or index_path())
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    # The index is replaced atomically on rebuild, which also changes its inode
+    return _read_index(path, stat.st_ino, stat.st_mtime_ns)
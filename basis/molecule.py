@@ -0,0 +1,227 @@
+"""Total basis function counts of molecules read from XYZ files."""
+
+import csv
+import functools
+import io
+import json
+import sys
+from collections import Counter
+from collections.abc import Iterable, Iterator
+from itertools import chain, islice
+from pathlib import Path
+from typing import Literal, NamedTuple, TextIO
+
+import numpy as np
+
+from .basis import atomic_dict, atomic_numbers, count
+from .counts import CountArray
+
+# Columns of the per-element totals: contracted, uncontracted, spherical
+TOTALS = ("contracted", "uncontracted", "spherical")
+
+
+class Molecule(NamedTuple):
+    """A molecule reduced to its composition."""
+
+    name: str
+    composition: dict[int, int]
+
+
+class MoleculeTotals(NamedTuple):
+    """Total basis function counts of a molecule; `None` if the basis set lacks an element."""
+
+    molecule: str
+    basis: str
+    contracted: int | None
+    uncontracted: int | None
+    spherical: int | None
+
+
+@functools.cache
+def _atomic_number(symbol: str) -> int:
+    """Convert an XYZ atom label (symbol, atomic number, or e.g. `C12`) to an atomic number.
+
+    Examples:
+        >>> _atomic_number("C"), _atomic_number("cl"), _atomic_number("8"), _atomic_number("N2")
+        (6, 17, 8, 7)
+    """
+    if symbol.isdigit():
+        if int(symbol) >= len(atomic_numbers):
+            raise ValueError(f"Unknown element: {symbol!r}")
+        return int(symbol)
+    letters = symbol.rstrip("0123456789").capitalize()
+    try:
+        return atomic_dict[letters]
+    except KeyError:
+        raise ValueError(f"Unknown element: {symbol!r}") from None
+
+
+def _frames(lines: Iterator[str], source: str) -> Iterator[dict[int, int]]:
+    """Parse the compositions of the consecutive frames of an XYZ file."""
+    for header in lines:
+        if not (header := header.strip()):
+            continue
+        try:
+            n_atoms = int(header)
+        except ValueError:
+            raise ValueError(f"Expected a number of atoms in {source}, got: {header!r}") from None
+
+        next(lines, None)  # comment
+        atoms = list(islice(lines, n_atoms))
+        try:
+            symbols = Counter([line.split(None, 1)[0] for line in atoms])
+        except IndexError:
+            symbols = Counter()
+        if len(atoms) != n_atoms or symbols.total() != n_atoms:
+            raise ValueError(f"Expected {n_atoms} atoms in {source}")
+
+        composition: Counter[int] = Counter()
+        for symbol, n in symbols.items():
+            composition[_atomic_number(symbol)] += n
+        yield dict(composition)
+
+
+def read_xyz(stream: TextIO | Iterable[str], name: str = "-") -> Iterator[Molecule]:
+    """Read the molecules of an XYZ file, which may hold several concatenated frames.
+
+    A single molecule is named *name*; the frames of a multi-frame file are named
+    `name:1`, `name:2`, ....
+
+    Args:
+        stream: lines of an XYZ file
+        name: name of the file
+
+    Returns:
+        Molecules, in file order
+
+    Raises:
+        ValueError: file is not valid XYZ or contains an unknown element
+
+    Examples:
+        >>> xyz = ["3", "water", "O 0 0 0", "H 0 0 1", "H 0 1 0"]
+        >>> list(read_xyz(xyz, "water.xyz"))
+        [Molecule(name='water.xyz', composition={8: 1, 1: 2})]
+        >>> [molecule.name for molecule in read_xyz(xyz * 2, "traj.xyz")]
+        ['traj.xyz:1', 'traj.xyz:2']
+    """
+    frames = _frames(iter(stream), name)
+    if (first := next(frames, None)) is None:
+        return
+    if (second := next(frames, None)) is None:
+        yield Molecule(name, first)
+        return
+    for i, composition in enumerate(chain([first, second], frames), start=1):
+        yield Molecule(f"{name}:{i}", composition)
+
+
+def iter_molecules(paths: Iterable[Path | str]) -> Iterator[Molecule]:
+    """Read molecules from XYZ files, directories of `*.xyz` files, or `-` for stdin."""
+    for source in paths:
+        if str(source) == "-":
+            yield from read_xyz(sys.stdin)
+            continue
+
+        path = Path(source)
+        files = sorted(path.glob("*.xyz")) if path.is_dir() else [path]
+        for file in files:
+            with open(file) as fh:
+                yield from read_xyz(fh, str(file))
+
+
+def element_totals(basis: str, *, use_cache: bool = True) -> np.ndarray:
+    """Totals of each element, shape `(n_elements, 3)` indexed by atomic number.
+
+    The columns are in the order of `TOTALS`; elements missing from the basis set are -1.
+
+    Examples:
+        >>> element_totals("sto-3g")[[1, 6]].tolist()
+        [[1, 3, 1], [3, 9, 5]]
+    """
+    counts = CountArray.from_dict(count(basis, use_cache=use_cache))
+    totals = np.full((len(atomic_numbers), len(TOTALS)), -1, dtype=np.int64)
+    totals[counts.elements, :2] = counts.totals()
+    totals[counts.elements, 2] = counts.spherical().contracted.sum(axis=1)
+    return totals
+
+
+def molecule_totals(
+    molecules: Iterable[Molecule],
+    basis_sets: list[str],
+    *,
+    batch_size: int = 4096,
+    use_cache: bool = True,
+) -> Iterator[MoleculeTotals]:
+    """Compute the total basis function counts of many molecules in many basis sets.
+
+    Molecules are reduced to element histograms and processed in batches, so that the
+    totals of a whole batch in every basis set are one matrix product.
+
+    Args:
+        molecules: molecules to count
+        basis_sets: basis sets to count the molecules in
+        batch_size: number of molecules per batch
+        use_cache: read from and write to the persistent count cache
+
+    Returns:
+        Totals for each molecule in each basis set, molecule-major
+
+    Examples:
+        >>> water = Molecule("water", {8: 1, 1: 2})
+        >>> uranium = Molecule("uranium", {92: 1})
+        >>> for totals in molecule_totals([water, uranium], ["sto-3g"]):
+        ...     print(totals.molecule, totals.contracted, totals.uncontracted, totals.spherical)
+        water 5 15 7
+        uranium None None None
+    """
+    per_element = np.stack([element_totals(basis, use_cache=use_cache) for basis in basis_sets])
+    # (n_elements, n_basis * 3), with missing elements zeroed and flagged separately
+    missing = (per_element[..., 0] < 0).T
+    weights = (
+        np.where(per_element < 0, 0, per_element)
+        .transpose(1, 0, 2)
+        .reshape(len(atomic_numbers), -1)
+    )
+
+    molecules = iter(molecules)
+    while batch := list(islice(molecules, batch_size)):
+        histogram = np.zeros((len(batch), len(atomic_numbers)), dtype=np.int64)
+        for row, molecule in enumerate(batch):
+            histogram[row, list(molecule.composition)] = list(molecule.composition.values())
+
+        totals = (histogram @ weights).reshape(len(batch), len(basis_sets), len(TOTALS))
+        unsupported = (histogram @ missing) > 0
+        for molecule, rows, flags in zip(batch, totals.tolist(), unsupported.tolist(), strict=True):
+            for basis, values, lacking in zip(basis_sets, rows, flags, strict=True):
+                yield MoleculeTotals(
+                    molecule.name, basis, *((None,) * len(TOTALS) if lacking else values)
+                )
+
+
+def iter_molecule_rows(
+    totals: Iterable[MoleculeTotals],
+    format: Literal["csv", "ndjson"] = "csv",
+) -> Iterator[str]:
+    """Format molecule totals as CSV (with a header) or newline-delimited JSON.
+
+    Examples:
+        >>> rows = [MoleculeTotals("water", "sto-3g", 5, 15, 7)]
+        >>> list(iter_molecule_rows(rows))
+        ['molecule,basis,contracted,uncontracted,spherical', 'water,sto-3g,5,15,7']
+        >>> list(iter_molecule_rows(rows, "ndjson"))  # doctest: +ELLIPSIS
+        ['{"molecule": "water", "basis": "sto-3g", "contracted": 5, ...}']
+    """
+    match format:
+        case "csv":
+            # Missing totals (None) are written as empty fields
+            buffer = io.StringIO()
+            writer = csv.writer(buffer, lineterminator="")
+            for row in chain([MoleculeTotals._fields], totals):
+                buffer.seek(0)
+                buffer.truncate()
+                writer.writerow(row)
+                yield buffer.getvalue()
+        case "ndjson":
+            for row in totals:
+                yield json.dumps(row._asdict())
+        case _:
+            raise ValueError(f"Invalid format: {format}")
@@ -0,0 +1,121 @@
+"""Search a count index for the basis sets that satisfy coverage and size constraints."""
+
+from collections.abc import Iterable, Iterator, Mapping
+from typing import Literal, NamedTuple
+
+import numpy as np
+
+from .basis import parse_elements, spherical_harmonics
+from .index import CountIndex
+
+CONTRACTIONS = ("contracted", "uncontracted")
+
+
+class SearchResult(NamedTuple):
+    """A basis set that satisfies a search, with its size over the searched elements."""
+
+    basis: str
+    functions: int
+    max_functions: int
+    max_am: int
+
+
+def _index_array(index: CountIndex) -> np.ndarray:
+    """View the counts of an index as an array `[n_basis, n_elements, max_am, 2]`."""
+    return np.frombuffer(index.data, dtype=np.uint16).reshape(
+        len(index), index.n_elements, index.max_am, 2
+    )
+
+
+def search(
+    index: CountIndex,
+    elements: Iterable[int | str] | None = None,
+    *,
+    composition: Mapping[int, int] | None = None,
+    max_functions: int | None = None,
+    max_total: int | None = None,
+    max_am: int | None = None,
+    contraction: Literal["contracted", "uncontracted"] | None = None,
+) -> list[SearchResult]:
+    """Find the basis sets covering some elements, smallest first.
+
+    Sizes are counted in spherical basis functions.  Every constraint is evaluated for
+    all basis sets in the index at once.
+
+    Args:
+        index: count index to search
+        elements: elements that must be covered
+        composition: molecule, as a mapping of element to number of atoms, that must be
+            covered; its totals are used for ranking and *max_total*
+        max_functions: maximum number of functions of any one of the elements
+        max_total: maximum total number of functions (over *composition*, else over one
+            atom of each element)
+        max_am: maximum angular momentum of any of the elements
+        contraction: whether the basis set must be contracted or fully uncontracted
+
+    Returns:
+        Matching basis sets, ranked by total number of functions and then by name
+
+    Raises:
+        ValueError: no elements given, or unknown contraction
+
+    Examples:
+        >>> from basis.basis import count
+        >>> names = ["sto-3g", "def2-svp", "def2-tzvp"]
+        >>> index = CountIndex.from_counts({name: count(name) for name in names}, 119, "")
+        >>> [result.basis for result in search(index, ["H", "C"])]
+        ['sto-3g', 'def2-svp', 'def2-tzvp']
+        >>> search(index, ["C"], max_am=2, max_functions=10)
+        [SearchResult(basis='sto-3g', functions=5, max_functions=5, max_am=1)]
+    """
+    if contraction is not None and contraction not in CONTRACTIONS:
+        raise ValueError(f"Unknown contraction: {contraction!r}, expected one of {CONTRACTIONS}")
+
+    atoms = dict.fromkeys(parse_elements(elements or []), 1) | dict(composition or {})
+    if not atoms:
+        raise ValueError("At least one element is required")
+
+    selected = np.array(list(atoms))
+    weights = np.array(list(atoms.values()))
+    counts = _index_array(index)[:, np.clip(selected, 0, index.n_elements - 1)].astype(np.int64)
+    counts[:, selected >= index.n_elements] = 0
+    contracted, primitives = counts[..., 0], counts[..., 1]
+
+    # [n_basis, n_selected] spherical functions per element
+    degeneracy = 2 * np.arange(index.max_am) + 1
+    functions = contracted @ degeneracy
+    present = contracted > 0
+    highest_am = np.where(present, np.arange(index.max_am), -1).max(axis=(1, 2), initial=-1)
+    totals = functions @ weights
+
+    keep = np.all(present.any(axis=2), axis=1)
+    if max_functions is not None:
+        keep &= functions.max(axis=1) <= max_functions
+    if max_total is not None:
+        keep &= totals <= max_total
+    if max_am is not None:
+        keep &= highest_am <= max_am
+    if contraction is not None:
+        uncontracted = (contracted == primitives).all(axis=(1, 2))
+        keep &= uncontracted if contraction == "uncontracted" else ~uncontracted
+
+    results = [
+        SearchResult(index.names[i], int(totals[i]), int(functions[i].max()), int(highest_am[i]))
+        for i in np.flatnonzero(keep)
+    ]
+    return sorted(results, key=lambda result: (result.functions, result.basis.lower()))
+
+
+def iter_search_table(results: Iterable[SearchResult]) -> Iterator[str]:
+    """Format search results as a plain-text table.
+
+    Examples:
+        >>> for line in iter_search_table([SearchResult("sto-3g", 10, 5, 1)]):
+        ...     print(line)
+        Basis                             Functions  Max/element  Max AM
+        sto-3g                                   10            5       p
+    """
+    yield f"{'Basis':30} {'Functions':>12} {'Max/element':>12} {'Max AM':>7}"
+    for result in results:
+        am = spherical_harmonics[result.max_am]
+        yield f"{result.basis:30} {result.functions:>12} {result.max_functions:>12} {am:>7}"
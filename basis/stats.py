@@ -0,0 +1,289 @@
+"""Scan a library of basis sets into a table of per-element statistics.
+
+Every (basis set, element) pair becomes one row holding its contracted, uncontracted, and
+spherical counts and its maximum angular momentum, written either as CSV or as a binary
+columnar NumPy archive (`.npz`, one array per column).
+
+Scans fan out over a pool of worker processes and append every finished basis set to a
+checkpoint file, so that an interrupted scan resumes where it stopped.  The checkpoint is
+JSON lines: a header naming the BSE version, then one entry per basis set::
+
+    {"bse": "0.12"}
+    {"basis": "sto-3g", "counts": {"1": [[1], [3]], ...}}
+    {"basis": "broken", "error": "KeyError: ..."}
+"""
+
+import csv
+import io
+import json
+import os
+from collections.abc import Iterable, Iterator, Mapping
+from itertools import chain
+from pathlib import Path
+from typing import Literal, NamedTuple
+
+from ._lazy import lazy_import
+from .basis import ANY_COUNT, BASIS_COUNT, compact_counts, count, write_atomic
+from .cache import bse_version
+
+bse = lazy_import("basis_set_exchange")
+futures = lazy_import("concurrent.futures")
+np = lazy_import("numpy")
+
+STATS_FORMATS = ("csv", "npz")
+
+
+class StatsRow(NamedTuple):
+    """Statistics of one element in one basis set; lists are indexed by angular momentum."""
+
+    basis: str
+    element: int
+    max_am: int
+    contracted: list[int]
+    uncontracted: list[int]
+    spherical: list[int]
+    functions: int
+
+
+def stats_rows(counts: Mapping[str, ANY_COUNT]) -> Iterator[StatsRow]:
+    """Generate one row per basis set and element.
+
+    Args:
+        counts: mapping of basis set name to its counts
+
+    Examples:
+        >>> row = next(stats_rows({"def2-svp": count("def2-svp", ["C"])}))
+        >>> row.max_am, row.contracted, row.spherical, row.functions
+        (2, [3, 2, 1], [3, 6, 5], 14)
+    """
+    for basis, basis_counts in counts.items():
+        for element, (contracted, uncontracted) in basis_counts.items():
+            spherical = [(2 * am + 1) * n for am, n in enumerate(contracted)]
+            yield StatsRow(
+                basis,
+                element,
+                len(contracted) - 1,
+                list(contracted),
+                list(uncontracted),
+                spherical,
+                sum(spherical),
+            )
+
+
+def guess_stats_format(path: str | os.PathLike) -> Literal["csv", "npz"]:
+    """Guess the format of a statistics file from its extension, defaulting to CSV.
+
+    Examples:
+        >>> guess_stats_format("stats.npz"), guess_stats_format("stats.txt")
+        ('npz', 'csv')
+    """
+    return "npz" if Path(path).suffix.lower() == ".npz" else "csv"
+
+
+def iter_stats_csv(rows: Iterable[StatsRow]) -> Iterator[str]:
+    """Generate the lines of a CSV table of statistics, header first.
+
+    Examples:
+        >>> for line in iter_stats_csv(stats_rows({"sto-3g": count("sto-3g", ["H", "C"])})):
+        ...     print(line)
+        basis,element,max_am,contracted,uncontracted,spherical,functions
+        sto-3g,1,0,[1],[3],[1],1
+        sto-3g,6,1,"[2, 1]","[6, 3]","[2, 3]",5
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="")
+    for row in chain([StatsRow._fields], rows):
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerow(row)
+        yield buffer.getvalue()
+
+
+def stats_columns(rows: Iterable[StatsRow]) -> dict[str, "np.ndarray"]:
+    """Gather rows into one array per column.
+
+    The per angular momentum lists become 2D arrays, padded with zeros to the highest
+    angular momentum of any row.
+
+    Examples:
+        >>> columns = stats_columns(stats_rows({"sto-3g": count("sto-3g", ["H", "C"])}))
+        >>> columns["element"].tolist(), columns["contracted"].tolist()
+        ([1, 6], [[1, 0], [2, 1]])
+    """
+    rows = list(rows)
+    n_am = max((row.max_am + 1 for row in rows), default=0)
+
+    def padded(field: str, dtype: str) -> "np.ndarray":
+        array = np.zeros((len(rows), n_am), dtype=dtype)
+        for i, row in enumerate(rows):
+            values = getattr(row, field)
+            array[i, : len(values)] = values
+        return array
+
+    return {
+        "basis": np.array([row.basis for row in rows], dtype=str),
+        "element": np.array([row.element for row in rows], dtype="uint8"),
+        "max_am": np.array([row.max_am for row in rows], dtype="uint8"),
+        "contracted": padded("contracted", "uint16"),
+        "uncontracted": padded("uncontracted", "uint16"),
+        "spherical": padded("spherical", "uint32"),
+        "functions": np.array([row.functions for row in rows], dtype="uint32"),
+    }
+
+
+def write_stats(
+    counts: Mapping[str, ANY_COUNT],
+    path: str | os.PathLike,
+    format: Literal["csv", "npz"] | None = None,
+) -> None:
+    """Atomically write the statistics of several basis sets to *path*.
+
+    Args:
+        counts: mapping of basis set name to its counts
+        path: output file
+        format: CSV or NumPy archive; guessed from *path* by default
+
+    Raises:
+        ValueError: unknown format
+    """
+    format = format or guess_stats_format(path)
+    if format == "csv":
+        write_atomic(path, "\n".join(iter_stats_csv(stats_rows(counts))) + "\n")
+        return
+    if format != "npz":
+        raise ValueError(f"Invalid format: {format}")
+
+    columns = stats_columns(stats_rows(counts))
+    write_atomic(path, lambda fh: np.savez_compressed(fh, **columns))
+
+
+def _checkpoint_header() -> dict[str, str]:
+    return {"bse": bse_version()}
+
+
+def read_checkpoint(path: str | os.PathLike) -> tuple[dict[str, BASIS_COUNT], dict[str, str]]:
+    """Read the basis sets finished by an earlier scan.
+
+    A missing checkpoint, or one written with another BSE version, holds nothing.  An
+    entry cut short by an interruption, and anything after it, is ignored.
+
+    Returns:
+        Mapping of finished basis set to its counts, and of failed basis set to the reason
+    """
+    counts: dict[str, BASIS_COUNT] = {}
+    failures: dict[str, str] = {}
+    try:
+        fh = open(path)
+    except FileNotFoundError:
+        return counts, failures
+
+    with fh:
+        try:
+            if json.loads(fh.readline()) != _checkpoint_header():
+                return counts, failures
+            for line in fh:
+                entry = json.loads(line)
+                if "error" in entry:
+                    failures[entry["basis"]] = entry["error"]
+                else:
+                    counts[entry["basis"]] = {
+                        int(element): (con, uncon)
+                        for element, (con, uncon) in entry["counts"].items()
+                    }
+        except (KeyError, TypeError, ValueError):
+            # An entry cut short by an interruption ends the checkpoint
+            pass
+
+    return counts, failures
+
+
+def _checkpoint_entry(basis: str, counts: ANY_COUNT | None, error: str | None) -> str:
+    if counts is None:
+        return json.dumps({"basis": basis, "error": error}) + "\n"
+    entry = {str(element): [list(con), list(uncon)] for element, (con, uncon) in counts.items()}
+    return json.dumps({"basis": basis, "counts": entry}, separators=(",", ":")) + "\n"
+
+
+def _scan_basis(basis: str, use_cache: bool) -> tuple[BASIS_COUNT | None, str | None]:
+    try:
+        return count(basis, use_cache=use_cache), None
+    except (KeyError, ValueError) as e:
+        return None, f"{type(e).__name__}: {e}"
+
+
+def scan_library(
+    names: Iterable[str] | None = None,
+    checkpoint: str | os.PathLike | None = None,
+    workers: int | None = None,
+    use_cache: bool = True,
+) -> tuple[dict[str, ANY_COUNT], dict[str, str]]:
+    """Count every basis set of a library, resuming from and recording to a checkpoint.
+
+    Basis sets already in the checkpoint are not counted again, and each newly counted
+    basis set is appended to it as soon as it is done.  Basis sets that cannot be counted
+    are reported rather than stopping the scan.
+
+    Args:
+        names: basis sets to scan; defaults to every basis set in the BSE
+        checkpoint: file recording finished basis sets; `None` does not checkpoint
+        workers: number of worker processes; 1 counts serially in this process and `None`
+            uses one process per CPU
+        use_cache: read from the index and read from and write to the persistent cache
+
+    Returns:
+        Mapping of basis set to its counts, in the order of *names*, and of skipped basis
+        set to the reason it was skipped
+
+    Raises:
+        ValueError: fewer than one worker requested
+    """
+    if workers is not None and workers < 1:
+        raise ValueError(f"Need at least one worker, got: {workers=}")
+
+    names = list(dict.fromkeys(bse.get_all_basis_names() if names is None else names))
+    done: dict[str, ANY_COUNT] = {}
+    failures: dict[str, str] = {}
+    if checkpoint is not None:
+        resumed, failures = read_checkpoint(checkpoint)
+        # Packed, as the counts of the whole library are held until the scan is written
+        done = {basis: compact_counts(basis_counts) for basis, basis_counts in resumed.items()}
+        # Rewritten rather than appended to, which drops any entry cut short
+        write_atomic(
+            checkpoint,
+            json.dumps(_checkpoint_header())
+            + "\n"
+            + "".join(_checkpoint_entry(basis, counts, None) for basis, counts in done.items())
+            + "".join(_checkpoint_entry(basis, None, error) for basis, error in failures.items()),
+        )
+
+    pending = [name for name in names if name not in done and name not in failures]
+    log = open(checkpoint, "a") if checkpoint is not None else None
+
+    def record(basis: str, counts: BASIS_COUNT | None, error: str | None) -> None:
+        if counts is not None:
+            done[basis] = compact_counts(counts)
+        elif error is not None:
+            failures[basis] = error
+        if log is not None:
+            log.write(_checkpoint_entry(basis, counts, error))
+            log.flush()
+
+    executor = None
+    try:
+        if workers == 1 or len(pending) < 2:
+            for basis in pending:
+                record(basis, *_scan_basis(basis, use_cache))
+        else:
+            executor = futures.ProcessPoolExecutor(max_workers=workers)
+            scans = {executor.submit(_scan_basis, basis, use_cache): basis for basis in pending}
+            # Recorded in order of completion, so that no finished basis set is lost
+            for scan in futures.as_completed(scans):
+                record(scans[scan], *scan.result())
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+        if log is not None:
+            log.close()
+
+    counts = {name: done[name] for name in names if name in done}
+    return counts, {name: failures[name] for name in names if name in failures}
@@ -0,0 +1,130 @@
+"""Lightweight timing spans for profiling the phases of counting, tabulating, and editing.
+
+Spans are only recorded while a `Recorder` is active; otherwise `span` returns a shared
+no-op context manager, so instrumented code pays a single global lookup per span.
+
+Examples:
+    >>> with recording() as recorder:
+    ...     with span("outer"):
+    ...         with span("inner"):
+    ...             pass
+    >>> [(event.name, event.depth) for event in recorder.events]
+    [('inner', 1), ('outer', 0)]
+"""
+
+import json
+import os
+import threading
+import time
+from collections.abc import Generator, Iterator
+from contextlib import AbstractContextManager, contextmanager, nullcontext
+from pathlib import Path
+from typing import NamedTuple
+
+_NULL_SPAN = nullcontext()
+_recorder: "Recorder | None" = None
+
+
+class SpanEvent(NamedTuple):
+    """A completed span; times are in nanoseconds since the recorder started."""
+
+    name: str
+    start: int
+    duration: int
+    depth: int
+    thread: int
+
+
+class Recorder:
+    """Collects completed spans."""
+
+    def __init__(self) -> None:
+        """Start an empty recording."""
+        self.events: list[SpanEvent] = []
+        self.origin = time.perf_counter_ns()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def _depth(self, change: int) -> int:
+        depth = getattr(self._local, "depth", 0)
+        self._local.depth = depth + change
+        return depth
+
+    def summary(self) -> Iterator[str]:
+        """Summarize the spans by name, nested in the order they were first entered."""
+        totals: dict[tuple[int, str], list[int]] = {}
+        for event in sorted(self.events, key=lambda event: (event.start, event.depth)):
+            calls_total = totals.setdefault((event.depth, event.name), [0, 0])
+            calls_total[0] += 1
+            calls_total[1] += event.duration
+
+        yield f"{'Span':44} {'Calls':>6} {'Total (ms)':>11} {'Mean (ms)':>10}"
+        for (depth, name), (calls, total) in totals.items():
+            label = "  " * depth + name
+            yield f"{label:44} {calls:>6} {total / 1e6:>11.3f} {total / calls / 1e6:>10.3f}"
+
+    def chrome_trace(self) -> dict:
+        """Convert the spans into the Chrome trace-event format (`chrome://tracing`)."""
+        pid = os.getpid()
+        events = [
+            {
+                "name": event.name,
+                "cat": "basis",
+                "ph": "X",
+                "ts": event.start / 1e3,
+                "dur": event.duration / 1e3,
+                "pid": pid,
+                "tid": event.thread,
+            }
+            for event in self.events
+        ]
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write_trace(self, path: Path | str) -> None:
+        """Write the spans to *path* as Chrome trace-event JSON."""
+        with open(path, "w") as fh:
+            json.dump(self.chrome_trace(), fh)
+
+
+class _Span:
+    __slots__ = ("depth", "name", "recorder", "start")
+
+    def __init__(self, recorder: Recorder, name: str) -> None:
+        self.recorder = recorder
+        self.name = name
+
+    def __enter__(self) -> None:
+        self.depth = self.recorder._depth(+1)
+        self.start = time.perf_counter_ns()
+
+    def __exit__(self, *exc_info: object) -> None:
+        end = time.perf_counter_ns()
+        recorder = self.recorder
+        recorder._depth(-1)
+        event = SpanEvent(
+            self.name,
+            self.start - recorder.origin,
+            end - self.start,
+            self.depth,
+            threading.get_ident(),
+        )
+        with recorder._lock:
+            recorder.events.append(event)
+
+
+def span(name: str) -> AbstractContextManager[None]:
+    """Time the enclosed block as a span called *name*, if recording."""
+    if _recorder is None:
+        return _NULL_SPAN
+    return _Span(_recorder, name)
+
+
+@contextmanager
+def recording() -> Generator[Recorder]:
+    """Record spans within the block."""
+    global _recorder  # noqa: PLW0603
+    previous, _recorder = _recorder, Recorder()
+    try:
+        yield _recorder
+    finally:
+        _recorder = previous
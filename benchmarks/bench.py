@@ -0,0 +1,294 @@
+"""Benchmarks of the counting, table rendering, parsing, and editing hot paths.
+
+Run from the repository root::
+
+    uv run benchmarks/bench.py -o baseline.json          # record a baseline
+    uv run benchmarks/bench.py --baseline baseline.json  # compare against it
+
+Each benchmark is timed over several repeats, and the fastest repeat is compared against
+the baseline; a benchmark slower than the baseline by more than `--threshold` is reported
+as a regression, and the run exits with a non-zero status.  Calibration runs before the
+timed repeats, so one-off costs such as importing the Basis Set Exchange are not measured.
+The persistent cache and the index are bypassed throughout so that the code paths
+themselves are measured.
+
+The memory benchmarks report the memory taken by a million per-element count entries in
+each representation, and the peak memory of selective and full angular momentum removal;
+they are recorded but not compared.
+"""
+
+import fnmatch
+import json
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import timeit
+import tracemalloc
+from argparse import ArgumentParser
+from collections.abc import Callable
+from pathlib import Path
+from typing import Literal
+
+import basis_set_exchange as bse
+
+from basis.basis import (
+    ElementCount,
+    cache_clear,
+    count,
+    count_basis_dict,
+    edit_basis,
+    load_basis,
+    parse_elements,
+    remove_angular_momentum,
+    table,
+)
+from basis.cache import bse_version
+
+# Small, large, and generally contracted basis sets
+COUNT_BASIS_SETS = ("sto-3g", "def2-QZVPP", "cc-pV5Z")
+TABLE_BASIS_SETS = ["sto-3g", "def2-SVP", "def2-TZVP", "cc-pVTZ"]
+# Formats that BSE can both write and read back
+ROUND_TRIP_FORMATS = ("nwchem", "gaussian94", "turbomole", "gamess_us")
+
+_WORKDIR = tempfile.TemporaryDirectory()
+
+# name -> setup, which prepares any inputs and returns the function to time
+BENCHMARKS: dict[str, Callable[[], Callable[[], object]]] = {}
+
+
+def benchmark(name: str) -> Callable:
+    """Register a benchmark setup function under *name*."""
+
+    def register(setup: Callable[[], Callable[[], object]]) -> Callable:
+        BENCHMARKS[name] = setup
+        return setup
+
+    return register
+
+
+def _count(basis: str) -> Callable[[], object]:
+    def run() -> object:
+        cache_clear()
+        return count(basis, use_cache=False)
+
+    return run
+
+
+def _count_basis_dict(basis: str) -> Callable[[], object]:
+    basis_dict = load_basis(basis)
+    return lambda: count_basis_dict(basis_dict)
+
+
+for _basis in COUNT_BASIS_SETS:
+    benchmark(f"count/{_basis}")(lambda basis=_basis: _count(basis))
+    benchmark(f"count_basis_dict/{_basis}")(lambda basis=_basis: _count_basis_dict(basis))
+
+
+def _table(
+    fmt: Literal["plain", "csv"], *, spherical: bool = False, diff: bool = False
+) -> Callable[[], object]:
+    basis_sets = TABLE_BASIS_SETS[:2] if diff else TABLE_BASIS_SETS
+    # Warm the in-process memo so that only rendering is timed
+    table(basis_sets, None, use_cache=False)
+    return lambda: table(basis_sets, None, diff, fmt, spherical, use_cache=False)
+
+
+benchmark("table/plain")(lambda: _table("plain"))
+benchmark("table/csv")(lambda: _table("csv"))
+benchmark("table/spherical")(lambda: _table("plain", spherical=True))
+benchmark("table/diff")(lambda: _table("plain", diff=True))
+
+
+@benchmark("parse_elements/large")
+def _parse_elements() -> Callable[[], object]:
+    tokens = ["H", "Li-Ne", "11-18", "K", "Ca", "Ga-Kr", "37-54", "Cs-Rn"] * 1000
+    return lambda: parse_elements(tokens)
+
+
+# Selective edits should cost in proportion to the number of edited elements
+REMOVE_SELECTIONS = {"2": ["C", "O"], "H-Kr": ["H-Kr"], "all": None}
+
+
+def _remove_angular_momentum(basis: str, selection: list[str] | None) -> Callable[[], object]:
+    basis_dict = load_basis(basis)
+    elements = None if selection is None else set(parse_elements(selection))
+    return lambda: remove_angular_momentum(basis_dict, {3, 4}, elements)
+
+
+for _basis in ("def2-QZVPP", "ano-rcc"):
+    for _label, _selection in REMOVE_SELECTIONS.items():
+        benchmark(f"remove_angular_momentum/{_basis}/{_label}")(
+            lambda basis=_basis, selection=_selection: _remove_angular_momentum(basis, selection)
+        )
+
+
+def _edit_round_trip(fmt: str) -> Callable[[], object]:
+    path = Path(_WORKDIR.name) / f"def2-TZVP{bse.writers.get_format_extension(fmt)}"
+
+    def run() -> object:
+        path.write_text(edit_basis("def2-TZVP", ["H-Ar"], ["f"], fmt))
+        return edit_basis(None, ["H-Ar"], ["d"], fmt, input_file=str(path))
+
+    return run
+
+
+for _fmt in ROUND_TRIP_FORMATS:
+    benchmark(f"edit_basis/{_fmt}")(lambda fmt=_fmt: _edit_round_trip(fmt))
+
+
+# name -> factory building one element entry from a (contracted, uncontracted) pair
+MEMORY_BENCHMARKS: dict[str, Callable[[tuple[list[int], list[int]]], object]] = {
+    "memory/tuple-of-lists": lambda entry: (list(entry[0]), list(entry[1])),
+    "memory/ElementCount": lambda entry: ElementCount(*entry),
+}
+MEMORY_ENTRIES = 100_000
+
+
+def measure_memory(make: Callable[[tuple[list[int], list[int]]], object]) -> dict[str, float]:
+    """Measure the memory of element entries built by *make*, scaled to a million entries.
+
+    The entries cycle through every element of `COUNT_BASIS_SETS`; the list holding them
+    is not counted.
+    """
+    entries = [
+        entry for basis in COUNT_BASIS_SETS for entry in count(basis, use_cache=False).values()
+    ]
+    held = [None] * MEMORY_ENTRIES
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        for i in range(MEMORY_ENTRIES):
+            held[i] = make(entries[i % len(entries)])
+        after, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"bytes_per_million": (after - before) * 1_000_000 / MEMORY_ENTRIES}
+
+
+def peak_memory(func: Callable[[], object]) -> dict[str, float]:
+    """Measure the peak memory allocated while calling *func* once."""
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"peak_bytes": peak}
+
+
+def time_benchmark(func: Callable[[], object], repeat: int) -> dict[str, float | int]:
+    """Time *func*, calibrating the number of calls per repeat to take at least 0.2 s.
+
+    Returns:
+        Fastest and median time per call (s), and the number of calls per repeat
+    """
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    times = [t / number for t in timer.repeat(repeat=repeat, number=number)]
+    return {"min": min(times), "median": statistics.median(times), "number": number}
+
+
+def run_benchmarks(pattern: str = "*", repeat: int = 5) -> dict[str, dict[str, float | int]]:
+    """Run the benchmarks whose names match the glob *pattern*."""
+    results = {}
+    for name, setup in BENCHMARKS.items():
+        if not fnmatch.fnmatch(name, pattern):
+            continue
+        results[name] = time_benchmark(setup(), repeat)
+        print(f"{name:48} {results[name]['min'] * 1e3:10.3f} ms", file=sys.stderr)
+    return results
+
+
+def run_memory_benchmarks(pattern: str = "*") -> dict[str, dict[str, float]]:
+    """Run the memory benchmarks whose names match the glob *pattern*.
+
+    Besides the per-entry memory of the count representations, this records the peak
+    memory of a single call of each `remove_angular_momentum` benchmark.
+    """
+    results = {}
+    for name, make in MEMORY_BENCHMARKS.items():
+        if not fnmatch.fnmatch(name, pattern):
+            continue
+        results[name] = measure_memory(make)
+        print(f"{name:48} {results[name]['bytes_per_million'] / 1e6:10.1f} MB/M", file=sys.stderr)
+
+    for name, setup in BENCHMARKS.items():
+        peak_name = f"peak/{name}"
+        if not name.startswith("remove_angular_momentum/"):
+            continue
+        # Selected by the name of the timed benchmark too, e.g. 'remove_angular_momentum/*'
+        if not (fnmatch.fnmatch(peak_name, pattern) or fnmatch.fnmatch(name, pattern)):
+            continue
+        results[peak_name] = peak_memory(setup())
+        print(f"{peak_name:48} {results[peak_name]['peak_bytes'] / 1e6:10.3f} MB", file=sys.stderr)
+    return results
+
+
+def compare(
+    results: dict[str, dict[str, float | int]],
+    baseline: dict[str, dict[str, float | int]],
+    threshold: float,
+) -> list[str]:
+    """Print a comparison with a baseline, returning the benchmarks that regressed."""
+    regressions = []
+    print(f"{'Benchmark':48} {'Baseline':>12} {'Current':>12} {'Ratio':>7}")
+    for name, result in results.items():
+        if name not in baseline:
+            print(f"{name:48} {'-':>12} {result['min'] * 1e3:10.3f}ms {'new':>7}")
+            continue
+        ratio = result["min"] / baseline[name]["min"]
+        flag = "  REGRESSION" if ratio > threshold else ""
+        print(
+            f"{name:48} {baseline[name]['min'] * 1e3:10.3f}ms "
+            f"{result['min'] * 1e3:10.3f}ms {ratio:7.2f}{flag}"
+        )
+        if ratio > threshold:
+            regressions.append(name)
+    return regressions
+
+
+def main() -> None:
+    """Run the benchmarks, store the results, and compare them to a baseline."""
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-o", "--output", metavar="FILE", help="Write the results as JSON.")
+    parser.add_argument("-b", "--baseline", metavar="FILE", help="Compare to earlier results.")
+    parser.add_argument(
+        "-k", "--filter", default="*", help="Only run benchmarks matching a glob [%(default)s]."
+    )
+    parser.add_argument("-r", "--repeat", type=int, default=5, help="Repeats [%(default)s].")
+    parser.add_argument(
+        "-t",
+        "--threshold",
+        type=float,
+        default=1.25,
+        help="Slowdown relative to the baseline that counts as a regression [%(default)s].",
+    )
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.filter, args.repeat)
+    memory = run_memory_benchmarks(args.filter)
+
+    if args.output:
+        report = {
+            "meta": {
+                "date": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "bse": bse_version(),
+            },
+            "results": results,
+            "memory": memory,
+        }
+        Path(args.output).write_text(json.dumps(report, indent=2) + "\n")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())["results"]
+        if regressions := compare(results, baseline, args.threshold):
+            sys.exit(f"{len(regressions)} benchmark(s) regressed: {', '.join(regressions)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,11 @@
+"""Shared pytest configuration for tests and doctests."""
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def _isolated_cache(
+    tmp_path_factory: pytest.TempPathFactory, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Keep the persistent cache out of the user's cache directory."""
+    monkeypatch.setenv("BASIS_CACHE_DIR", str(tmp_path_factory.getbasetemp() / "cache"))
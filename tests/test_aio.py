@@ -0,0 +1,155 @@
+"""Test the asynchronous API."""
+
+import asyncio
+import threading
+import time
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import basis.basis
+from basis import aio
+from basis.basis import cache_clear, edit_basis, table
+
+
+def test_count_shares_loads(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Concurrent counts of the same basis set load it once, and each gets its own copy."""
+    cache_clear()
+    load_basis = basis.basis.load_basis
+    loads = []
+
+    def slow_load(basis: str, elements: Iterable[int | str] | None = None) -> dict:
+        loads.append(basis)
+        time.sleep(0.05)
+        return load_basis(basis, elements)
+
+    monkeypatch.setattr(basis.basis, "load_basis", slow_load)
+
+    async def main() -> list:
+        return await asyncio.gather(
+            *(aio.count(name, use_cache=False) for name in ["def2-svp", "DEF2-SVP"] * 5)
+        )
+
+    results = asyncio.run(main())
+    assert len(loads) == 1
+    assert all(result == results[0] for result in results)
+    results[0][1][0].append(100)
+    assert results[1][1][0] != results[0][1][0]
+
+
+def test_table_and_edit() -> None:
+    """The asynchronous functions return the same as the blocking ones."""
+
+    async def main() -> tuple[str, str]:
+        return await asyncio.gather(
+            aio.table(["sto-3g", "def2-svp"], ["H", "C"], spherical=True),
+            aio.edit_basis("sto-3g", ["C"], ["p"], "gaussian94"),
+        )
+
+    shown, edited = asyncio.run(main())
+    assert shown == table(["sto-3g", "def2-svp"], ["H", "C"], spherical=True)
+    assert edited == edit_basis("sto-3g", ["C"], ["p"], "gaussian94")
+
+
+def test_table_and_edit_work(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Tables count only the selected elements, and edits copy the basis set only once."""
+    cache_clear()
+    count, load_basis = basis.basis.count, basis.basis.load_basis
+    counted, loaded = [], []
+
+    def recording_count(
+        name: str, elements: Iterable[int | str] | None = None, use_cache: bool = True
+    ) -> dict:
+        counted.append(elements)
+        return count(name, elements, use_cache)
+
+    def recording_load(name: str, elements: Iterable[int | str] | None = None) -> dict:
+        loaded.append(name)
+        return load_basis(name, elements)
+
+    monkeypatch.setattr(basis.basis, "count", recording_count)
+    monkeypatch.setattr(basis.basis, "load_basis", recording_load)
+
+    asyncio.run(aio.table(["sto-3g", "def2-svp"], ["H", "C"], use_cache=False))
+    assert set(counted) == {(1, 6)}
+
+    loaded.clear()
+    asyncio.run(aio.edit_basis("sto-3g", ["C"], ["p"], only=["H", "C"]))
+    assert loaded == ["sto-3g"]
+
+
+def test_limit() -> None:
+    """No more than *limit* calls run at once."""
+    running = peak = 0
+    lock = threading.Lock()
+
+    def work(i: int) -> int:
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        time.sleep(0.02)
+        with lock:
+            running -= 1
+        return i
+
+    async def main() -> list[int]:
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            runner = aio.AsyncRunner(executor, limit=2)
+            return await asyncio.gather(*(runner.run(i, work, i) for i in range(6)))
+
+    assert asyncio.run(main()) == list(range(6))
+    assert peak == 2
+
+
+def test_cancellation() -> None:
+    """Cancelling one waiter leaves the others; cancelling all cancels the call."""
+    calls = []
+
+    def work() -> str:
+        calls.append(None)
+        time.sleep(0.05)
+        return "done"
+
+    async def main() -> None:
+        runner = aio.AsyncRunner(limit=1)
+        first = asyncio.create_task(runner.run("key", work))
+        second = asyncio.create_task(runner.run("key", work))
+        await asyncio.sleep(0)
+        first.cancel()
+        assert await second == "done"
+        assert first.cancelled()
+
+        # Queued behind a running call, then abandoned: never runs
+        blocker = asyncio.create_task(runner.run("blocker", work))
+        queued = asyncio.create_task(runner.run("queued", work))
+        await asyncio.sleep(0)
+        queued.cancel()
+        await blocker
+        with pytest.raises(asyncio.CancelledError):
+            await queued
+        assert not runner._inflight
+
+    asyncio.run(main())
+    assert len(calls) == 2
+
+
+def test_run_after_cancellation() -> None:
+    """A call made just after its only waiter was cancelled starts afresh."""
+
+    def work() -> str:
+        time.sleep(0.05)
+        return "done"
+
+    async def main() -> None:
+        runner = aio.AsyncRunner(limit=2)
+        first = asyncio.create_task(runner.run("key", work))
+        await asyncio.sleep(0)
+        first.cancel()
+        # Let the waiter give up, before the cancelled call has finished
+        await asyncio.sleep(0)
+        assert first.cancelled()
+        assert await runner.run("key", work) == "done"
+
+    asyncio.run(main())
@@ -1,20 +1,39 @@
 """Test the reading and writing of basis sets."""
 
+import copy
+import marshal
+import os
+import stat
+import sys
 from pathlib import Path
 
 import basis_set_exchange as bse
 import pytest
 
 from basis.basis import (
+    EditStep,
+    ElementCount,
     am_letter_to_int,
+    cache_clear,
+    cache_info,
+    compact_counts,
     count,
+    count_many,
     csv_table,
     difference,
     edit_basis,
+    edit_basis_files,
+    iter_table,
+    load_basis,
     parse_elements,
+    plain_table,
+    read_basis_file,
     remove_angular_momentum,
     spherical_count,
+    table,
+    write_atomic,
 )
+from basis.cache import DiskCache, default_cache
 
 
 def test_count() -> None:
@@ -24,6 +43,31 @@ def test_count() -> None:
     assert def2_svp[1] == ([2, 1], [4, 1])
 
 
+def test_count_elements(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Only the requested elements are loaded, and missing elements are skipped."""
+    cache_clear()
+    requested = []
+    get_basis = bse.get_basis
+
+    def spy(name: str, elements: list[int] | None = None) -> dict:
+        requested.append(elements)
+        return get_basis(name, elements=elements)
+
+    monkeypatch.setattr(bse, "get_basis", spy)
+    subset = count("def2-svp", ["H", "C", "200"], use_cache=False)
+
+    assert requested == [[1, 6]]
+    assert subset == {1: ([2, 1], [4, 1]), 6: ([3, 2, 1], [7, 4, 1])}
+    # An empty selection loads nothing
+    assert count("sto-3g", [], use_cache=False) == {}
+    assert requested == [[1, 6]]
+
+    # Counts of the whole basis set are filtered rather than reloaded
+    full = count("cc-pVDZ", use_cache=False)
+    assert count("cc-pVDZ", ["O"], use_cache=False) == {8: full[8]}
+    assert len(requested) == 2
+
+
 def test_diff() -> None:
     """Test that difference in counts works."""
     def2_svp = count("def2-svp")
@@ -35,6 +79,50 @@ def test_diff() -> None:
     assert diff[85] == ([2, 1, 1, 2], [1, 3, 2, 2])
 
 
+def test_table_diff_modes() -> None:
+    """Differences from a reference or between every pair add one column per pair."""
+    elements = ["H", "C", "Rn"]
+    shown = table(["def2-svp", "def2-tzvp", "sto-3g"], elements, diff_matrix=True)
+    header = shown.splitlines()[0]
+    assert [name.strip() for name in header.split("|")[1:]] == [
+        "def2-svp",
+        "def2-tzvp",
+        "sto-3g",
+        "def2-tzvp - def2-svp",
+        "sto-3g - def2-svp",
+        "sto-3g - def2-tzvp",
+    ]
+    # Every row lines up with the header, including cells of absent elements
+    columns = [i for i, char in enumerate(header) if char == "|"]
+    for line in shown.splitlines()[2:]:
+        if not line.startswith("-"):
+            assert [i for i, char in enumerate(line) if char == "|"] == columns[: line.count("|")]
+
+    # The reference is added if missing and goes first
+    csv = table(["def2-tzvp"], elements, diff_ref="DEF2-SVP", format="csv")
+    assert csv.splitlines()[1].startswith("DEF2-SVP,1,")
+    assert 'def2-tzvp - DEF2-SVP,1,"[1, 0]","[1, 0]"' in csv
+
+    with pytest.raises(ValueError, match="one"):
+        table(["def2-svp", "def2-tzvp"], diff=True, diff_matrix=True)
+
+
+def test_compact_counts() -> None:
+    """Compact records stand in for the tuples of lists in differences and tables."""
+    counts = {basis: count(basis) for basis in ["sto-3g", "def2-svp"]}
+    compact = {basis: compact_counts(basis_counts) for basis, basis_counts in counts.items()}
+    elements = [1, 6, 18, 36]
+
+    assert compact["sto-3g"] == counts["sto-3g"]
+    assert compact["def2-svp"][6] == ElementCount(*counts["def2-svp"][6])
+    assert difference(*compact.values()) == difference(*counts.values())
+    assert plain_table(compact, elements) == plain_table(counts, elements)
+    assert csv_table(compact, elements) == csv_table(counts, elements)
+
+    with pytest.raises(OverflowError):
+        ElementCount([-1], [1])
+
+
 def test_generally_contracted() -> None:
     """Test generally contracted basis sets."""
     cc_pVTZ = count("cc-pVTZ")
@@ -85,6 +173,33 @@ aug-cc-pCVQZ,9,"[9, 8, 6, 4, 2]","[16, 10, 6, 4, 2]"\
     assert result == expected
 
 
+def test_table_workers() -> None:
+    """Counting across worker processes gives the same table as counting serially."""
+    basis_sets = ["sto-3g", "def2-svp", "cc-pVDZ", "def2-tzvp"]
+    serial = table(basis_sets, ["H-Ar"], format="csv")
+    cache_clear()
+    assert table(basis_sets, ["H-Ar"], format="csv", workers=2) == serial
+    cache_clear()
+    assert list(count_many(basis_sets, workers=None)) == basis_sets
+
+    with pytest.raises(ValueError, match="at least one worker"):
+        count_many(basis_sets, workers=0)
+
+
+def test_iter_table_streams_csv() -> None:
+    """CSV rows are yielded per basis set, before later basis sets are counted."""
+    cache_clear()
+    lines = iter_table(["sto-3g", "cc-pVDZ"], ["H", "C"], format="csv")
+
+    assert next(lines) == "basis,element,contracted,uncontracted"
+    assert next(lines) == 'sto-3g,1,"[1]","[3]"'
+    assert cache_info()["count"].currsize == 1
+
+    rest = list(lines)
+    assert rest[-1] == 'cc-pVDZ,6,"[3, 2, 1]","[9, 4, 1]"'
+    assert cache_info()["count"].currsize == 2
+
+
 def test_spherical_count() -> None:
     """Test that spherical basis function counting works correctly."""
     sto3g = count("sto-3g")
@@ -145,6 +260,24 @@ def test_remove_angular_momentum() -> None:
     assert {0, 1, 2}.issubset(ams_after)  # s, p, d still present
 
 
+def test_remove_angular_momentum_shares_untouched() -> None:
+    """Only the edited elements are copied; the input is left unchanged."""
+    bd = bse.get_basis("def2-TZVP", elements=[1, 6, 8])
+    before = copy.deepcopy(bd)
+
+    result = remove_angular_momentum(bd, {2, 3}, {6})
+    assert bd == before
+    assert result["elements"]["1"] is bd["elements"]["1"]
+    assert result["elements"]["8"] is bd["elements"]["8"]
+    assert result["elements"]["6"] is not bd["elements"]["6"]
+    assert list(result["elements"]) == list(bd["elements"])
+    assert {
+        am
+        for shell in result["elements"]["6"]["electron_shells"]
+        for am in shell["angular_momentum"]
+    } == {0, 1}
+
+
 def test_remove_angular_momentum_sp_shell() -> None:
     """Test that removing p from an sp shell keeps the s component."""
     # sto-3g C has an sp shell
@@ -184,7 +317,7 @@ def test_edit_basis_elements_scope() -> None:
 
     assert "C    P" not in result  # edited
     assert "C    S" in result  # C s-functions preserved
-    assert "N    P" in result  # N is untouched
+    assert "N    SP" in result  # N is untouched, its sp shell not even split
 
 
 def test_edit_basis_from_file(tmp_path: Path) -> None:
@@ -203,6 +336,62 @@ def test_edit_basis_from_file(tmp_path: Path) -> None:
     assert "C    P" not in result
 
 
+def test_read_basis_file_cache(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Unchanged files are parsed once, even across processes; changed ones again."""
+    reads = []
+    read_formatted_basis_file = bse.read_formatted_basis_file
+
+    def counting_read(path: str) -> dict:
+        reads.append(path)
+        return read_formatted_basis_file(path)
+
+    monkeypatch.setattr(bse, "read_formatted_basis_file", counting_read)
+    input_file = tmp_path / "basis.nw"
+    input_file.write_text(bse.get_basis("sto-3g", elements=[1, 2], fmt="nwchem"))
+
+    first = read_basis_file(str(input_file))
+    first["elements"].clear()
+    assert read_basis_file(str(input_file))["elements"]
+    assert len(reads) == 1
+
+    # A fresh process finds it in the persistent cache
+    cache_clear()
+    assert read_basis_file(str(input_file)) == read_basis_file(str(input_file), use_cache=False)
+    assert len(reads) == 1
+
+    input_file.write_text(bse.get_basis("sto-3g", elements=[1], fmt="nwchem"))
+    assert list(read_basis_file(str(input_file))["elements"]) == ["1"]
+    assert len(reads) == 2
+
+
+def test_read_basis_file_damaged_cache(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Entries are kept per Python version, and ones that cannot be decoded are misses."""
+    keys = []
+    store_set = DiskCache.set
+
+    def recording_set(self: DiskCache, key: str, value: bytes) -> None:
+        keys.append(key)
+        store_set(self, key, value)
+
+    monkeypatch.setattr(DiskCache, "set", recording_set)
+    monkeypatch.setenv("BASIS_CACHE_DIR", str(tmp_path / "cache"))
+    cache_clear()
+    input_file = tmp_path / "basis.nw"
+    input_file.write_text(bse.get_basis("sto-3g", elements=[1], fmt="nwchem"))
+    expected = read_basis_file(str(input_file))
+    (key,) = keys
+    assert key.endswith(f":py{sys.version_info[0]}.{sys.version_info[1]}")
+
+    store = default_cache()
+    assert store is not None
+    for damaged in [b"", b"\xff", marshal.dumps(expected)[:-10]]:
+        store_set(store, key, damaged)
+        cache_clear()
+        assert read_basis_file(str(input_file)) == expected
+    assert keys == [key] * 4
+    assert store.get(key) == marshal.dumps(expected)
+
+
 def test_edit_basis_multi_round(tmp_path: Path) -> None:
     """Test multi-round editing: remove f then remove d from an intermediate file."""
     # Round 1: remove f from C only; full basis written to file
@@ -225,6 +414,124 @@ def test_edit_basis_multi_round(tmp_path: Path) -> None:
     assert "H    S" in round2  # H still untouched
 
 
+def test_edit_basis_steps(tmp_path: Path) -> None:
+    """Test that chained steps match multi-round editing through an intermediate file."""
+    round1 = edit_basis("def2-TZVP", elements=["C"], remove=["f"], fmt="nwchem")
+    intermediate = tmp_path / "intermediate.nw"
+    intermediate.write_text(round1)
+    round2 = edit_basis(
+        basis=None, elements=["C"], remove=["d"], fmt="nwchem", input_file=str(intermediate)
+    )
+
+    chained = edit_basis("def2-TZVP", elements=["C"], remove=["f"], steps=[EditStep(["C"], ["d"])])
+
+    assert "C    F" not in chained
+    assert "C    D" not in chained
+    assert "H    S" in chained
+    assert len(chained.splitlines()) == len(round2.splitlines())
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_edit_basis_files(tmp_path: Path, workers: int) -> None:
+    """One edit is written to every output in its own format, leaving no temporary files."""
+    outputs = {str(tmp_path / f"out.{fmt}"): fmt for fmt in ["nwchem", "gaussian94", "orca"]}
+    edit_basis_files(
+        "sto-3g", outputs, ["C"], ["p"], steps=[EditStep(["N"], ["p"])], workers=workers
+    )
+
+    for path, fmt in outputs.items():
+        expected = edit_basis("sto-3g", ["C"], ["p"], fmt, steps=[EditStep(["N"], ["p"])])
+        assert Path(path).read_text() == expected
+    assert sorted(p.name for p in tmp_path.iterdir()) == sorted(Path(p).name for p in outputs)
+
+    # A failing writer does not stop the others
+    outputs = {str(tmp_path / "bad"): "not-a-format", str(tmp_path / "good.nw"): "nwchem"}
+    with pytest.raises(RuntimeError, match="not-a-format"):
+        edit_basis_files("sto-3g", outputs, workers=workers)
+    assert not (tmp_path / "bad").exists()
+    assert (tmp_path / "good.nw").exists()
+
+
+def test_write_atomic(tmp_path: Path) -> None:
+    """New files follow the umask, existing files keep their mode, and links are kept."""
+    path = tmp_path / "basis.nw"
+    umask = os.umask(0o027)
+    try:
+        write_atomic(path, "one")
+    finally:
+        os.umask(umask)
+    assert stat.S_IMODE(path.stat().st_mode) == 0o640
+
+    path.chmod(0o600)
+    write_atomic(path, "two")
+    assert path.read_text() == "two"
+    assert stat.S_IMODE(path.stat().st_mode) == 0o600
+
+    link = tmp_path / "link.nw"
+    link.symlink_to(path)
+    write_atomic(link, "three")
+    assert link.is_symlink()
+    assert path.read_text() == "three"
+    assert stat.S_IMODE(path.stat().st_mode) == 0o600
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["basis.nw", "link.nw"]
+
+
+def test_write_atomic_data(tmp_path: Path) -> None:
+    """Bytes and writer functions are written too, and a failing writer leaves nothing."""
+    path = tmp_path / "data.bin"
+    write_atomic(path, b"\x00\x01")
+    assert path.read_bytes() == b"\x00\x01"
+
+    write_atomic(path, lambda fh: fh.write(b"written"))
+    assert path.read_bytes() == b"written"
+
+    def fail(fh: object) -> None:
+        raise RuntimeError("broken writer")
+
+    with pytest.raises(RuntimeError, match="broken writer"):
+        write_atomic(path, fail)
+    assert path.read_bytes() == b"written"
+    assert [p.name for p in tmp_path.iterdir()] == ["data.bin"]
+
+
+def test_load_basis_empty_selection(monkeypatch: pytest.MonkeyPatch) -> None:
+    """A selection without any element of the basis set loads no element data."""
+    expected = bse.get_basis("6-31G*")
+    expected["elements"] = {}
+    expected["function_types"] = []
+
+    def fail(*args: object, **kwargs: object) -> None:
+        raise AssertionError("bse.get_basis should not be called")
+
+    monkeypatch.setattr(bse, "get_basis", fail)
+    cache_clear()
+    assert load_basis("6-31G*", ["Rn"]) == expected
+    assert load_basis("6-31G*", []) == expected
+
+
+def test_edit_basis_only(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Only the selected elements are loaded from BSE or the input file, and written."""
+    get_basis = bse.get_basis
+    loaded = []
+
+    def recording_get_basis(name: str, elements: list[int] | None = None, **kwargs: object) -> dict:
+        loaded.append(elements)
+        return get_basis(name, elements=elements, **kwargs)
+
+    monkeypatch.setattr(bse, "get_basis", recording_get_basis)
+    cache_clear()
+    result = edit_basis("def2-TZVP", ["C"], ["f"], only=["H", "C", "Rn"])
+    assert loaded == [[1, 6, 86]]
+    written = bse.read_formatted_basis_str(result, "nwchem")["elements"]
+    assert list(written) == ["1", "6", "86"]
+    assert "C    F" not in result
+
+    input_file = tmp_path / "def2-tzvp.nw"
+    input_file.write_text(edit_basis("def2-TZVP"))
+    from_file = edit_basis(None, ["C"], ["f"], input_file=str(input_file), only=["H", "C", "Rn"])
+    assert from_file == result
+
+
 def test_parse_elements_single() -> None:
     """Test parsing individual element tokens."""
     assert parse_elements(["H"]) == [1]
@@ -0,0 +1,90 @@
+"""Test batch editing from a manifest."""
+
+from pathlib import Path
+
+import basis_set_exchange as bse
+import pytest
+
+from basis.batch import EditJob, read_manifest, run_jobs
+
+MANIFEST = """\
+[[job]]
+basis = "def2-TZVP"
+elements = ["C"]
+remove = ["f"]
+output = "def2-TZVP-f.nw"
+
+[[job]]
+basis = "DEF2-TZVP"
+elements = "C N"
+remove = "d f"
+format = "gaussian94"
+output = "def2-TZVP-df.txt"
+
+[[job]]
+basis = "not-a-basis"
+output = "missing.nw"
+
+[[job]]
+input = "sto-3g.nw"
+remove = ["p"]
+output = "sto-3g-p.nw"
+"""
+
+
+def test_read_manifest(tmp_path: Path) -> None:
+    """Jobs are read in order with paths relative to the manifest."""
+    (tmp_path / "jobs.toml").write_text(MANIFEST)
+    jobs = read_manifest(tmp_path / "jobs.toml")
+
+    assert len(jobs) == 4
+    assert jobs[0] == EditJob(
+        output=str(tmp_path / "def2-TZVP-f.nw"),
+        basis="def2-TZVP",
+        elements=("C",),
+        remove=("f",),
+    )
+    assert jobs[1].elements == ("C", "N")
+    assert jobs[1].format == "gaussian94"
+    assert jobs[0].source == jobs[1].source
+    assert jobs[3].input_file == str(tmp_path / "sto-3g.nw")
+
+
+@pytest.mark.parametrize(
+    ("job", "message"),
+    [
+        ('basis = "sto-3g"', "has no output"),
+        ('output = "a.nw"', "exactly one of"),
+        ('basis = "sto-3g"\ninput = "a.nw"\noutput = "b.nw"', "exactly one of"),
+        ('basis = "sto-3g"\noutput = "a.nw"\nfmt = "nwchem"', "unknown keys"),
+    ],
+)
+def test_read_manifest_invalid(tmp_path: Path, job: str, message: str) -> None:
+    """Malformed jobs are rejected."""
+    (tmp_path / "jobs.toml").write_text(f"[[job]]\n{job}\n")
+    with pytest.raises(ValueError, match=message):
+        read_manifest(tmp_path / "jobs.toml")
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_run_jobs(tmp_path: Path, workers: int) -> None:
+    """Jobs run to completion in order, and a failing job does not stop the others."""
+    (tmp_path / "jobs.toml").write_text(MANIFEST)
+    bd = bse.get_basis("sto-3g", elements=[1, 6])
+    (tmp_path / "sto-3g.nw").write_text(bse.write_formatted_basis_str(bd, "nwchem"))
+
+    jobs = read_manifest(tmp_path / "jobs.toml")
+    results = run_jobs(jobs, workers)
+
+    assert [result.job for result in results] == jobs
+    assert [result.ok for result in results] == [True, True, False, True]
+    assert "not-a-basis" in (results[2].error or "")
+    assert all(result.seconds >= 0 for result in results)
+
+    f_removed = (tmp_path / "def2-TZVP-f.nw").read_text()
+    assert "C    F" not in f_removed
+    assert "C    D" in f_removed
+
+    assert "****" in (tmp_path / "def2-TZVP-df.txt").read_text()  # gaussian94 separators
+    assert "C    P" not in (tmp_path / "sto-3g-p.nw").read_text()
+    assert not (tmp_path / "missing.nw").exists()
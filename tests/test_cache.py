@@ -0,0 +1,193 @@
+"""Test the persistent on-disk cache."""
+
+import multiprocessing
+import os
+from argparse import Namespace
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import basis_set_exchange as bse
+import pytest
+
+from basis import cache
+from basis.basis import cache_clear, cache_info, configure_memo, count, count_many, load_basis
+from basis.cache import DiskCache, default_cache
+from basis.cli import cache_cli
+
+
+def test_disk_cache_roundtrip(tmp_path: Path) -> None:
+    """Values are returned unchanged and missing keys are misses."""
+    store = DiskCache(tmp_path / "cache.sqlite")
+    assert store.get("a") is None
+
+    store.set("a", b"alpha")
+    assert store.get("a") == b"alpha"
+
+    store.set("a", b"beta")
+    assert store.get("a") == b"beta"
+
+
+def test_disk_cache_lru_eviction(tmp_path: Path) -> None:
+    """The least recently used entries are evicted once the size cap is exceeded."""
+    store = DiskCache(tmp_path / "cache.sqlite", max_size=10)
+    store.set("a", b"aaaa")
+    store.set("b", b"bbbb")
+    assert store.get("a") == b"aaaa"  # a is now more recent than b
+
+    store.set("c", b"cccc")
+    assert store.get("b") is None
+    assert store.get("a") == b"aaaa"
+    assert store.get("c") == b"cccc"
+
+    # Values larger than the cap are never stored
+    store.set("d", b"d" * 11)
+    assert store.get("d") is None
+
+
+def test_disk_cache_read_only(tmp_path: Path) -> None:
+    """A cache that cannot be written to still serves the entries it holds."""
+    store = DiskCache(tmp_path / "cache.sqlite")
+    store.set("a", b"alpha")
+    store._connect().execute("PRAGMA query_only = ON")
+
+    assert store.get("a") == b"alpha"
+    assert store.get("b") is None
+    store.set("b", b"beta")
+    assert store.get("b") is None
+
+
+def test_disk_cache_stats_and_clear(tmp_path: Path) -> None:
+    """Stats report entries and size; clear empties the cache."""
+    store = DiskCache(tmp_path / "cache.sqlite", max_size=100)
+    store.set("a", b"12345")
+    store.set("b", b"123")
+
+    stats = store.stats()
+    assert (stats.entries, stats.size, stats.max_size) == (2, 8, 100)
+
+    store.clear()
+    assert store.stats().entries == 0
+    assert store.get("a") is None
+
+
+def _forked_cache_state() -> tuple[bool, bool]:
+    store = default_cache()
+    assert store is not None
+    fresh = store._conn is None
+    acquired = store._lock.acquire(timeout=5)
+    if acquired:
+        store._lock.release()
+    return fresh, acquired and store.get("fork") == b"parent"
+
+
+@pytest.mark.skipif(not hasattr(os, "register_at_fork"), reason="needs fork()")
+def test_cache_after_fork() -> None:
+    """Forked workers reopen the cache rather than reuse the parent's connection and lock."""
+    store = default_cache()
+    assert store is not None
+    store.set("fork", b"parent")
+    context = multiprocessing.get_context("fork")
+    # Held by the parent while forking, as by another thread mid-lookup
+    with store._lock, ProcessPoolExecutor(1, mp_context=context) as executor:
+        assert executor.submit(_forked_cache_state).result(timeout=30) == (True, True)
+
+    names = ["sto-3g", "def2-svp", "6-31g"]
+    expected = {name: count(name) for name in names}
+    cache_clear()
+    assert count_many(names, workers=2) == expected
+
+
+def test_cache_cli_errors(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """The cache subcommand reports a cache it cannot write as an error, not a traceback."""
+    monkeypatch.setenv("BASIS_CACHE_DIR", str(tmp_path))
+    store = default_cache()
+    assert store is not None
+    store.set("a", b"alpha")
+    cache_cli(Namespace(action="stats"))
+
+    store._connect().execute("PRAGMA query_only = ON")
+    try:
+        with pytest.raises(SystemExit, match=r"could not clear the cache at .*readonly"):
+            cache_cli(Namespace(action="clear"))
+    finally:
+        store._connect().execute("PRAGMA query_only = OFF")
+    assert store.get("a") == b"alpha"
+
+
+def test_count_skips_bse_when_cached(monkeypatch: pytest.MonkeyPatch) -> None:
+    """A cached count is served without loading the basis set."""
+    expected = count("def2-svp")
+    cache_clear()
+
+    def fail(*args: object, **kwargs: object) -> None:
+        raise AssertionError("bse.get_basis should not be called")
+
+    monkeypatch.setattr(bse, "get_basis", fail)
+    assert count("def2-svp") == expected
+    assert count("DEF2-SVP") == expected
+
+    cache_clear()
+    with pytest.raises(AssertionError, match="should not be called"):
+        count("def2-svp", use_cache=False)
+
+
+def test_count_cache_keyed_by_bse_version(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Entries written for another BSE version are not reused."""
+    count("sto-3g")
+    cache_clear()
+    monkeypatch.setattr(cache, "bse_version", lambda: "0.0.0-other")
+
+    calls = []
+    get_basis = bse.get_basis
+    monkeypatch.setattr(
+        bse, "get_basis", lambda name, **kwargs: calls.append(name) or get_basis(name, **kwargs)
+    )
+
+    count("sto-3g")
+    count("sto-3g")
+    assert calls == ["sto-3g"]
+
+
+def test_cache_opt_out(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Setting $BASIS_NO_CACHE disables the persistent cache."""
+    assert default_cache() is not None
+    monkeypatch.setenv("BASIS_NO_CACHE", "1")
+    assert default_cache() is None
+
+
+def test_count_memoized_copies() -> None:
+    """Memoized counts are copies that callers cannot corrupt."""
+    cache_clear()
+    sto3g = count("sto-3g")
+    sto3g[1][0].append(99)
+    sto3g.clear()
+
+    assert count("sto-3g")[1] == ([1], [3])
+    info = cache_info()["count"]
+    assert (info.hits, info.misses, info.currsize) == (1, 1, 1)
+
+    cache_clear()
+    assert cache_info()["count"].currsize == 0
+
+
+def test_load_basis_memoized_copies() -> None:
+    """Memoized basis sets are copies that callers cannot corrupt."""
+    cache_clear()
+    basis_dict = load_basis("sto-3g")
+    basis_dict["elements"].clear()
+
+    assert "6" in load_basis("STO-3G")["elements"]
+    assert cache_info()["load_basis"].hits == 1
+
+
+def test_configure_memo() -> None:
+    """A memo size of zero disables in-process memoization."""
+    maxsize = cache_info()["count"].maxsize
+    try:
+        configure_memo(count_maxsize=0)
+        count("sto-3g")
+        count("sto-3g")
+        info = cache_info()["count"]
+        assert (info.maxsize, info.currsize) == (0, 0)
+    finally:
+        configure_memo(count_maxsize=maxsize)
@@ -0,0 +1,34 @@
+"""Test the command-line argument parsing."""
+
+import pytest
+
+from basis.cli import basis_parser
+
+
+def test_edit_outputs() -> None:
+    """-o takes one path per flag, so it does not swallow the basis set."""
+    args = basis_parser().parse_args(["edit", "-o", "x.nw", "sto-3g"])
+    assert args.basis == "sto-3g"
+    assert args.output == ["x.nw"]
+
+    args = basis_parser().parse_args(["edit", "sto-3g", "-o", "x.nw", "-o", "x.gbs"])
+    assert args.output == ["x.nw", "x.gbs"]
+
+
+@pytest.mark.parametrize(
+    "command",
+    [
+        ["show", "sto-3g"],
+        ["stats", "-o", "stats.csv"],
+        ["edit", "-m", "manifest.toml"],
+        ["edit", "sto-3g", "-o", "x.nw", "-o", "x.gbs"],
+    ],
+)
+def test_jobs(command: list[str], capsys: pytest.CaptureFixture[str]) -> None:
+    """-j takes a non-negative number of processes."""
+    assert basis_parser().parse_args([*command, "-j", "0"]).jobs == 0
+    assert basis_parser().parse_args([*command, "-j", "2"]).jobs == 2
+    for jobs in ("-1", "two"):
+        with pytest.raises(SystemExit):
+            basis_parser().parse_args([*command, "-j", jobs])
+    assert "need at least one job, got: -1" in capsys.readouterr().err
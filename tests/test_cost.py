@@ -0,0 +1,52 @@
+"""Test cost estimates."""
+
+import pytest
+
+from basis.basis import count, spherical_count
+from basis.cost import estimate_cost, iter_cost_table, molecule_functions
+
+WATER = {8: 1, 1: 2}
+
+
+def test_molecule_functions() -> None:
+    """Functions are the spherical counts of each atom, primitives those uncontracted."""
+    spherical = spherical_count(count("def2-svp", [1, 8]))
+    functions = sum(spherical[8][0]) + 2 * sum(spherical[1][0])
+    assert molecule_functions("def2-svp", WATER)[0] == functions == 24
+
+    with pytest.raises(ValueError, match="lacks elements: Rn"):
+        molecule_functions("sto-3g", {86: 1})
+
+
+def test_estimate_cost() -> None:
+    """Integral counts and sizes follow from the number of functions."""
+    estimate = estimate_cost("def2-svp", WATER)
+    n = estimate.functions
+    pairs = n * (n + 1) // 2
+    assert estimate.eris == pairs * (pairs + 1) // 2
+    assert n**4 / 8 < estimate.eris < (n + 1) ** 4 / 8
+    assert estimate.conventional_bytes == 8 * estimate.eris
+    assert estimate.matrix_bytes == 8 * n**2
+    assert estimate.aux_functions == 3 * n
+
+    ri = estimate_cost("def2-svp", WATER, aux="def2-universal-jkfit")
+    assert ri.aux_functions == molecule_functions("def2-universal-jkfit", WATER)[0]
+    assert ri.ri_bytes == 8 * (ri.aux_functions * pairs + ri.aux_functions**2)
+
+
+def test_iter_cost_table() -> None:
+    """Tables have a column per basis set, and rows for fitting in memory if given."""
+    estimates = [estimate_cost(basis, WATER) for basis in ["sto-3g", "def2-svp"]]
+
+    lines = list(iter_cost_table(estimates, memory=4096))
+    assert lines[0].split("|")[1:] == ["  sto-3g   ", " def2-svp"]
+    assert lines[-2].endswith("|       yes |        no")
+    assert lines[-1].startswith("Fits 4.0 KiB: RI")
+
+    csv = list(iter_cost_table(estimates, "csv"))
+    assert csv[1] == ",".join(map(str, estimates[0]))
+    assert len(csv) == 3
+
+    # Without estimates, only the row labels remain
+    lines = list(iter_cost_table([]))
+    assert lines[2] == "Basis functions     |"
@@ -0,0 +1,85 @@
+"""Test the array-backed basis function counts."""
+
+import numpy as np
+import pytest
+
+from basis.basis import count, difference, filter_unused_elements, spherical_count
+from basis.counts import CountArray, difference_from, difference_matrix, pairwise_differences
+
+
+def test_round_trip() -> None:
+    """Conversion to and from the dictionary form is lossless."""
+    for basis in ("sto-3g", "def2-svp", "cc-pVTZ"):
+        counts = count(basis)
+        array = CountArray.from_dict(counts)
+        assert array.to_dict() == counts
+        assert CountArray.from_dict(counts, max_am=12).to_dict() == counts
+
+
+def test_shape() -> None:
+    """Counts are stored as (n_elements, max_am, 2)."""
+    array = CountArray.from_dict(count("cc-pVTZ"))
+    assert array.data.shape == (len(array.elements), array.max_am, 2)
+    assert array.contracted[0].tolist()[:3] == [3, 2, 1]  # H
+    assert array.totals()[0].tolist() == [6, 8]
+
+    with pytest.raises(ValueError, match="same length"):
+        CountArray(array.elements[:1], array.data, array.n_am)
+
+
+def test_difference() -> None:
+    """The vectorized difference matches the dictionary implementation."""
+    svp, tzvp = count("def2-svp"), count("def2-tzvp")
+    expected = difference(svp, tzvp)
+    assert CountArray.from_dict(svp).difference(CountArray.from_dict(tzvp)).to_dict() == expected
+
+    sto3g, ccpvdz = count("sto-3g"), count("cc-pVDZ")
+    expected = difference(ccpvdz, sto3g)
+    assert (
+        CountArray.from_dict(ccpvdz).difference(CountArray.from_dict(sto3g)).to_dict() == expected
+    )
+
+
+def test_pairwise_differences() -> None:
+    """Differences of many pairs at once match the dictionary implementation."""
+    names = ["sto-3g", "def2-svp", "def2-tzvp", "cc-pVTZ"]
+    counts = {name: count(name) for name in names}
+
+    matrix = difference_matrix(counts)
+    assert list(matrix) == [(a, b) for i, a in enumerate(names) for b in names[i + 1 :]]
+    for (a, b), diff in matrix.items():
+        assert diff == difference(counts[a], counts[b])
+
+    from_ref = difference_from(counts, "def2-svp", ["H-Ar"])
+    assert list(from_ref) == ["sto-3g", "def2-tzvp", "cc-pVTZ"]
+    assert from_ref["sto-3g"] == difference(
+        filter_unused_elements(counts["def2-svp"], range(1, 19)), counts["sto-3g"]
+    )
+    assert pairwise_differences(counts, [("cc-pVTZ", "sto-3g")]) == {
+        ("cc-pVTZ", "sto-3g"): difference(counts["cc-pVTZ"], counts["sto-3g"])
+    }
+
+    with pytest.raises(KeyError):
+        difference_from(counts, "def2-qzvp")
+
+
+def test_spherical_and_cartesian() -> None:
+    """Shell counts are scaled by 2l+1 (spherical) or (l+1)(l+2)/2 (cartesian)."""
+    counts = count("cc-pVTZ")
+    array = CountArray.from_dict(counts)
+
+    spherical = array.spherical().to_dict()
+    assert {element: (con, []) for element, (con, _) in spherical.items()} == spherical_count(
+        counts
+    )
+
+    # C: 4 s, 3 p, 2 d, 1 f → 4x1, 3x3, 2x6, 1x10
+    assert array.cartesian().to_dict()[6][0] == [4, 9, 12, 10]
+
+
+def test_select() -> None:
+    """Element selection matches filter_unused_elements."""
+    counts = count("sto-3g")
+    array = CountArray.from_dict(counts)
+    assert array.select(["H", "C-O", 200]).to_dict() == filter_unused_elements(counts, [1, 6, 7, 8])
+    assert np.array_equal(array.select([]).elements, [])
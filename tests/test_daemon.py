@@ -0,0 +1,115 @@
+"""Test the daemon and its client."""
+
+import json
+import socket
+import subprocess
+import sys
+import threading
+import time
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+
+from basis.basis import count, edit_basis, table
+from basis.client import DaemonError, request, token_path, try_request
+from basis.daemon import serve
+
+
+@pytest.fixture
+def address(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Iterator[str]:
+    """Run a daemon on a socket for the duration of a test."""
+    address = str(tmp_path / "daemon.sock")
+    monkeypatch.setenv("BASIS_DAEMON", address)
+    thread = threading.Thread(target=serve, args=(address,), daemon=True)
+    thread.start()
+
+    deadline = time.monotonic() + 10
+    while not Path(address).exists():
+        assert time.monotonic() < deadline, "daemon did not start"
+        time.sleep(0.01)
+
+    yield address
+
+    request("shutdown", address=address)
+    thread.join(timeout=10)
+    assert not thread.is_alive()
+    assert not Path(address).exists()
+
+
+def test_daemon_requests(address: str) -> None:
+    """The daemon answers requests like the in-process functions."""
+    assert request("ping", address=address)["pid"] > 0
+
+    counts = request("count", {"basis": "sto-3g", "elements": ["H", "C"]})
+    expected = count("sto-3g", ["H", "C"])
+    assert counts == {str(element): list(value) for element, value in expected.items()}
+
+    show = try_request("show", {"basis": ["sto-3g", "def2-svp"], "spherical": True})
+    assert show is not None
+    assert show["output"] == table(["sto-3g", "def2-svp"], spherical=True)
+
+    edit = try_request("edit", {"basis": "sto-3g", "remove": ["p"], "output": "sto-3g.gbs"})
+    assert edit is not None
+    assert edit["fmt"] == "gaussian94"
+    assert edit["output"] == edit_basis("sto-3g", remove=["p"], fmt="gaussian94")
+
+    with pytest.raises(DaemonError, match="does not exist"):
+        request("count", {"basis": "not-a-basis"})
+    with pytest.raises(DaemonError, match="Unknown command"):
+        request("frobnicate")
+
+
+def test_daemon_already_running(address: str) -> None:
+    """A second daemon refuses to take over the socket of a running one."""
+    with pytest.raises(RuntimeError, match="already serving"):
+        serve(address)
+
+
+def test_no_daemon(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Without a daemon, requests fail and the CLI falls back to running in-process."""
+    address = str(tmp_path / "missing.sock")
+    monkeypatch.setenv("BASIS_DAEMON", address)
+
+    assert try_request("ping") is None
+    with pytest.raises(OSError):  # noqa: PT011
+        request("ping")
+
+    # A stale socket file is ignored too
+    Path(address).touch()
+    assert try_request("ping") is None
+
+
+def test_daemon_tcp(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Over TCP, the daemon listens only on loopback and answers only token holders."""
+    monkeypatch.setenv("BASIS_CACHE_DIR", str(tmp_path))
+    with pytest.raises(RuntimeError, match="not a loopback address"):
+        serve("0.0.0.0:0")
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    address = f"127.0.0.1:{port}"
+    daemon = subprocess.Popen(
+        [sys.executable, "-m", "basis.cli", "serve", "--address", address],
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        deadline = time.monotonic() + 30
+        while not token_path(port).exists():
+            assert time.monotonic() < deadline, "daemon did not start"
+            time.sleep(0.05)
+        assert token_path(port).stat().st_mode & 0o777 == 0o600
+
+        # The client presents the token from the token file
+        assert request("ping", address=address)["pid"] == daemon.pid
+        with pytest.raises(DaemonError, match="only accepted over a Unix socket"):
+            request("shutdown", address=address)
+
+        with socket.create_connection(("127.0.0.1", port)) as sock:
+            sock.sendall(json.dumps({"command": "ping", "args": {}}).encode() + b"\n")
+            response = json.loads(sock.makefile("rb").readline())
+        assert response == {"ok": False, "error": "PermissionError: Invalid or missing token"}
+    finally:
+        daemon.terminate()
+        daemon.wait(timeout=10)
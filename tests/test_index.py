@@ -0,0 +1,117 @@
+"""Test the prebuilt count index."""
+
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import basis_set_exchange as bse
+import pytest
+
+from basis.basis import cache_clear, count, table
+from basis.cache import bse_version
+from basis.index import CountIndex, _read_index, build_index, load_index
+
+
+def test_index_roundtrip(tmp_path: Path) -> None:
+    """Counts read back from an index file match the counts it was built from."""
+    basis_sets = ["sto-3g", "def2-svp", "cc-pVTZ"]
+    counts = {name: count(name) for name in basis_sets}
+    CountIndex.from_counts(counts, 119, "1.2.3").write(tmp_path / "index.bin")
+
+    index = CountIndex.read(tmp_path / "index.bin")
+    assert index.names == basis_sets
+    assert index.version == "1.2.3"
+    for name in basis_sets:
+        assert index.counts(name) == counts[name]
+    assert index.counts("CC-PVTZ", [1, 6, 200]) == {
+        1: counts["cc-pVTZ"][1],
+        6: counts["cc-pVTZ"][6],
+    }
+
+    with pytest.raises(KeyError):
+        index.counts("def2-tzvp")
+
+    # The counts are read in place from the mapped file
+    assert isinstance(index.data, memoryview)
+    assert index.data.readonly
+
+
+def test_index_shared_between_processes(tmp_path: Path) -> None:
+    """Processes read the same mapped index, which survives the file being replaced."""
+    path = tmp_path / "index.bin"
+    counts = {"sto-3g": count("sto-3g"), "def2-svp": count("def2-svp")}
+    CountIndex.from_counts(counts, 119, "1.2.3").write(path)
+    index = CountIndex.read(path)
+
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        looked_up = executor.map(_lookup, [path] * 2, ["sto-3g", "def2-svp"])
+        assert list(looked_up) == list(counts.values())
+
+    CountIndex.from_counts({"sto-3g": counts["sto-3g"]}, 119, "1.2.3").write(path)
+    assert index.counts("def2-svp") == counts["def2-svp"]
+    assert CountIndex.read(path).names == ["sto-3g"]
+
+
+def _lookup(path: Path, basis: str) -> dict:
+    return CountIndex.read(path).counts(basis)
+
+
+def test_read_invalid_index(tmp_path: Path) -> None:
+    """Files that are not indices are rejected."""
+    path = tmp_path / "index.bin"
+    path.write_bytes(b"not an index" * 10)
+    with pytest.raises(ValueError, match="Not a basis count index"):
+        CountIndex.read(path)
+    assert load_index(path) is None
+
+    CountIndex.from_counts({"sto-3g": count("sto-3g")}, 119, bse_version()).write(path)
+    path.write_bytes(path.read_bytes()[:-2])
+    with pytest.raises(ValueError, match="truncated"):
+        CountIndex.read(path)
+
+    path.write_bytes(b"")
+    assert load_index(path) is None
+
+
+def test_build_index_skips_failures(tmp_path: Path) -> None:
+    """Basis sets that cannot be counted are reported rather than aborting the build."""
+    index, failures = build_index(["sto-3g", "not-a-basis"], tmp_path / "index.bin")
+    assert index.names == ["sto-3g"]
+    assert list(failures) == ["not-a-basis"]
+
+
+def test_count_served_from_index(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Counts come from the index when it matches the installed BSE version."""
+    monkeypatch.setenv("BASIS_CACHE_DIR", str(tmp_path))
+    expected = table(["sto-3g", "def2-svp"], diff=True)
+    build_index(["sto-3g", "def2-svp"])
+    cache_clear()
+
+    def fail(*args: object, **kwargs: object) -> None:
+        raise AssertionError("bse.get_basis should not be called")
+
+    monkeypatch.setattr(bse, "get_basis", fail)
+    monkeypatch.setenv("BASIS_NO_CACHE", "1")
+    assert table(["sto-3g", "def2-svp"], diff=True) == expected
+
+
+def test_stale_index_ignored(tmp_path: Path) -> None:
+    """An index built for another BSE version is not used."""
+    path = tmp_path / "index.bin"
+    CountIndex.from_counts({"sto-3g": count("sto-3g")}, 119, bse_version()).write(path)
+    assert load_index(path) is not None
+
+    CountIndex.from_counts({"sto-3g": count("sto-3g")}, 119, "0.0.0-other").write(path)
+    assert load_index(path) is None
+
+
+def test_replaced_index_released(tmp_path: Path) -> None:
+    """Only the current version of an index file is kept open."""
+    path = tmp_path / "index.bin"
+    for names in (["sto-3g"], ["sto-3g", "def2-svp"], ["def2-svp"]):
+        CountIndex.from_counts({name: count(name) for name in names}, 119, bse_version()).write(
+            path
+        )
+        index = load_index(path)
+        assert index is not None
+        assert index.names == names
+    assert _read_index.cache_info().currsize == 1
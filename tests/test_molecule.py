@@ -0,0 +1,101 @@
+"""Test basis function totals of molecules."""
+
+import csv
+from pathlib import Path
+
+import pytest
+
+from basis.basis import count, spherical_count
+from basis.molecule import (
+    Molecule,
+    MoleculeTotals,
+    iter_molecule_rows,
+    iter_molecules,
+    molecule_totals,
+    read_xyz,
+)
+
+WATER = "3\nwater\nO 0.0 0.0 0.0\nH 0.0 0.0 0.96\nH 0.93 0.0 -0.24\n"
+METHANE = "5\nmethane\nC 0 0 0\nh 0 0 1\nH 0 1 0\nH1 1 0 0\n1 1 1 1\n"
+
+
+def test_read_xyz() -> None:
+    """Atom labels of any case, numbered labels, and atomic numbers are counted."""
+    assert list(read_xyz(METHANE.splitlines(), "methane.xyz")) == [
+        Molecule("methane.xyz", {6: 1, 1: 4})
+    ]
+
+    trajectory = list(read_xyz((WATER + "\n" + METHANE).splitlines(), "traj.xyz"))
+    assert [molecule.name for molecule in trajectory] == ["traj.xyz:1", "traj.xyz:2"]
+
+
+@pytest.mark.parametrize(
+    "xyz",
+    [
+        "water\n",
+        "3\nwater\nO 0 0 0\nH 0 0 1\n",
+        "1\nxenon\nXx 0 0 0\n",
+        "1\nunbinilium\n120 0 0 0\n",
+        "2\nwater\nO 0 0 0\n\n",
+    ],
+)
+def test_read_xyz_invalid(xyz: str) -> None:
+    """Malformed files and unknown elements are rejected."""
+    with pytest.raises(ValueError, match=r"Expected|Unknown element"):
+        list(read_xyz(xyz.splitlines()))
+
+
+def test_iter_molecules(tmp_path: Path) -> None:
+    """Directories are expanded to their XYZ files, in sorted order."""
+    (tmp_path / "b_water.xyz").write_text(WATER)
+    (tmp_path / "a_methane.xyz").write_text(METHANE)
+    (tmp_path / "notes.txt").write_text("not a molecule")
+
+    names = [molecule.name for molecule in iter_molecules([tmp_path])]
+    assert names == [str(tmp_path / "a_methane.xyz"), str(tmp_path / "b_water.xyz")]
+
+
+def test_molecule_totals() -> None:
+    """Totals match summing the per-element counts over the atoms."""
+    basis_sets = ["sto-3g", "def2-TZVP"]
+    water = Molecule("water", {8: 1, 1: 2})
+    radon = Molecule("radon", {86: 1})
+
+    results = list(molecule_totals([water, radon, water], basis_sets, batch_size=2))
+    assert [(row.molecule, row.basis) for row in results] == [
+        ("water", "sto-3g"),
+        ("water", "def2-TZVP"),
+        ("radon", "sto-3g"),
+        ("radon", "def2-TZVP"),
+        ("water", "sto-3g"),
+        ("water", "def2-TZVP"),
+    ]
+
+    for row in (results[0], results[1]):
+        counts = count(row.basis)
+        spherical = spherical_count(counts)
+        assert row.contracted == sum(n * sum(counts[z][0]) for z, n in water.composition.items())
+        assert row.uncontracted == sum(n * sum(counts[z][1]) for z, n in water.composition.items())
+        assert row.spherical == sum(n * sum(spherical[z][0]) for z, n in water.composition.items())
+
+    # sto-3g stops at Xe
+    assert results[2] == MoleculeTotals("radon", "sto-3g", None, None, None)
+    assert results[3].spherical is not None
+    assert results[4] == results[0]
+
+
+def test_iter_molecule_rows() -> None:
+    """Missing totals are empty in CSV and null in NDJSON."""
+    rows = [
+        MoleculeTotals("a,b", "sto-3g", None, None, None),
+        MoleculeTotals('a"b,c', "6-31G(d,p)", 1, 2, 3),
+    ]
+
+    lines = list(iter_molecule_rows(rows))
+    assert lines[1] == '"a,b",sto-3g,,,'
+    assert lines[2] == '"a""b,c","6-31G(d,p)",1,2,3'
+    assert list(csv.reader(lines))[2] == ['a"b,c', "6-31G(d,p)", "1", "2", "3"]
+    assert list(iter_molecule_rows(rows[:1], "ndjson")) == [
+        '{"molecule": "a,b", "basis": "sto-3g", "contracted": null, "uncontracted": null, '
+        '"spherical": null}'
+    ]
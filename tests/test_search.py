@@ -0,0 +1,59 @@
+"""Test searching the count index."""
+
+import pytest
+
+from basis.basis import count
+from basis.index import CountIndex
+from basis.search import search
+
+BASIS_SETS = ["sto-3g", "def2-svp", "def2-tzvp", "cc-pvdz"]
+
+
+@pytest.fixture(scope="module")
+def index() -> CountIndex:
+    """Small index of a few basis sets."""
+    counts = {name: count(name) for name in BASIS_SETS}
+    counts["uncontracted-cc-pvdz"] = {
+        element: (uncon, uncon) for element, (_, uncon) in counts["cc-pvdz"].items()
+    }
+    return CountIndex.from_counts(counts, 119, "")
+
+
+def test_search_ranking(index: CountIndex) -> None:
+    """Results are ranked by the total number of spherical functions."""
+    results = search(index, ["H", "O"])
+
+    assert [result.basis for result in results] == [
+        "sto-3g",
+        "cc-pvdz",
+        "def2-svp",
+        "uncontracted-cc-pvdz",
+        "def2-tzvp",
+    ]
+    assert results[0].functions == 1 + 5
+    assert results[0].max_functions == 5
+    assert results[0].max_am == 1
+
+
+def test_search_constraints(index: CountIndex) -> None:
+    """Each constraint removes the basis sets that violate it."""
+    names = lambda results: {result.basis for result in results}  # noqa: E731
+
+    # sto-3g stops at Xe, def2 continues to Rn
+    assert names(search(index, ["Rn"])) == {"def2-svp", "def2-tzvp"}
+    assert names(search(index, ["C"], max_functions=14)) == {"sto-3g", "cc-pvdz", "def2-svp"}
+    assert names(search(index, ["C"], max_am=1)) == {"sto-3g"}
+    assert names(search(index, ["C"], contraction="uncontracted")) == {"uncontracted-cc-pvdz"}
+
+    water = {8: 1, 1: 2}
+    results = search(index, composition=water, max_total=24)
+    assert names(results) == {"sto-3g", "cc-pvdz", "def2-svp"}
+    assert [result.functions for result in results] == [7, 24, 24]
+
+
+def test_search_invalid(index: CountIndex) -> None:
+    """A search needs elements and a known contraction."""
+    with pytest.raises(ValueError, match="At least one element"):
+        search(index)
+    with pytest.raises(ValueError, match="Unknown contraction"):
+        search(index, ["H"], contraction="general")  # ty: ignore[invalid-argument-type]
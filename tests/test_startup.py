@@ -0,0 +1,49 @@
+"""Test that the CLI starts without importing heavy dependencies."""
+
+import subprocess
+import sys
+
+from basis.basis import cache_clear, count
+
+# Cumulative import time budget for basis.cli, in microseconds (generous for slow CI runners)
+IMPORT_BUDGET_US = 150_000
+
+
+def import_times(code: str) -> dict[str, int]:
+    """Run *code* under `python -X importtime` and collect cumulative import times."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            _, cumulative, module = line.removeprefix("import time:").split("|")
+            if cumulative.strip().isdigit():
+                times[module.strip()] = int(cumulative)
+    return times
+
+
+def test_cli_import_budget() -> None:
+    """Importing the CLI defers BSE and NumPy and stays within the time budget."""
+    times = import_times("import basis.cli")
+
+    assert "basis_set_exchange.api" not in times
+    assert "numpy" not in times
+    assert times["basis.cli"] < IMPORT_BUDGET_US
+
+
+def test_cached_show_skips_bse() -> None:
+    """A `basis show` served from the persistent cache never imports BSE."""
+    cache_clear()
+    count("sto-3g")
+    times = import_times(
+        "import sys\n"
+        "from basis.cli import basis_cli\n"
+        "sys.argv = ['basis', 'show', 'sto-3g', '-e', 'H-Ar']\n"
+        "basis_cli()\n"
+    )
+
+    assert "basis_set_exchange.api" not in times
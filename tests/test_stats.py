@@ -0,0 +1,87 @@
+"""Test the library statistics scan."""
+
+import csv
+import json
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+import basis.stats
+from basis.basis import count
+from basis.stats import read_checkpoint, scan_library, stats_rows, write_stats
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_scan_library(tmp_path: Path, workers: int) -> None:
+    """Scans count every basis set, in order, and report those that cannot be counted."""
+    names = ["def2-svp", "not-a-basis", "sto-3g"]
+    counts, failures = scan_library(names, tmp_path / "checkpoint", workers)
+
+    assert list(counts) == ["def2-svp", "sto-3g"]
+    assert all(counts[name] == count(name) for name in counts)
+    assert list(failures) == ["not-a-basis"]
+
+    resumed, resumed_failures = read_checkpoint(tmp_path / "checkpoint")
+    assert resumed == {name: count(name) for name in counts}
+    assert resumed_failures == failures
+
+
+def test_scan_resumes(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """An interrupted scan counts only the basis sets its checkpoint lacks."""
+    checkpoint = tmp_path / "checkpoint"
+    scan_library(["sto-3g", "not-a-basis"], checkpoint, workers=1)
+    # Interrupted while writing an entry
+    with open(checkpoint, "a") as fh:
+        fh.write('{"basis": "def2-svp", "cou')
+
+    scanned = []
+
+    def counting(basis: str, use_cache: bool) -> tuple:
+        scanned.append(basis)
+        return count(basis, use_cache=use_cache), None
+
+    monkeypatch.setattr(basis.stats, "_scan_basis", counting)
+    counts, failures = scan_library(["def2-svp", "not-a-basis", "sto-3g"], checkpoint, 1)
+    assert scanned == ["def2-svp"]
+    assert list(counts) == ["def2-svp", "sto-3g"]
+    assert list(failures) == ["not-a-basis"]
+    assert read_checkpoint(checkpoint)[0] == {name: count(name) for name in ["sto-3g", "def2-svp"]}
+
+    # A checkpoint from another BSE version is discarded
+    lines = checkpoint.read_text().splitlines()
+    checkpoint.write_text("\n".join([json.dumps({"bse": "0.0"}), *lines[1:]]))
+    assert read_checkpoint(checkpoint) == ({}, {})
+
+
+def test_write_stats(tmp_path: Path) -> None:
+    """CSV and columnar outputs hold one row per basis set and element."""
+    counts = {
+        "sto-3g": count("sto-3g", ["H", "C"]),
+        "cc-pVDZ": count("cc-pVDZ", ["C"]),
+        "6-31G(d,p)": count("6-31G(d,p)", ["H"]),
+    }
+    rows = list(stats_rows(counts))
+
+    write_stats(counts, tmp_path / "stats.csv")
+    lines = (tmp_path / "stats.csv").read_text().splitlines()
+    assert len(lines) == 1 + len(rows)
+    assert lines[-2] == 'cc-pVDZ,6,2,"[3, 2, 1]","[9, 4, 1]","[3, 6, 5]",14'
+    # Names with commas or quotes are quoted
+    write_stats({'6-31G(d,p) "x"': counts["6-31G(d,p)"], **counts}, tmp_path / "stats.csv")
+    with open(tmp_path / "stats.csv", newline="") as fh:
+        parsed = list(csv.reader(fh))
+    assert {len(row) for row in parsed} == {7}
+    assert parsed[1][:3] == ['6-31G(d,p) "x"', "1", "1"]
+    assert parsed[-1][:4] == ["6-31G(d,p)", "1", "1", "[2, 1]"]
+
+    write_stats(counts, tmp_path / "stats.npz")
+    with np.load(tmp_path / "stats.npz") as columns:
+        assert columns["basis"].tolist() == ["sto-3g", "sto-3g", "cc-pVDZ", "6-31G(d,p)"]
+        assert columns["element"].tolist() == [1, 6, 6, 1]
+        assert columns["max_am"].tolist() == [0, 1, 2, 1]
+        assert columns["uncontracted"].tolist() == [[3, 0, 0], [6, 3, 0], [9, 4, 1], [4, 1, 0]]
+        assert columns["functions"].tolist() == [row.functions for row in rows]
+
+    with pytest.raises(ValueError, match="Invalid format"):
+        write_stats(counts, tmp_path / "stats.parquet", "parquet")  # ty: ignore[invalid-argument-type]
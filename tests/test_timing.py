@@ -0,0 +1,54 @@
+"""Test the timing spans."""
+
+import json
+from pathlib import Path
+
+from basis.basis import edit_basis
+from basis.timing import recording, span
+
+
+def test_span_disabled() -> None:
+    """Without a recorder, spans are a shared no-op."""
+    assert span("a") is span("b")
+    with span("a"):
+        pass
+
+
+def test_recording(tmp_path: Path) -> None:
+    """Spans are recorded with their nesting, summarized, and written as a Chrome trace."""
+    with recording() as recorder:
+        with span("outer"):
+            for _ in range(3):
+                with span("inner"):
+                    pass
+    with span("after"):
+        pass
+
+    assert [(event.name, event.depth) for event in recorder.events] == [
+        ("inner", 1),
+        ("inner", 1),
+        ("inner", 1),
+        ("outer", 0),
+    ]
+    outer = recorder.events[-1]
+    assert all(outer.start <= event.start for event in recorder.events)
+    assert all(event.duration <= outer.duration for event in recorder.events)
+
+    summary = list(recorder.summary())
+    assert summary[1].split()[:2] == ["outer", "1"]
+    assert summary[2].startswith("  inner")
+    assert summary[2].split()[1] == "3"
+
+    recorder.write_trace(tmp_path / "trace.json")
+    trace = json.loads((tmp_path / "trace.json").read_text())
+    assert {event["name"] for event in trace["traceEvents"]} == {"outer", "inner"}
+    assert all(event["ph"] == "X" for event in trace["traceEvents"])
+
+
+def test_edit_basis_phases() -> None:
+    """Editing records its BSE phases."""
+    with recording() as recorder:
+        edit_basis("sto-3g", elements=["C"], remove=["p"])
+
+    names = {event.name for event in recorder.events}
+    assert {"remove shells", "bse.write_formatted_basis_str"} <= names